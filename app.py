@@ -1,35 +1,32 @@
-import pandas as pd
 import streamlit as st
 import sys
 import asyncio
 import os
-import re
+import time
+from typing import Any, Dict, List, Optional
 from dotenv import load_dotenv
 
-from browser_use import Browser, Agent as BrowserAgent
-from src.Utilities.utils import controller
-from browser_use.llm import ChatOpenAI
-
-# Optional mobile automation support via droidrun
-try:
-    from droidrun import Droid, Agent as MobileAgent
-except Exception:  # pragma: no cover - droidrun may not be installed
-    Droid = None
-    MobileAgent = None
-
-from src.Prompts.agno_prompts import (
-    generate_selenium_pytest_bdd,
-    generate_playwright_python,
-    generate_cypress_js,
-    generate_robot_framework,
-    generate_java_selenium,
-    generate_gherkin_scenarios,
+from src.Utilities.cache import ResponseCache
+from src.Utilities.execution import DEFAULT_MAX_CONCURRENCY
+from src.Utilities.lazy import lazy_import
+from src.Utilities.jobs import FINISHED_STATUSES, POLL_INTERVAL, SUCCEEDED, get_worker_pool
+from src.Utilities.telemetry import aggregate, current_run_id, files_signature, load_records, new_run_id
+from src.Utilities.pipeline import (
+    FRAMEWORK_GENERATORS,
+    FRAMEWORK_EXTENSIONS,
+    build_code_archive,
+    extract_feature_name,
+    run_store,
 )
 
-from src.Prompts.browser_prompts import (
-    generate_browser_task
+from src.frontend.results import (
+    get_results_view,
+    render_actions,
+    render_contents,
+    render_debug,
+    render_elements,
+    render_scenarios,
 )
-
 from src.frontend.ui import (
     set_page_config,
     load_css,
@@ -39,29 +36,16 @@ from src.frontend.ui import (
 # # Load environment variables
 load_dotenv()
 
+# Heavy modules are loaded on first use so the first page renders quickly
+pd = lazy_import("pandas")
+# Gherkin is generated by the job workers; this handle only reports what is stored
+gherkin_cache = ResponseCache("gherkin")
+
 # Handle Windows asyncio policy
 if sys.platform == "win32":
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 
 
-# Dictionary mapping framework names to their generation functions
-FRAMEWORK_GENERATORS = {
-    "Selenium + PyTest BDD (Python)": generate_selenium_pytest_bdd,
-    "Playwright (Python)": generate_playwright_python,
-    "Cypress (JavaScript)": generate_cypress_js,
-    "Robot Framework": generate_robot_framework,
-    "Selenium + Cucumber (Java)": generate_java_selenium
-}
-
-# Dictionary mapping framework names to their file extensions
-FRAMEWORK_EXTENSIONS = {
-    "Selenium + PyTest BDD (Python)": "py",
-    "Playwright (Python)": "py",
-    "Cypress (JavaScript)": "js",
-    "Robot Framework": "robot",
-    "Selenium + Cucumber (Java)": "java"
-}
-
 # Framework descriptions
 framework_descriptions = {
     "Selenium + PyTest BDD (Python)": "Popular Python testing framework combining Selenium WebDriver with PyTest BDD for behavior-driven development. Best for Python developers who want strong test organization and reporting.",
@@ -71,12 +55,118 @@ framework_descriptions = {
     "Selenium + Cucumber (Java)": "Robust combination of Selenium WebDriver with Cucumber for Java, supporting BDD. Ideal for Java teams and enterprise applications."
 }
 
+def render_execution_results(execution: Dict[str, Any]) -> None:
+    """Render the results of an execution in the result tabs"""
+    view = get_results_view(execution)
+
+    # Display test execution details
+    st.markdown('<div class="status-success fade-in">Test execution completed!</div>', unsafe_allow_html=True)
+
+    # Display key information in tabs
+    st.markdown('<div class="tab-container fade-in">', unsafe_allow_html=True)
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["Results", "Actions", "Elements", "Details", "Device Info", "Metrics"])
+    with tab1:
+        render_scenarios(view, lambda scenario_id: run_store.load(execution["run_id"], scenario_id))
+        render_debug(view)
+    with tab2:
+        render_actions(view)
+    with tab3:
+        render_elements(view)
+    with tab4:
+        render_contents(view)
+    with tab5:
+        if execution["device_info"]:
+            st.markdown('<h4 class="glow-text">Device Information</h4>', unsafe_allow_html=True)
+            st.json(execution["device_info"])
+        else:
+            st.info("No device information available.")
+    with tab6:
+        render_llm_metrics(execution.get("run_id"))
+    st.markdown('</div>', unsafe_allow_html=True)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def run_stages(run_id: str, signature: tuple) -> List[Dict[str, Any]]:
+    """Per-stage LLM totals of a run; ``signature`` makes the cached result expire when a telemetry file changes"""
+    return aggregate(load_records(run_id))
+
+
+def render_llm_metrics(run_id: str) -> None:
+    """Render per-stage LLM latency, token usage and cost for a run"""
+    st.markdown('<h4 class="glow-text">LLM Usage</h4>', unsafe_allow_html=True)
+    # Reruns poll every POLL_INTERVAL while a job is pending; only re-read the files after they changed
+    stages = run_stages(run_id, files_signature()) if run_id else []
+    if not stages:
+        st.info("No LLM calls were recorded for this run.")
+        return
+    st.caption(f"Run ID: {run_id}")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("LLM calls", sum(stage["calls"] for stage in stages))
+    col2.metric("Tokens", sum(stage["prompt_tokens"] + stage["completion_tokens"] for stage in stages))
+    col3.metric("Estimated cost", f"${sum(stage['cost'] for stage in stages):.4f}")
+    context_before = sum(stage["context_tokens_before"] for stage in stages)
+    if context_before:
+        context_after = sum(stage["context_tokens_after"] for stage in stages)
+        st.caption(
+            f"Code generation context: {context_after} tokens sent instead of {context_before} "
+            f"({context_before - context_after} saved by compaction)"
+        )
+    st.dataframe(pd.DataFrame(stages))
+    if any(stage["stage"] == "mobile_agent" for stage in stages):
+        st.caption("Mobile agent runs are recorded as one row per run: latency includes the time spent on actions.")
+
+
+def code_language(framework: str) -> str:
+    """Syntax highlighting language of a framework's generated code"""
+    if framework == "Cypress (JavaScript)":
+        return "javascript"
+    elif framework == "Robot Framework":
+        return "robot"
+    elif framework == "Selenium + Cucumber (Java)":
+        return "java"
+    return "python"
+
+
+def submit_job(name: str, kind: str, payload: Dict[str, Any]) -> None:
+    """Queue a background job and remember its id in the session under ``name``"""
+    st.session_state.setdefault("jobs", {})[name] = get_worker_pool().submit(kind, payload)
+
+
+def finished_job(name: str, message: str, language: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Return the session's job ``name`` once it finished, showing its progress until then"""
+    job_id = st.session_state.get("jobs", {}).get(name)
+    if job_id is None:
+        return None
+    job = get_worker_pool().store.get(job_id)
+    if job is None or job["status"] in FINISHED_STATUSES:
+        st.session_state.jobs.pop(name)
+        return job
+
+    # Still queued or running: show what is known so far and poll again
+    st.session_state.jobs_pending = True
+    status = "Waiting for a worker..." if job["status"] == "queued" else message
+    st.markdown(f'<div class="status-info fade-in">{status}</div>', unsafe_allow_html=True)
+    if job["progress"]:
+        if language is not None:
+            st.code(job["progress"], language=language)
+        else:
+            st.caption(job["progress"])
+    return None
+
+
 def main():
 
     set_page_config()
     load_css()
     render_header()
 
+    # Generation and execution run in worker processes; start them early so their browsers are warm
+    get_worker_pool().ensure_running()
+    st.session_state.jobs_pending = False
+
+    # Streamlit reruns the script on every interaction; keep LLM telemetry grouped per run
+    current_run_id.set(st.session_state.get("run_id"))
+
 
     # Main Title with custom styling
     st.markdown('<h1 class="main-title fade-in">FortiAgent</h1>', unsafe_allow_html=True)
@@ -98,6 +188,49 @@ def main():
             ["Browser", "Mobile"],
             index=0,
         )
+
+        st.markdown('<div class="sidebar-heading">Execution Settings</div>', unsafe_allow_html=True)
+        max_parallel = st.number_input(
+            "Parallel scenarios:",
+            min_value=1,
+            max_value=16,
+            value=DEFAULT_MAX_CONCURRENCY,
+            help="Number of scenarios executed at the same time, each in its own browser context.",
+        )
+        use_cache = st.checkbox(
+            "Use response cache",
+            value=True,
+            help="Reuse previous LLM generations for identical inputs.",
+        )
+        use_replay = st.checkbox(
+            "Replay recorded runs",
+            value=True,
+            help="Replay the recorded steps of scenarios that passed before instead of re-running the agent; the agent takes over where the page changed.",
+        )
+        share_setup = st.checkbox(
+            "Run Background once",
+            value=True,
+            help="Run the feature's Background (or the setup scenario below) once and start every browser scenario from the cookies and localStorage it left behind.",
+        )
+        setup_scenario = st.text_area(
+            "Setup scenario (optional):",
+            value="",
+            height=100,
+            help="Gherkin steps to run once instead of the Background, e.g. a login scenario.",
+        )
+        cache_stats = gherkin_cache.stats()
+        st.caption(
+            f"Gherkin cache: {cache_stats['entries']} entries, "
+            f"{cache_stats['hits']} hits, {cache_stats['misses']} misses"
+        )
+        job_counts = get_worker_pool().store.counts()
+        st.caption(f"Jobs: {job_counts.get('running', 0)} running, {job_counts.get('queued', 0)} queued")
+        with st.expander("Recent runs"):
+            recent_runs = run_store.runs(limit=10)
+            if recent_runs:
+                st.dataframe(pd.DataFrame(recent_runs)[["run_id", "features", "scenarios", "passed", "duration"]], hide_index=True)
+            else:
+                st.caption("No runs recorded yet.")
         #About section with tabs
         with st.expander("About"):
             tab4, = st.tabs([
@@ -125,24 +258,36 @@ def main():
     )
     st.markdown('</div>', unsafe_allow_html=True)
     # Buttons with better layout
-    col3, col4, col5 = st.columns(3)
+    col3, col4, col5, col6 = st.columns(4)
     with col3:
         generate_gherkin_btn = st.button("📝 Generate Gherkin")
     with col4:
         execute_btn = st.button("▶️ Execute Steps")
     with col5:
         generate_code_btn = st.button("💻 Generate Code")
+    with col6:
+        generate_all_btn = st.button("📦 Generate All Frameworks")
 
     # Gherkin Generation Section
     if generate_gherkin_btn: # No longer requires user_story directly
-        with st.spinner("Generating Gherkin scenario..."):
-            generated_steps = generate_gherkin_scenarios(user_story) # Pass manual test cases
-
+        # A new Gherkin scenario starts a new run for telemetry
+        st.session_state.run_id = new_run_id()
+        submit_job("gherkin", "gherkin", {
+            "manual_test_cases": user_story,  # Pass manual test cases
+            "use_cache": use_cache,
+            "run_id": st.session_state.run_id,
+        })
+
+    # The scenario is streamed into the page while the agent is still writing it
+    gherkin_job = finished_job("gherkin", "Generating Gherkin scenario...", language="gherkin")
+    if gherkin_job is not None:
+        if gherkin_job["status"] == SUCCEEDED:
             # Initialize both generated_steps and edited_steps in session state
-            st.session_state.generated_steps = generated_steps
-            st.session_state.edited_steps = generated_steps
-
-        st.markdown('<div class="status-success fade-in">Gherkin scenario generated successfully!</div>', unsafe_allow_html=True)
+            st.session_state.generated_steps = gherkin_job["result"]
+            st.session_state.edited_steps = gherkin_job["result"]
+            st.markdown('<div class="status-success fade-in">Gherkin scenario generated successfully!</div>', unsafe_allow_html=True)
+        else:
+            st.markdown(f'<div class="status-error">Error generating Gherkin scenario: {gherkin_job.get("error")}</div>', unsafe_allow_html=True)
 
     # Display scenarios editor (whether newly generated or from session state)
     if "edited_steps" in st.session_state:
@@ -180,294 +325,147 @@ def main():
     if execute_btn:
         if "edited_steps" not in st.session_state:
             st.markdown('<div class="status-error">Please generate a Gherkin scenario first.</div>', unsafe_allow_html=True)
+        # Check if there are unsaved changes and warn the user
+        elif "scenario_editor" in st.session_state and st.session_state.get("scenario_editor", "") != st.session_state.edited_steps:
+            st.warning("You have unsaved changes. Please save your changes before executing steps.")
         else:
-            # Check if there are unsaved changes and warn the user
-            if "scenario_editor" in st.session_state and st.session_state.get("scenario_editor", "") != st.session_state.edited_steps:
-                st.warning("You have unsaved changes. Please save your changes before executing steps.")
-            else:
-                with st.spinner("Executing test steps..."):
-                    # Display the scenarios that will be executed
-                    st.markdown('<div class="card code-container fade-in">', unsafe_allow_html=True)
-                    st.markdown('<h4 class="glow-text">Executing Scenarios:</h4>', unsafe_allow_html=True)
-                    st.code(st.session_state.edited_steps, language="gherkin")
-                    st.markdown('</div>', unsafe_allow_html=True)
-
-                    # Use the edited steps for execution
-                    steps_to_execute = st.session_state.edited_steps
-            # Modify the execute_test function to store more detailed information
-            async def execute_test(steps: str):
-                try:
-                    if selected_platform == "Browser":
-                        env = Browser()
-                        AgentClass = BrowserAgent
-                        agent_kwargs = {"browser": env}
-                    else:
-                        if Droid is None or MobileAgent is None:
-                            raise RuntimeError("droidrun is required for mobile execution")
-                        env = Droid()
-                        AgentClass = MobileAgent
-                        agent_kwargs = {"droid": env}
-
-                    async with await env.new_context() as context:
-                        # Parse the Gherkin content to extract scenarios
-                        scenarios = []
-                        current_scenario = []
-                        for line in steps.split('\n'):
-                            if line.strip().startswith('Scenario:'):
-                                if current_scenario:
-                                    scenarios.append('\n'.join(current_scenario))
-                                current_scenario = [line]
-                            elif current_scenario:
-                                current_scenario.append(line)
-                        if current_scenario:
-                            scenarios.append('\n'.join(current_scenario))
-
-                        # Execute each scenario separately
-                        all_results = []
-                        all_actions = []
-                        all_extracted_content = []
-                        element_xpath_map = {}
-
-                        initial_actions = [
-                            {'go_to_url': {'url': 'https://ftc-sso.fortinet.com', 'new_tab': False}},
-                        ]
-
-                        for scenario in scenarios:
-                            browser_agent = AgentClass(
-                                task=generate_browser_task(scenario),
-                                initial_actions=initial_actions,
-                                llm=ChatOpenAI(model="gpt-4o"),
-                                use_vision=False,
-                                controller=controller,
-                                **agent_kwargs,
-                            )
-
-                            # Execute and collect results
-                            history = await browser_agent.run()
-                            history.save_to_file("agent_history.json")
-                            result = history.final_result()
-                            if isinstance(result, str):
-                                # Convert string result to JSON format
-                                result = {"status": result, "details": "Execution completed"}
-                            all_results.append(result)
-
-                            # Log all model actions for debugging
-                            st.write("Debug - Model Actions:", history.model_actions())
-
-                            # Process model actions to extract element details
-                            for i, action_data in enumerate(history.model_actions()):
-                                action_name = history.action_names()[i] if i < len(history.action_names()) else "Unknown Action"
-
-                                # Create a detail record for each action
-                                action_detail = {
-                                    "name": action_name,
-                                    "index": i,
-                                    "element_details": {}
-                                }
-
-                                # Check if this is a get_xpath_of_element action
-                                if "get_xpath_of_element" in action_data:
-                                    element_index = action_data["get_xpath_of_element"].get("index")
-                                    action_detail["element_details"]["index"] = element_index
-
-                                    # Check if the interacted_element field contains XPath information
-                                    if "interacted_element" in action_data and action_data["interacted_element"]:
-                                        element_info = action_data["interacted_element"]
-
-                                        # Extract XPath from the DOMHistoryElement string
-                                        xpath_match = re.search(r"xpath='([^']+)'", str(element_info))
-                                        if xpath_match:
-                                            xpath = xpath_match.group(1)
-                                            element_xpath_map[element_index] = xpath
-                                            action_detail["element_details"]["xpath"] = xpath
-
-                                # Check if this is an action on an element
-                                elif any(key in action_data for key in ["input_text", "click_element", "perform_element_action"]):
-                                    # Find the action parameters
-                                    for key in ["input_text", "click_element", "perform_element_action"]:
-                                        if key in action_data:
-                                            action_params = action_data[key]
-                                            if "index" in action_params:
-                                                element_index = action_params["index"]
-                                                action_detail["element_details"]["index"] = element_index
-
-                                                # If we have already captured the XPath for this element, add it
-                                                if element_index in element_xpath_map:
-                                                    action_detail["element_details"]["xpath"] = element_xpath_map[element_index]
-
-                                                # Also check interacted_element
-                                                if "interacted_element" in action_data and action_data["interacted_element"]:
-                                                    element_info = action_data["interacted_element"]
-                                                    xpath_match = re.search(r"xpath='([^']+)'", str(element_info))
-                                                    if xpath_match:
-                                                        xpath = xpath_match.group(1)
-                                                        element_xpath_map[element_index] = xpath
-                                                        action_detail["element_details"]["xpath"] = xpath
-
-                                all_actions.append(action_detail)
-
-                            # Also extract from content if available
-                            for content in history.extracted_content():
-                                all_extracted_content.append(content)
-
-                                # Look for XPath information in extracted content
-                                if isinstance(content, str):
-                                    xpath_match = re.search(r"The xpath of the element is (.+)", content)
-                                    if xpath_match:
-                                        xpath = xpath_match.group(1)
-                                        # Try to match with an element index from previous actions
-                                        index_match = re.search(r"element (\d+)", content)
-                                        if index_match:
-                                            element_index = int(index_match.group(1))
-                                            element_xpath_map[element_index] = xpath
-
-                        # Save combined history to session state
-                        st.session_state.history = {
-                            "urls": history.urls(),
-                            "action_names": history.action_names(),
-                            "detailed_actions": all_actions,
-                            "element_xpaths": element_xpath_map,
-                            "extracted_content": all_extracted_content,
-                            "errors": history.errors(),
-                            "model_actions": history.model_actions(),
-                            "execution_date": st.session_state.get("execution_date", "Unknown")
-                        }
-
-                        device_info = {}
-                        if selected_platform == "Mobile":
-                            try:
-                                driver = getattr(context, "driver", None)
-                                if driver is not None:
-                                    if hasattr(driver, "execute_script"):
-                                        info = driver.execute_script("mobile: deviceInfo")
-                                        if asyncio.iscoroutine(info):
-                                            info = await info
-                                        device_info = info
-                                    elif hasattr(driver, "capabilities"):
-                                        device_info = driver.capabilities
-                            except Exception as e:
-                                device_info = {"error": str(e)}
-
-                        # Display test execution details
-                        st.markdown('<div class="status-success fade-in">Test execution completed!</div>', unsafe_allow_html=True)
-
-                        # Display key information in tabs
-                        st.markdown('<div class="tab-container fade-in">', unsafe_allow_html=True)
-                        tab1, tab2, tab3, tab4, tab5 = st.tabs(["Results", "Actions", "Elements", "Details", "Device Info"])
-                        with tab1:
-                            for i, result in enumerate(all_results):
-                                st.markdown(f'<h4 class="glow-text">Scenario {i+1}</h4>', unsafe_allow_html=True)
-                                st.json(result)
-
-                        with tab2:
-                            st.markdown('<h4 class="glow-text">Actions Performed</h4>', unsafe_allow_html=True)
-                            for i, action in enumerate(all_actions):
-                                action_text = f"{i+1}. {action['name']}"
-                                if 'element_details' in action and action['element_details']:
-                                    if 'xpath' in action['element_details']:
-                                        action_text += f" (XPath: {action['element_details']['xpath']})"
-                                    elif 'index' in action['element_details']:
-                                        action_text += f" (Element index: {action['element_details']['index']})"
-                                st.write(action_text)
-
-                        with tab3:
-                            st.markdown('<h4 class="glow-text">Element Details</h4>', unsafe_allow_html=True)
-                            if element_xpath_map:
-                                # Create a dataframe for better visualization
-                                import pandas as pd
-                                element_df = pd.DataFrame([
-                                    {"Element Index": index, "XPath": xpath}
-                                    for index, xpath in element_xpath_map.items()
-                                ])
-                                st.dataframe(element_df)
-                            else:
-                                st.info("No element XPaths were captured during test execution.")
-
-                                # Display raw DOM information for debugging
-                                st.markdown('<h4 class="glow-text">Raw DOM Information</h4>', unsafe_allow_html=True)
-                                for i, action_data in enumerate(history.model_actions()):
-                                    if "interacted_element" in action_data and action_data["interacted_element"]:
-                                        st.write(f"Action {i}: {history.action_names()[i] if i < len(history.action_names()) else 'Unknown'}")
-                                        st.code(str(action_data["interacted_element"]))
-
-                        with tab4:
-                            st.markdown('<h4 class="glow-text">Extracted Content</h4>', unsafe_allow_html=True)
-                            for content in all_extracted_content:
-                                st.write(content)
-                        with tab5:
-                            if device_info:
-                                st.markdown('<h4 class="glow-text">Device Information</h4>', unsafe_allow_html=True)
-                                st.json(device_info)
-                            else:
-                                st.info("No device information available.")
-                        st.markdown('</div>', unsafe_allow_html=True)
-
-                except Exception as e:
-                    st.markdown(f'<div class="status-error">An error occurred during test execution: {str(e)}</div>', unsafe_allow_html=True)
-
+            # Use the edited steps for execution
+            if "run_id" not in st.session_state:
+                st.session_state.run_id = new_run_id()
             st.session_state.execution_date = "February 26, 2025"
-            asyncio.run(execute_test(steps_to_execute))  # Use steps_to_execute instead of generated_steps
+            st.session_state.executing_steps = st.session_state.edited_steps
+            st.session_state.pop("execution", None)
+            submit_job("execute", "execute", {
+                "steps": st.session_state.edited_steps,
+                "platform": selected_platform,
+                "max_parallel": int(max_parallel),
+                "run_id": st.session_state.run_id,
+                "replay": use_replay,
+                "setup": setup_scenario.strip() or None,
+                "share_setup": share_setup,
+            })
+
+    if "execute" in st.session_state.get("jobs", {}):
+        # Display the scenarios that are being executed
+        st.markdown('<div class="card code-container fade-in">', unsafe_allow_html=True)
+        st.markdown('<h4 class="glow-text">Executing Scenarios:</h4>', unsafe_allow_html=True)
+        st.code(st.session_state.executing_steps, language="gherkin")
+        st.markdown('</div>', unsafe_allow_html=True)
+    execute_job = finished_job("execute", "Executing test steps...")
+    if execute_job is not None:
+        if execute_job["status"] == SUCCEEDED:
+            st.session_state.execution = execute_job["result"]
+            # Save combined history to session state
+            st.session_state.history = {
+                **execute_job["result"]["history"],
+                "execution_date": st.session_state.get("execution_date", "Unknown")
+            }
+        else:
+            st.markdown(f'<div class="status-error">An error occurred during test execution: {execute_job.get("error")}</div>', unsafe_allow_html=True)
+    if "execution" in st.session_state:
+        render_execution_results(st.session_state.execution)
+
     # Code Generation Section
     if generate_code_btn:
         if "edited_steps" not in st.session_state or "history" not in st.session_state:
             st.markdown('<div class="status-error">Please generate and execute a Gherkin scenario first.</div>', unsafe_allow_html=True)
         else:
-            with st.spinner(f"Generating {selected_framework} automation code..."):
-                try:
-                    # Get the appropriate generator function
-                    generator_function = FRAMEWORK_GENERATORS[selected_framework]
-
-                    # Generate automation code using the edited steps instead of generated_steps
-                    automation_code = generator_function(
-                        st.session_state.edited_steps,  # Use edited_steps instead of generated_steps
-                        st.session_state.history
-                    )
-
-                    # Store in session state
-                    st.session_state.automation_code = automation_code
-
-                    # Display code
-                    st.markdown('<div class="card code-container fade-in">', unsafe_allow_html=True)
-                    st.markdown(f'<h3 class="glow-text">Generated {selected_framework} Automation Code</h3>', unsafe_allow_html=True)
-
-                    # Use appropriate language for syntax highlighting
-                    code_language = "python"
-                    if selected_framework == "Cypress (JavaScript)":
-                        code_language = "javascript"
-                    elif selected_framework == "Robot Framework":
-                        code_language = "robot"
-                    elif selected_framework == "Selenium + Cucumber (Java)":
-                        code_language = "java"
-
-                    st.code(automation_code, language=code_language)
-                    st.markdown('</div>', unsafe_allow_html=True)
-
-                    # Extract feature name for file naming - use edited_steps instead of generated_steps
-                    feature_name = "automated_test"
-                    feature_match = re.search(r"Feature:\s*(.+?)(?:\n|$)", st.session_state.edited_steps)
-                    if feature_match:
-                        feature_name = feature_match.group(1).strip().replace(" ", "_").lower()
-
-                    # Get appropriate file extension
-                    file_ext = FRAMEWORK_EXTENSIONS[selected_framework]
-
-                    # Add download button
-                    col1, col2, col3 = st.columns([1, 2, 1])
-                    with col2:
-                        st.download_button(
-                            label=f"📥 Download {selected_framework} Code",
-                            data=automation_code,
-                            file_name=f"{feature_name}_automation.{file_ext}",
-                            mime="text/plain",
-                        )
-
-                    st.markdown('<div class="status-success fade-in">Automation code generated successfully!</div>', unsafe_allow_html=True)
-
-                except Exception as e:
-                    st.markdown(f'<div class="status-error">Error generating {selected_framework} code: {str(e)}</div>', unsafe_allow_html=True)
+            # Generate automation code using the edited steps instead of generated_steps
+            st.session_state.codegen_framework = selected_framework
+            st.session_state.pop("automation_code", None)
+            submit_job("codegen", "codegen", {
+                "framework": selected_framework,
+                "steps": st.session_state.edited_steps,
+                "history": st.session_state.history,
+                "use_cache": use_cache,
+                "run_id": st.session_state.get("run_id"),
+            })
+
+    codegen_framework = st.session_state.get("codegen_framework", selected_framework)
+    # The code is streamed into the code view as it is written
+    codegen_job = finished_job(
+        "codegen",
+        f"Generating {codegen_framework} automation code...",
+        language=code_language(codegen_framework),
+    )
+    if codegen_job is not None:
+        if codegen_job["status"] == SUCCEEDED:
+            st.session_state.automation_code = codegen_job["result"]
+            st.markdown('<div class="status-success fade-in">Automation code generated successfully!</div>', unsafe_allow_html=True)
+        else:
+            st.markdown(f'<div class="status-error">Error generating {codegen_framework} code: {codegen_job.get("error")}</div>', unsafe_allow_html=True)
+
+    if "automation_code" in st.session_state:
+        automation_code = st.session_state.automation_code
+
+        # Display code
+        st.markdown('<div class="card code-container fade-in">', unsafe_allow_html=True)
+        st.markdown(f'<h3 class="glow-text">Generated {codegen_framework} Automation Code</h3>', unsafe_allow_html=True)
+        st.code(automation_code, language=code_language(codegen_framework))
+        st.markdown('</div>', unsafe_allow_html=True)
+
+        # Extract feature name for file naming - use edited_steps instead of generated_steps
+        feature_name = extract_feature_name(st.session_state.get("edited_steps", ""))
+
+        # Get appropriate file extension
+        file_ext = FRAMEWORK_EXTENSIONS[codegen_framework]
+
+        # Add download button
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col2:
+            st.download_button(
+                label=f"📥 Download {codegen_framework} Code",
+                data=automation_code,
+                file_name=f"{feature_name}_automation.{file_ext}",
+                mime="text/plain",
+            )
+
+    # All Frameworks Generation Section
+    if generate_all_btn:
+        if "edited_steps" not in st.session_state or "history" not in st.session_state:
+            st.markdown('<div class="status-error">Please generate and execute a Gherkin scenario first.</div>', unsafe_allow_html=True)
+        else:
+            st.session_state.pop("generated_code", None)
+            submit_job("codegen_all", "codegen_all", {
+                "steps": st.session_state.edited_steps,
+                "history": st.session_state.history,
+                "use_cache": use_cache,
+                "run_id": st.session_state.get("run_id"),
+            })
+
+    codegen_all_job = finished_job("codegen_all", "Generating automation code for all frameworks...")
+    if codegen_all_job is not None:
+        if codegen_all_job["status"] == SUCCEEDED:
+            st.session_state.generated_code = codegen_all_job["result"]
+        else:
+            st.markdown(f'<div class="status-error">Error generating code: {codegen_all_job.get("error")}</div>', unsafe_allow_html=True)
+
+    if "generated_code" in st.session_state:
+        generated_code = st.session_state.generated_code
+        for framework, generated in generated_code.items():
+            if "error" in generated:
+                st.markdown(f'<div class="status-error">Error generating {framework} code: {generated["error"]}</div>', unsafe_allow_html=True)
+
+        succeeded = [framework for framework, generated in generated_code.items() if "code" in generated]
+        if succeeded:
+            feature_name = extract_feature_name(st.session_state.get("edited_steps", ""))
+            col1, col2, col3 = st.columns([1, 2, 1])
+            with col2:
+                st.download_button(
+                    label=f"📥 Download All Frameworks ({len(succeeded)})",
+                    data=build_code_archive(generated_code, feature_name),
+                    file_name=f"{feature_name}_automation.zip",
+                    mime="application/zip",
+                )
+            st.markdown(f'<div class="status-success fade-in">Generated code for {len(succeeded)} of {len(generated_code)} frameworks.</div>', unsafe_allow_html=True)
 
     # Footer
     render_footer()
 
+    # Poll running jobs without blocking; every rerun only reads the job store
+    if st.session_state.jobs_pending:
+        time.sleep(POLL_INTERVAL)
+        st.rerun()
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,73 @@
+"""Benchmark of running a mobile feature on several devices at once.
+
+Starts the fake Appium server with a session creation delay and a per
+request latency, then runs a feature on ``--devices`` capability sets::
+
+    python -m benchmarks.device_matrix --devices 4 --session-delay 1 --latency 0.02
+
+The output compares the wall time of the matrix with the summed time of the
+devices, and reports the sessions created and requests made per command.
+Needs the Appium Python client, but no Appium server or device.
+"""
+import argparse
+import json
+import os
+import sys
+from typing import List, Optional
+
+from benchmarks.fake_appium import FakeAppiumServer
+from src.Utilities.appium_pool import AppiumSessionPool
+from src.Utilities.device_matrix import execute_device_matrix
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark of mobile execution on several devices at once")
+    parser.add_argument("--devices", type=int, default=3, help="Number of device capability sets")
+    parser.add_argument("--session-delay", type=float, default=1.0, help="Seconds the fake server takes to create a session")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds added to every request")
+    parser.add_argument("--feature", default=os.path.join(FIXTURES_DIR, "mobile_login.feature"))
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    with open(args.feature, encoding="utf-8") as handle:
+        feature = handle.read()
+    devices = [
+        {
+            "platformName": "Android",
+            "appium:automationName": "UiAutomator2",
+            "appium:deviceName": f"emulator-{5554 + 2 * i}",
+            "appium:appPackage": "com.example.app",
+        }
+        for i in range(args.devices)
+    ]
+    server = FakeAppiumServer(session_delay=args.session_delay, latency=args.latency).start()
+    pool = AppiumSessionPool(max_sessions=args.devices)
+    try:
+        matrix = execute_device_matrix(feature, server.url, devices, pool=pool)
+    finally:
+        pool.close()
+        server.stop()
+
+    results = {
+        "devices": args.devices,
+        "duration": matrix["duration"],
+        "device_time": matrix["device_time"],
+        "slowest_device": max(device["duration"] for device in matrix["devices"]),
+        "errors": [f"{device['device']}: {device['error']}" for device in matrix["devices"] if device["error"]],
+        "matrix": matrix["matrix"],
+        "pool": pool.to_dict(),
+        "requests": server.state.requests,
+    }
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(output + "\n")
+    else:
+        print(output)
+    return 1 if results["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
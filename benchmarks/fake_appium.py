@@ -0,0 +1,264 @@
+import argparse
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+# W3C key of element references in responses
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+# Screens of the fake app: accessibility id -> screen a tap leads to (None stays on the screen)
+DEFAULT_SCREENS: Dict[str, Dict[str, Optional[str]]] = {
+    "login": {"username": None, "password": None, "login_button": "home"},
+    "home": {"welcome": None, "settings_button": "settings", "logout_button": "login"},
+    "settings": {"dark_mode": None, "back_button": "home"},
+}
+
+SESSION_PATH = re.compile(r"^/session/([^/]+)(/.*)?$")
+ELEMENT_PATH = re.compile(r"^/element/([^/]+)/(click|value|text|displayed|clear)$")
+
+
+class FakeSession:
+    """State of one session: the app's current screen and the text typed into fields."""
+
+    def __init__(self, capabilities: Dict[str, Any], first_screen: str):
+        self.capabilities = capabilities
+        self.first_screen = first_screen
+        self.screen = first_screen
+        self.running = True
+        self.fields: Dict[str, str] = {}
+
+
+class FakeAppiumState:
+    """Sessions and request counters shared by the handler threads."""
+
+    def __init__(self, screens: Dict[str, Dict[str, Optional[str]]], session_delay: float, latency: float):
+        self.screens = screens
+        self.first_screen = next(iter(screens))
+        # Seconds a new session takes, standing in for app install and launch
+        self.session_delay = session_delay
+        # Seconds added to every request, standing in for the round trip to a device
+        self.latency = latency
+        self.sessions: Dict[str, FakeSession] = {}
+        self.requests: Dict[str, int] = {}
+        self.sessions_created = 0
+        self.lock = threading.Lock()
+
+    def count(self, command: str) -> None:
+        with self.lock:
+            self.requests[command] = self.requests.get(command, 0) + 1
+
+
+class FakeAppiumHandler(BaseHTTPRequestHandler):
+    """Serves the subset of the W3C/Appium protocol used by the mobile executor."""
+
+    def log_message(self, format, *args):
+        # Keep benchmark output clean
+        pass
+
+    @property
+    def state(self) -> FakeAppiumState:
+        return self.server.state
+
+    def _send(self, value: Any, status: int = 200) -> None:
+        content = json.dumps({"value": value}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _error(self, error: str, message: str, status: int = 404) -> None:
+        self._send({"error": error, "message": message, "stacktrace": ""}, status)
+
+    def _body(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _route(self, method: str) -> None:
+        if self.state.latency:
+            time.sleep(self.state.latency)
+        body = self._body() if method == "POST" else {}
+        path = self.path.rstrip("/")
+        if path == "/status":
+            self.state.count("status")
+            self._send({"ready": True, "message": "Fake Appium server"})
+            return
+        if path == "/session" and method == "POST":
+            self._new_session(body)
+            return
+        match = SESSION_PATH.match(path)
+        if match is None:
+            self._error("unknown command", f"{method} {path}")
+            return
+        session = self.state.sessions.get(match.group(1))
+        if session is None:
+            self._error("invalid session id", f"No session {match.group(1)}")
+            return
+        self._session_command(method, match.group(1), session, match.group(2) or "", body)
+
+    def _new_session(self, body: Dict[str, Any]) -> None:
+        capabilities = dict(body.get("capabilities", {}).get("alwaysMatch") or body.get("desiredCapabilities") or {})
+        time.sleep(self.state.session_delay)
+        session_id = uuid.uuid4().hex
+        with self.state.lock:
+            self.state.sessions[session_id] = FakeSession(capabilities, self.state.first_screen)
+            self.state.sessions_created += 1
+        self.state.count("new_session")
+        self._send({"sessionId": session_id, "capabilities": capabilities})
+
+    def _session_command(self, method: str, session_id: str, session: FakeSession, path: str, body: Dict[str, Any]) -> None:
+        if path == "" and method == "DELETE":
+            self.state.count("delete_session")
+            with self.state.lock:
+                self.state.sessions.pop(session_id, None)
+            self._send(None)
+        elif path in ("/window/rect", "/window/size"):
+            self.state.count("window_rect")
+            self._send({"x": 0, "y": 0, "width": 1080, "height": 2340})
+        elif path == "/element" and method == "POST":
+            self.state.count("find_element")
+            self._find_element(session, body)
+        elif path in ("/appium/device/terminate_app", "/appium/device/activate_app"):
+            self.state.count(path.rsplit("/", 1)[1])
+            self._app_command(session, path.endswith("activate_app"))
+        elif path == "/appium/device/current_activity":
+            self.state.count("current_activity")
+            self._send(session.screen if session.running else None)
+        elif path == "/source":
+            self.state.count("source")
+            elements = "".join(f'<node content-desc="{name}"/>' for name in self.state.screens[session.screen])
+            self._send(f'<hierarchy screen="{session.screen}">{elements}</hierarchy>')
+        elif path == "/execute/sync" and method == "POST":
+            self._execute(session, body)
+        else:
+            match = ELEMENT_PATH.match(path)
+            if match is None:
+                self._error("unknown command", f"{method} {path}")
+                return
+            self.state.count(match.group(2))
+            self._element_command(session, match.group(1), match.group(2), body)
+
+    def _find_element(self, session: FakeSession, body: Dict[str, Any]) -> None:
+        name = body.get("value")
+        if body.get("using") not in ("accessibility id", "id") or not session.running or name not in self.state.screens[session.screen]:
+            self._error("no such element", f"No element {name!r} on screen {session.screen}")
+            return
+        self._send({ELEMENT_KEY: f"{session.screen}:{name}"})
+
+    def _element_command(self, session: FakeSession, element_id: str, command: str, body: Dict[str, Any]) -> None:
+        screen, _, name = element_id.partition(":")
+        if screen != session.screen or not session.running:
+            self._error("stale element reference", f"Element {element_id} is not on screen {session.screen}")
+            return
+        if command == "click":
+            target = self.state.screens[screen].get(name)
+            if target is not None:
+                session.screen = target
+            self._send(None)
+        elif command == "value":
+            session.fields[name] = session.fields.get(name, "") + (body.get("text") or "".join(body.get("value") or []))
+            self._send(None)
+        elif command == "clear":
+            session.fields.pop(name, None)
+            self._send(None)
+        elif command == "text":
+            self._send(session.fields.get(name, name))
+        else:
+            self._send(True)
+
+    def _app_command(self, session: FakeSession, activate: bool) -> None:
+        if activate:
+            if not session.running:
+                session.running = True
+                session.screen = session.first_screen
+                session.fields.clear()
+        else:
+            session.running = False
+        self._send(True if not activate else None)
+
+    def _execute(self, session: FakeSession, body: Dict[str, Any]) -> None:
+        script = body.get("script", "")
+        self.state.count(script)
+        if script == "mobile: terminateApp":
+            self._app_command(session, False)
+        elif script == "mobile: activateApp":
+            self._app_command(session, True)
+        elif script == "mobile: deviceInfo":
+            capabilities = session.capabilities
+            self._send({
+                "platformName": capabilities.get("platformName", "Android"),
+                "deviceName": capabilities.get("appium:deviceName", capabilities.get("deviceName", "fake-device")),
+                "platformVersion": capabilities.get("appium:platformVersion", "14"),
+                "model": "Fake Appium device",
+            })
+        else:
+            self._error("unsupported operation", f"Unknown script {script!r}", status=500)
+
+    def do_GET(self):
+        self._route("GET")
+
+    def do_POST(self):
+        self._route("POST")
+
+    def do_DELETE(self):
+        self._route("DELETE")
+
+
+class FakeAppiumServer:
+    """Local stand-in for an Appium server and device, served from a background thread.
+
+    It keeps a small app of screens and accessibility ids in memory, so the
+    session pool and the mobile executor can run without a device. Every
+    request is counted per command in ``state.requests``.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        screens: Optional[Dict[str, Dict[str, Optional[str]]]] = None,
+        session_delay: float = 0.0,
+        latency: float = 0.0,
+    ):
+        self.server = ThreadingHTTPServer((host, port), FakeAppiumHandler)
+        self.server.daemon_threads = True
+        self.server.state = FakeAppiumState(screens or DEFAULT_SCREENS, session_delay, latency)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def state(self) -> FakeAppiumState:
+        return self.server.state
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeAppiumServer":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-appium", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake Appium server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4723)
+    parser.add_argument("--session-delay", type=float, default=2.0, help="Seconds to create a session")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request")
+    args = parser.parse_args()
+    server = FakeAppiumServer(args.host, args.port, session_delay=args.session_delay, latency=args.latency)
+    print(f"Fake Appium server listening on {server.url}")
+    server.server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+import argparse
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+SCENARIO_PATTERN = re.compile(r"Scenario(?: Outline)?:\s*(.+)")
+ELEMENT_LINE_PATTERN = re.compile(r"^\s*\*?\[(\d+)\]\s*(<.*)$", re.MULTILINE)
+# Characters per streamed chunk; roughly a few tokens like the real API
+STREAM_CHUNK_CHARS = 16
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+def message_text(message: Dict[str, Any]) -> str:
+    """Text of a chat message whose content is a string or a list of parts"""
+    content = message.get("content")
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "\n".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return ""
+
+
+class LLMScript:
+    """Canned responses of the fake LLM.
+
+    ``agent`` maps scenario names to the steps a browser agent should take,
+    one list of actions per agent step. An ``index`` given as ``"@text"`` is
+    resolved against the interactive elements in the browser state sent with
+    the request, so scripts do not depend on element numbering. Scenarios
+    without a script use ``default_agent``. ``completions`` are matched in
+    order against the request text for every other call (Gherkin and code
+    generation); the first whose ``match`` regex is found is returned.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        self.agent: Dict[str, List[Any]] = data.get("agent", {})
+        self.default_agent: List[Any] = data.get("default_agent", [])
+        self.completions: List[Dict[str, Any]] = data.get("completions", [])
+        self.default_completion: str = data.get("default_completion", "OK")
+        self._steps: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> "LLMScript":
+        with open(path, encoding="utf-8") as handle:
+            return cls(json.load(handle))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._steps.clear()
+
+    def completion(self, text: str) -> str:
+        for completion in self.completions:
+            if re.search(completion["match"], text):
+                return completion["content"]
+        return self.default_completion
+
+    def agent_step(self, text: str, state: str) -> Dict[str, Any]:
+        """Return the next agent output for the scenario mentioned in the request"""
+        match = SCENARIO_PATTERN.search(text)
+        scenario = match.group(1).strip() if match else ""
+        steps = self.agent.get(scenario, self.default_agent)
+        # Replicated scenarios are named "<name> #<n>" and share the script of <name>
+        if scenario not in self.agent and "#" in scenario:
+            steps = self.agent.get(scenario.rsplit("#", 1)[0].strip(), steps)
+        with self._lock:
+            number = self._steps.get(scenario, 0)
+            self._steps[scenario] = number + 1
+
+        if number >= len(steps):
+            actions = [{"done": {"text": f"Scenario '{scenario}' completed", "success": True}}]
+        else:
+            step = steps[number]
+            actions = step if isinstance(step, list) else [step]
+            try:
+                actions = [self._resolve(action, state) for action in actions]
+            except LookupError as e:
+                actions = [{"done": {"text": str(e), "success": False}}]
+        return {
+            "thinking": f"Executing step {number + 1} of '{scenario}'",
+            "evaluation_previous_goal": "Success",
+            "memory": f"Completed {number} steps",
+            "next_goal": f"Perform step {number + 1}",
+            "action": actions,
+        }
+
+    @staticmethod
+    def _resolve(action: Dict[str, Any], state: str) -> Dict[str, Any]:
+        resolved = {}
+        for name, params in action.items():
+            params = dict(params or {})
+            index = params.get("index")
+            if isinstance(index, str) and index.startswith("@"):
+                needle = index[1:]
+                for element_index, line in ELEMENT_LINE_PATTERN.findall(state):
+                    if needle in line:
+                        params["index"] = int(element_index)
+                        break
+                else:
+                    raise LookupError(f"No element matching '{needle}' on the page")
+            resolved[name] = params
+        return resolved
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    """Minimal OpenAI-compatible chat completions endpoint."""
+
+    server: "FakeLLMHTTPServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, data: Dict[str, Any], status: int = 200) -> None:
+        content = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json({"object": "list", "data": [{"id": "gpt-4o", "object": "model"}]})
+        else:
+            self._send_json({"error": {"message": "Not found"}}, status=404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        path = self.path.rstrip("/")
+        if path.endswith("/_reset"):
+            self.server.script.reset()
+            self._send_json({"status": "ok"})
+            return
+        if not path.endswith("/chat/completions"):
+            self._send_json({"error": {"message": "Not found"}}, status=404)
+            return
+
+        content, prompt_tokens = self.server.respond(request)
+        completion_tokens = estimate_tokens(content)
+        time.sleep(self.server.latency + completion_tokens * self.server.token_latency)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        if request.get("stream"):
+            self._stream(request, content, usage)
+        else:
+            self._send_json({
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "gpt-4o"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            })
+
+    def _stream(self, request: Dict[str, Any], content: str, usage: Dict[str, int]) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        model = request.get("model", "gpt-4o")
+
+        def send(choices: List[Dict[str, Any]], **extra: Any) -> None:
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": choices,
+                **extra,
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        send([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+        for start in range(0, len(content), STREAM_CHUNK_CHARS):
+            send([{"index": 0, "delta": {"content": content[start:start + STREAM_CHUNK_CHARS]}, "finish_reason": None}])
+        send([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if (request.get("stream_options") or {}).get("include_usage"):
+            send([], usage=usage)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class FakeLLMHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], script: LLMScript, latency: float, token_latency: float):
+        super().__init__(address, FakeLLMHandler)
+        self.script = script
+        self.latency = latency
+        self.token_latency = token_latency
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def respond(self, request: Dict[str, Any]) -> Tuple[str, int]:
+        """Return the response content and prompt token count for a request"""
+        with self._lock:
+            self.requests += 1
+        messages = request.get("messages", [])
+        text = "\n".join(message_text(message) for message in messages)
+        response_format = request.get("response_format") or {}
+        schema = (response_format.get("json_schema") or {}).get("schema")
+        # Structured output requests come from the browser agent
+        if schema is not None or "<browser_state>" in text:
+            state = message_text(messages[-1]) if messages else ""
+            output = self.script.agent_step(text, state)
+            properties = (schema or {}).get("properties")
+            if properties:
+                output = {key: value for key, value in output.items() if key in properties}
+            return json.dumps(output), estimate_tokens(text)
+        return self.script.completion(text), estimate_tokens(text)
+
+
+class FakeLLM:
+    """Fake OpenAI-compatible chat API served from a background thread."""
+
+    def __init__(
+        self,
+        script: LLMScript,
+        latency: float = 0.0,
+        token_latency: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.server = FakeLLMHTTPServer((host, port), script, latency, token_latency)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def requests(self) -> int:
+        return self.server.requests
+
+    def reset(self) -> None:
+        """Restart every scenario script from its first step"""
+        self.server.script.reset()
+
+    def start(self) -> "FakeLLM":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a scripted OpenAI-compatible chat API")
+    parser.add_argument("--script", required=True, help="Path to the LLM script JSON file")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8002)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Seconds added per completion token")
+    args = parser.parse_args()
+    llm = FakeLLM(LLMScript.load(args.script), args.latency, args.token_latency, args.host, args.port)
+    print(f"Fake LLM listening on {llm.base_url}")
+    llm.server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import argparse
+import html
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+# Credentials accepted by the login page
+USERNAME = "admin"
+PASSWORD = "secret"
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>{title}</title></head>
+<body>
+<nav><a href="/login">Login</a> | <a href="/form">Contact form</a></nav>
+<main>
+<h1>{title}</h1>
+{body}
+</main>
+</body>
+</html>
+"""
+
+LOGIN_BODY = """{error}
+<form id="login-form" method="post" action="/login">
+  <label for="username">Username</label>
+  <input id="username" name="username" type="text" placeholder="Username">
+  <label for="password">Password</label>
+  <input id="password" name="password" type="password" placeholder="Password">
+  <button id="login-button" type="submit">Sign in</button>
+</form>
+"""
+
+DASHBOARD_BODY = """<p id="welcome">Welcome, {username}!</p>
+<ul>
+  <li><a href="/form">Contact form</a></li>
+  <li><a id="logout" href="/login">Log out</a></li>
+</ul>
+"""
+
+FORM_BODY = """<form id="contact-form" method="post" action="/form">
+  <label for="full-name">Full name</label>
+  <input id="full-name" name="full_name" type="text" placeholder="Full name">
+  <label for="email">Email</label>
+  <input id="email" name="email" type="email" placeholder="Email">
+  <label for="topic">Topic</label>
+  <select id="topic" name="topic">
+    <option value="support">Support</option>
+    <option value="sales">Sales</option>
+  </select>
+  <label for="message">Message</label>
+  <textarea id="message" name="message" placeholder="Message"></textarea>
+  <label><input id="subscribe" name="subscribe" type="checkbox"> Subscribe</label>
+  <button id="send-button" type="submit">Send message</button>
+</form>
+"""
+
+SUBMITTED_BODY = """<p id="confirmation">Thank you, {full_name}! Your message was sent.</p>
+<a href="/form">Send another message</a>
+"""
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Serves a small login and contact form application."""
+
+    def log_message(self, format, *args):
+        # Keep benchmark output clean
+        pass
+
+    def _send_page(self, title: str, body: str, status: int = 200) -> None:
+        content = PAGE_TEMPLATE.format(title=title, body=body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _redirect(self, location: str) -> None:
+        self.send_response(303)
+        self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _form_data(self) -> Dict[str, str]:
+        length = int(self.headers.get("Content-Length") or 0)
+        data = parse_qs(self.rfile.read(length).decode("utf-8"))
+        return {key: values[0] for key, values in data.items()}
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if url.path in ("/", "/login"):
+            error = '<p id="login-error" role="alert">Invalid username or password</p>' if "error" in query else ""
+            self._send_page("Login", LOGIN_BODY.format(error=error))
+        elif url.path == "/dashboard":
+            self._send_page("Dashboard", DASHBOARD_BODY.format(username=html.escape(query.get("user", USERNAME))))
+        elif url.path == "/form":
+            self._send_page("Contact form", FORM_BODY)
+        elif url.path == "/submitted":
+            self._send_page("Message sent", SUBMITTED_BODY.format(full_name=html.escape(query.get("name", ""))))
+        else:
+            self._send_page("Not found", "<p>Page not found</p>", status=404)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        data = self._form_data()
+        if url.path == "/login":
+            if data.get("username") == USERNAME and data.get("password") == PASSWORD:
+                self._redirect(f"/dashboard?user={data['username']}")
+            else:
+                self._redirect("/login?error=1")
+        elif url.path == "/form":
+            self._redirect(f"/submitted?name={data.get('full_name', '')}")
+        else:
+            self._send_page("Not found", "<p>Page not found</p>", status=404)
+
+
+class FixtureSite:
+    """Fixture application served from a background thread."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.server = ThreadingHTTPServer((host, port), FixtureHandler)
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FixtureSite":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fixture-site", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the benchmark fixture site")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    args = parser.parse_args()
+    site = FixtureSite(args.host, args.port)
+    print(f"Fixture site listening on {site.base_url}")
+    site.server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
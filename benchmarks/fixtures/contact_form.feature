@@ -0,0 +1,14 @@
+Feature: Contact form
+  As a visitor
+  I want to send a message through the contact form
+  So that the support team can get back to me
+
+  @regression @form
+  Scenario: Submit the contact form
+    Given the user is on the login page
+    When the user clicks the "Contact form" link
+    And the user enters "Jane Doe" into the "Full name" field
+    And the user enters "jane@example.com" into the "Email" field
+    And the user enters "Hello there" into the "Message" field
+    And the user clicks the "Send message" button
+    Then the user should see "Thank you, Jane Doe! Your message was sent."
@@ -0,0 +1,20 @@
+Feature: User login
+  As a registered user
+  I want to sign in to the application
+  So that I can reach my dashboard
+
+  @smoke @login
+  Scenario: Successful login
+    Given the user is on the login page
+    When the user enters "admin" into the "Username" field
+    And the user enters "secret" into the "Password" field
+    And the user clicks the "Sign in" button
+    Then the user should see "Welcome, admin!"
+
+  @negative @login
+  Scenario: Login with an invalid password
+    Given the user is on the login page
+    When the user enters "admin" into the "Username" field
+    And the user enters "wrong" into the "Password" field
+    And the user clicks the "Sign in" button
+    Then the user should see "Invalid username or password"
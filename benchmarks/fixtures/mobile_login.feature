@@ -0,0 +1,19 @@
+Feature: Mobile login
+  As a registered user
+  I want to sign in to the mobile app
+  So that I can change my settings
+
+  Background:
+    Given I should see "username"
+
+  Scenario: Successful login
+    When I enter "admin" into "username"
+    And I enter "secret" into "password"
+    And I tap "login_button"
+    Then I should see "welcome"
+
+  Scenario: Open the settings
+    When I tap "login_button"
+    And I tap "settings_button"
+    And I tap "dark_mode"
+    Then I should see "back_button"
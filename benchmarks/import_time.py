@@ -0,0 +1,145 @@
+"""Import-time benchmark: startup cost of the app and of each heavy module.
+
+Every target is imported in a fresh interpreter with ``-X importtime``, so
+results do not depend on what an earlier target already loaded::
+
+    python -m benchmarks.import_time --repeat 5 --output imports.json
+    python -m benchmarks.import_time --baseline imports.json --tolerance 0.3
+
+The ``app`` target runs every top-level import of ``app.py`` together, which
+is what a cold Streamlit start pays before the first page renders. Each
+target reports the median import time and the modules that took longest.
+With ``--baseline`` the run exits with status 1 when a target got slower than
+the baseline by more than the tolerance.
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.run import compare, summarize
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modules whose import cost matters on their own, besides the app as a whole
+DEFAULT_MODULES = (
+    "src.Utilities.pipeline",
+    "src.Utilities.jobs",
+    "src.Utilities.utils",
+    "src.Prompts.agno_prompts",
+    "src.Prompts.mobile_prompts",
+    "src.Agents.agents",
+    "src.Agents.mobile_agents",
+    "src.Agents.registry",
+    "src.frontend.ui",
+)
+# Number of slowest modules listed per target
+HEAVIEST = 5
+
+
+def app_imports(path: str = os.path.join(ROOT, "app.py")) -> List[str]:
+    """Top-level import statements of the Streamlit app"""
+    with open(path, encoding="utf-8") as handle:
+        tree = ast.parse(handle.read())
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """(module, depth, self µs, cumulative µs) for every line of ``-X importtime`` output"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return entries
+
+
+def run_importtime(statement: str) -> Tuple[Optional[List[Tuple[str, int, int, int]]], str]:
+    """Run a statement in a fresh interpreter; return its import entries, or None and the error"""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if process.returncode != 0:
+        error_lines = [line for line in process.stderr.splitlines() if not line.startswith("import time:")]
+        return None, error_lines[-1] if error_lines else f"exit status {process.returncode}"
+    return parse_importtime(process.stderr), ""
+
+
+def measure(statement: str, startup: set) -> Tuple[Optional[float], List[Dict[str, Any]], str]:
+    """Seconds spent importing for ``statement`` and its slowest modules, leaving out interpreter startup"""
+    entries, error = run_importtime(statement)
+    if entries is None:
+        return None, [], error
+    # Entries at depth 0 are imported by the statement itself; their cumulative time includes their children
+    total_us = sum(cumulative for name, depth, _, cumulative in entries if depth == 0 and name not in startup)
+    heaviest = sorted(
+        (entry for entry in entries if entry[0] not in startup), key=lambda entry: entry[2], reverse=True
+    )[:HEAVIEST]
+    return total_us / 1e6, [{"module": name, "self": round(self_us / 1e6, 4)} for name, _, self_us, _ in heaviest], ""
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    startup_entries, error = run_importtime("pass")
+    startup = {name for name, *_ in startup_entries or []}
+    targets = {"app": "; ".join(app_imports())}
+    targets.update({module: f"import {module}" for module in args.modules})
+
+    results: Dict[str, Any] = {}
+    errors = [f"startup: {error}"] if error else []
+    for target, statement in targets.items():
+        samples = []
+        heaviest: List[Dict[str, Any]] = []
+        for _ in range(args.repeat):
+            seconds, heaviest, error = measure(statement, startup)
+            if seconds is None:
+                errors.append(f"{target}: {error}")
+                break
+            samples.append(seconds)
+        if samples:
+            results[target] = {**summarize(samples), "heaviest": heaviest}
+    return {
+        "python": sys.version.split()[0],
+        "repeat": args.repeat,
+        "modules": results,
+        "errors": errors,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Import-time benchmark of the FortiAgent app and modules")
+    parser.add_argument("--modules", default=",".join(DEFAULT_MODULES), help="Comma separated modules to time besides the app")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per target")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout")
+    parser.add_argument("--baseline", help="Results of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="Allowed slowdown relative to the baseline")
+    args = parser.parse_args(argv)
+    args.modules = [module.strip() for module in args.modules.split(",") if module.strip()]
+
+    results = run_benchmark(args)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(output + "\n")
+    else:
+        print(output)
+
+    if results["errors"]:
+        print("Errors:\n  " + "\n  ".join(results["errors"]), file=sys.stderr)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            regressions = compare(results, json.load(handle), args.tolerance, sections=("modules",))
+        if regressions:
+            print("Regressions:\n  " + "\n  ".join(regressions), file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
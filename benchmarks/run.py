@@ -0,0 +1,325 @@
+"""Offline end-to-end benchmark of the Gherkin -> execute -> codegen pipeline.
+
+Runs the pipeline against the local fixture site with the fake LLM standing
+in for the OpenAI API, so results only depend on this code base::
+
+    python -m benchmarks.run --scenarios 4 --repeat 3 --output bench.json
+    python -m benchmarks.run --baseline bench.json --tolerance 0.2
+
+The output is a JSON document with wall time per stage, per-stage LLM usage,
+browser action latency and memory. With ``--baseline`` the run exits with
+status 1 when a stage got slower than the baseline by more than the tolerance.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import re
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.fake_llm import FakeLLM, LLMScript
+from benchmarks.fixture_site import FixtureSite
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FEATURE_FILES = ("login.feature", "contact_form.feature")
+STAGES = ("gherkin", "execute", "codegen", "elements")
+
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    """Median, spread and raw samples of a measurement in seconds"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0}
+    return {
+        "count": len(ordered),
+        "median": round(statistics.median(ordered), 4),
+        "min": round(ordered[0], 4),
+        "max": round(ordered[-1], 4),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+        "samples": [round(sample, 4) for sample in samples],
+    }
+
+
+def current_rss_kb() -> int:
+    """Resident set size of this process in KiB, or its peak where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def load_scenarios(count: int) -> str:
+    """Build a feature with ``count`` scenarios by cycling through the fixture scenarios"""
+    blocks = []
+    for name in FEATURE_FILES:
+        with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as handle:
+            content = handle.read()
+        # Split at the blank line before each scenario, keeping its tags
+        blocks.extend(re.split(r"\n\s*\n(?=[ \t]*(?:@|Scenario:))", content)[1:])
+    scenarios = []
+    for i in range(count):
+        block = blocks[i % len(blocks)].rstrip()
+        if i >= len(blocks):
+            # Unique names keep the fake LLM's per-scenario scripts apart
+            block = re.sub(r"(Scenario:\s*.+)", rf"\1 #{i // len(blocks) + 1}", block, count=1)
+        scenarios.append(block)
+    return "Feature: Benchmark\n\n" + "\n\n".join(scenarios) + "\n"
+
+
+class ActionTimer:
+    """Times every controller action the browser agent executes."""
+
+    def __init__(self, controller: Any):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self._actions = controller.registry.registry.actions
+        self._originals: Dict[str, Callable] = {}
+
+    def __enter__(self) -> "ActionTimer":
+        for name, action in self._actions.items():
+            self._originals[name] = action.function
+            action.function = self._timed(name, action.function)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        for name, function in self._originals.items():
+            self._actions[name].function = function
+
+    def _timed(self, name: str, function: Callable) -> Callable:
+        async def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await function(*args, **kwargs)
+            finally:
+                self.samples[name].append(time.perf_counter() - started)
+
+        return timed
+
+
+async def measure_element_info(base_url: str, rounds: int) -> Dict[str, List[float]]:
+    """Time single and batched element introspection on the fixture form page"""
+    from playwright.async_api import async_playwright
+    from src.Utilities.utils import get_detailed_element_info, get_detailed_elements_info
+
+    samples: Dict[str, List[float]] = defaultdict(list)
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(headless=True)
+        try:
+            page = await browser.new_page()
+            await page.goto(f"{base_url}/form")
+            xpaths = await page.evaluate("""() => Array.from(
+                document.querySelectorAll('a, input, select, textarea, button'),
+                element => {
+                    const parts = [];
+                    for (let node = element; node && node.nodeType === 1; node = node.parentNode) {
+                        const siblings = Array.from(node.parentNode ? node.parentNode.children : [])
+                            .filter(sibling => sibling.tagName === node.tagName);
+                        parts.unshift(node.tagName.toLowerCase() + '[' + (siblings.indexOf(node) + 1) + ']');
+                    }
+                    return '/' + parts.join('/');
+                })""")
+            nodes = {index: SimpleNamespace(xpath=xpath) for index, xpath in enumerate(xpaths)}
+            for _ in range(rounds):
+                for node in nodes.values():
+                    element = await page.query_selector(f"xpath={node.xpath}")
+                    started = time.perf_counter()
+                    await get_detailed_element_info(element, node, page)
+                    samples["single_element"].append(time.perf_counter() - started)
+                started = time.perf_counter()
+                await get_detailed_elements_info(page, nodes)
+                samples["all_elements"].append(time.perf_counter() - started)
+        finally:
+            await browser.close()
+    return samples
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    script = LLMScript.load(args.script)
+    site = FixtureSite().start()
+    llm = FakeLLM(script, latency=args.latency, token_latency=args.token_latency).start()
+    telemetry_path = os.path.join(tempfile.mkdtemp(prefix="fortiagent-bench-"), "llm_calls.jsonl")
+
+    # Must be configured before the agents and telemetry modules are imported
+    os.environ.update({
+        "OPENAI_BASE_URL": llm.base_url,
+        "OPENAI_API_KEY": os.environ.get("FORTIAGENT_BENCH_API_KEY", "benchmark"),
+        "FORTIAGENT_START_URL": f"{site.base_url}/login",
+        "FORTIAGENT_CACHE_DISABLED": "1",
+        "FORTIAGENT_TELEMETRY_PATH": telemetry_path,
+    })
+
+    import_started = time.perf_counter()
+    from browser_use import Browser
+    from src.Prompts.agno_prompts import generate_all_frameworks, generate_gherkin_scenarios
+    from src.Utilities.pipeline import FRAMEWORK_GENERATORS, execute_test
+    from src.Utilities.runtime import get_runtime
+    from src.Utilities.telemetry import aggregate, current_run_id, load_records, new_run_id
+    from src.Utilities.utils import controller
+    import_time = time.perf_counter() - import_started
+
+    with open(os.path.join(FIXTURES_DIR, "manual_test_cases.md"), encoding="utf-8") as handle:
+        manual_test_cases = handle.read()
+    feature = load_scenarios(args.scenarios)
+    stages = [stage for stage in args.stages.split(",") if stage]
+
+    runtime = get_runtime()
+    runtime.prewarm("Browser", lambda: Browser(headless=True))
+
+    timings: Dict[str, List[float]] = defaultdict(list)
+    memory: Dict[str, List[int]] = defaultdict(list)
+    action_samples: Dict[str, List[float]] = defaultdict(list)
+    run_ids: List[str] = []
+    errors: List[str] = []
+
+    def timed_stage(stage: str, function: Callable[[], Any]) -> Any:
+        rss_before = current_rss_kb()
+        started = time.perf_counter()
+        try:
+            return function()
+        except Exception as e:
+            errors.append(f"{stage}: {e}")
+            return None
+        finally:
+            timings[stage].append(time.perf_counter() - started)
+            memory[stage].append(current_rss_kb() - rss_before)
+
+    try:
+        for iteration in range(args.repeat):
+            llm.reset()
+            run_id = new_run_id()
+            run_ids.append(run_id)
+            started = time.perf_counter()
+
+            if "gherkin" in stages:
+                timed_stage("gherkin", lambda: generate_gherkin_scenarios(manual_test_cases, use_cache=False))
+
+            execution = None
+            if "execute" in stages:
+                with ActionTimer(controller) as action_timer:
+                    execution = timed_stage("execute", lambda: runtime.run(
+                        execute_test(
+                            feature, "Browser", args.max_parallel, run_id, env_factory=lambda: Browser(headless=True)
+                        )
+                    ))
+                for name, samples in action_timer.samples.items():
+                    action_samples[name].extend(samples)
+                if execution is not None:
+                    errors.extend(
+                        f"execute {scenario['name']}: {scenario['error'] or scenario['status']}"
+                        for scenario in execution["scenarios"]
+                        if scenario["status"] != "passed"
+                    )
+
+            if "codegen" in stages:
+                history = execution["history"] if execution is not None else {}
+                generated = timed_stage("codegen", lambda: generate_all_frameworks(
+                    feature, history, FRAMEWORK_GENERATORS, use_cache=False
+                ))
+                for framework, result in (generated or {}).items():
+                    if "error" in result:
+                        errors.append(f"codegen {framework}: {result['error']}")
+
+            timings["end_to_end"].append(time.perf_counter() - started)
+            print(f"Iteration {iteration + 1}/{args.repeat}: {timings['end_to_end'][-1]:.2f}s", file=sys.stderr)
+
+        element_samples: Dict[str, List[float]] = {}
+        if "elements" in stages:
+            element_samples = timed_stage("elements", lambda: asyncio.run(
+                measure_element_info(site.base_url, args.element_rounds)
+            )) or {}
+    finally:
+        current_run_id.set(None)
+        runtime.run(runtime.shutdown())
+        llm.stop()
+        site.stop()
+
+    records = [record for run_id in run_ids for record in load_records(run_id)]
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scenarios": args.scenarios,
+            "repeat": args.repeat,
+            "max_parallel": args.max_parallel,
+            "llm_latency": args.latency,
+            "llm_token_latency": args.token_latency,
+            "llm_requests": llm.requests,
+            "import_time": round(import_time, 4),
+        },
+        "stages": {stage: summarize(samples) for stage, samples in timings.items()},
+        "llm": aggregate(records),
+        "actions": {name: summarize(samples) for name, samples in sorted(action_samples.items())},
+        "element_info": {name: summarize(samples) for name, samples in element_samples.items()},
+        "memory": {
+            "stage_rss_delta_kb": {stage: max(deltas) for stage, deltas in memory.items()},
+            "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        },
+        "errors": errors,
+    }
+
+
+def compare(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float,
+    sections: Tuple[str, ...] = ("stages", "actions", "element_info"),
+) -> List[str]:
+    """Measurements whose median got slower than the baseline by more than ``tolerance``"""
+    regressions = []
+    for section in sections:
+        for name, current in results.get(section, {}).items():
+            previous = baseline.get(section, {}).get(name)
+            if not previous or not previous.get("median") or "median" not in current:
+                continue
+            if current["median"] > previous["median"] * (1 + tolerance):
+                regressions.append(
+                    f"{section}.{name}: median {current['median']:.4f}s vs baseline {previous['median']:.4f}s"
+                )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark of the FortiAgent pipeline")
+    parser.add_argument("--scenarios", type=int, default=3, help="Number of scenarios executed per iteration")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of iterations")
+    parser.add_argument("--max-parallel", type=int, default=2, help="Scenarios executed at the same time")
+    parser.add_argument("--stages", default=",".join(STAGES), help="Comma separated stages to run")
+    parser.add_argument("--element-rounds", type=int, default=20, help="Rounds of the element introspection benchmark")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake LLM seconds per response")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Fake LLM seconds per completion token")
+    parser.add_argument("--script", default=os.path.join(FIXTURES_DIR, "llm_script.json"), help="Fake LLM script")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout")
+    parser.add_argument("--baseline", help="Results of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown relative to the baseline")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(output + "\n")
+    else:
+        print(output)
+
+    if results["errors"]:
+        print("Errors:\n  " + "\n  ".join(results["errors"]), file=sys.stderr)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            regressions = compare(results, json.load(handle), args.tolerance)
+        if regressions:
+            print("Regressions:\n  " + "\n  ".join(regressions), file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,316 @@
+"""Headless batch runner for directories of .feature files and user stories.
+
+    python cli.py features/ stories/login.md --jobs 2 --max-parallel 4 --output-dir artifacts
+
+``.feature`` files are executed as they are; user stories and manual test
+cases (``.md``/``.txt``) are turned into Gherkin first. Every file gets a
+directory of artifacts (feature, per-scenario results, traces and agent
+histories, generated code) and the run writes ``summary.json`` and
+``junit.xml`` to the output directory. The exit status is 1 when any
+scenario did not pass.
+
+With ``--devices devices.json`` (a JSON list of Appium capability sets) the
+files are run on every device at once through Appium instead, and each file
+gets a per-device result matrix.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from browser_use import Browser
+from src.Agents.registry import private_agents
+from src.Prompts.agno_prompts import generate_all_frameworks, generate_gherkin_scenarios
+from src.Utilities.device_matrix import execute_device_matrix
+from src.Utilities.execution import DEFAULT_MAX_CONCURRENCY
+from src.Utilities.pipeline import (
+    FRAMEWORK_GENERATORS,
+    code_file_name,
+    execute_test,
+    extract_feature_name,
+    framework_slug,
+)
+from src.Utilities.runtime import get_runtime
+from src.Utilities.telemetry import aggregate, load_records, new_run_id
+
+load_dotenv()
+
+FEATURE_EXTENSIONS = (".feature",)
+DEFAULT_APPIUM_URL = os.environ.get("FORTIAGENT_APPIUM_URL", "http://127.0.0.1:4723")
+STORY_EXTENSIONS = (".md", ".txt")
+
+
+def collect_inputs(paths: List[str]) -> List[str]:
+    """Feature and user story files given directly or found under the given directories"""
+    extensions = FEATURE_EXTENSIONS + STORY_EXTENSIONS
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in names if name.endswith(extensions))
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            raise FileNotFoundError(f"No such file or directory: {path}")
+    return sorted(dict.fromkeys(files))
+
+
+def select_frameworks(value: str) -> Dict[str, Any]:
+    """Generators for a comma separated list of framework names or slugs, 'all' or 'none'"""
+    if value == "all":
+        return dict(FRAMEWORK_GENERATORS)
+    if value == "none":
+        return {}
+    by_key = {}
+    for framework, generator in FRAMEWORK_GENERATORS.items():
+        by_key[framework.lower()] = (framework, generator)
+        by_key[framework_slug(framework)] = (framework, generator)
+    selected = {}
+    for name in (name.strip().lower() for name in value.split(",") if name.strip()):
+        if name not in by_key:
+            choices = ", ".join(framework_slug(framework) for framework in FRAMEWORK_GENERATORS)
+            raise argparse.ArgumentTypeError(f"Unknown framework '{name}', choose from: {choices}")
+        framework, generator = by_key[name]
+        selected[framework] = generator
+    return selected
+
+
+def write_json(path: str, data: Any) -> None:
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(data, handle, indent=2, default=str)
+
+
+async def execute_file(
+    gherkin: str,
+    feature_name: str,
+    run_id: str,
+    args: argparse.Namespace,
+    output_dir: str,
+    record: Dict[str, Any],
+) -> None:
+    """Execute a feature on the browser or device of the runtime and generate its code"""
+    env_factory = (lambda: Browser(headless=not args.headed)) if args.platform == "Browser" else None
+    execution = await execute_test(
+        gherkin,
+        args.platform,
+        args.max_parallel,
+        run_id,
+        env_factory=env_factory,
+        replay=args.replay,
+        setup=args.setup,
+        share_setup=args.share_setup,
+    )
+    record["setup"] = execution["setup"]
+
+    for i, scenario in enumerate(execution["scenarios"], 1):
+        scenario_dir = os.path.join(output_dir, f"scenario_{i:03d}")
+        os.makedirs(scenario_dir, exist_ok=True)
+        agent_history = scenario.pop("agent_history", None)
+        trace = scenario.pop("trace", None)
+        if agent_history is not None:
+            agent_history.save_to_file(os.path.join(scenario_dir, "agent_history.json"))
+        if trace is not None:
+            write_json(os.path.join(scenario_dir, "trace.json"), trace)
+        write_json(os.path.join(scenario_dir, "result.json"), scenario)
+        record["scenarios"].append(scenario)
+
+    if args.generators:
+        generated = await asyncio.to_thread(
+            generate_all_frameworks,
+            gherkin,
+            execution["history"],
+            args.generators,
+            use_cache=args.use_cache,
+        )
+        for framework, result in generated.items():
+            if "code" in result:
+                code_path = os.path.join(output_dir, "code", code_file_name(framework, feature_name))
+                os.makedirs(os.path.dirname(code_path), exist_ok=True)
+                with open(code_path, "w", encoding="utf-8") as handle:
+                    handle.write(result["code"])
+                record["code"][framework] = code_path
+            else:
+                record["code"][framework] = {"error": result["error"]}
+
+
+def run_device_matrix(gherkin: str, args: argparse.Namespace, output_dir: str, record: Dict[str, Any]) -> None:
+    """Execute a feature on every device of ``--devices`` at once"""
+    matrix = execute_device_matrix(gherkin, args.appium_url, args.devices)
+    for device in matrix["devices"]:
+        device_dir = os.path.join(output_dir, framework_slug(device["device"]))
+        for i, scenario in enumerate(device["scenarios"], 1):
+            scenario_dir = os.path.join(device_dir, f"scenario_{i:03d}")
+            os.makedirs(scenario_dir, exist_ok=True)
+            write_json(os.path.join(scenario_dir, "history.json"), scenario.pop("history"))
+            write_json(os.path.join(scenario_dir, "result.json"), scenario)
+            record["scenarios"].append({**scenario, "name": f"{scenario['name']} [{device['device']}]"})
+        if device["error"]:
+            # The device failed before it ran every scenario
+            record["scenarios"].append({
+                "name": f"{device['device']} session",
+                "status": "error",
+                "error": device["error"],
+                "duration": device["duration"],
+            })
+    record["devices"] = matrix
+
+
+def generate_gherkin(content: str, use_cache: bool) -> str:
+    """Generate Gherkin in a worker thread; other files may be generating at the same time, so use agents of its own"""
+    with private_agents():
+        return generate_gherkin_scenarios(content, use_cache=use_cache)
+
+
+async def run_file(path: str, name: str, args: argparse.Namespace, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    """Generate, execute and generate code for one input file, writing its artifacts under ``name``"""
+    async with semaphore:
+        # Each file runs in its own task, so its LLM calls are grouped under its own run id
+        run_id = new_run_id()
+        started = time.perf_counter()
+        output_dir = os.path.join(args.output_dir, name)
+        os.makedirs(output_dir, exist_ok=True)
+        record: Dict[str, Any] = {"file": path, "run_id": run_id, "scenarios": [], "code": {}, "error": None}
+        print(f"[{name}] started", file=sys.stderr)
+
+        try:
+            with open(path, encoding="utf-8") as handle:
+                content = handle.read()
+            if path.endswith(FEATURE_EXTENSIONS):
+                gherkin = content
+            else:
+                gherkin = await asyncio.to_thread(generate_gherkin, content, args.use_cache)
+            feature_name = extract_feature_name(gherkin)
+            record["feature"] = feature_name
+            with open(os.path.join(output_dir, f"{feature_name}.feature"), "w", encoding="utf-8") as handle:
+                handle.write(gherkin)
+
+            if args.devices:
+                # Device runs execute the steps through Appium; the code generators target browsers
+                await asyncio.to_thread(run_device_matrix, gherkin, args, output_dir, record)
+            else:
+                await execute_file(gherkin, feature_name, run_id, args, output_dir, record)
+        except Exception as e:
+            record["error"] = str(e)
+
+        record["duration"] = round(time.perf_counter() - started, 3)
+        record["llm"] = aggregate(load_records(run_id))
+        write_json(os.path.join(output_dir, "summary.json"), record)
+        statuses = [scenario["status"] for scenario in record["scenarios"]]
+        print(
+            f"[{name}] {statuses.count('passed')}/{len(statuses)} scenarios passed in {record['duration']}s"
+            + (f" (error: {record['error']})" if record["error"] else ""),
+            file=sys.stderr,
+        )
+        return record
+
+
+async def run_batch(files: List[str], args: argparse.Namespace) -> List[Dict[str, Any]]:
+    semaphore = asyncio.Semaphore(max(1, args.jobs))
+    names = [os.path.splitext(os.path.basename(path))[0] for path in files]
+    # Files with the same name in different directories get numbered artifact directories
+    names = [f"{name}_{i + 1}" if names.count(name) > 1 else name for i, name in enumerate(names)]
+    return await asyncio.gather(*(run_file(path, name, args, semaphore) for path, name in zip(files, names)))
+
+
+def summarize(records: List[Dict[str, Any]], duration: float) -> Dict[str, Any]:
+    """Totals over every file and scenario of a batch"""
+    statuses = [scenario["status"] for record in records for scenario in record["scenarios"]]
+    return {
+        "files": len(records),
+        "files_with_errors": sum(1 for record in records if record["error"]),
+        "scenarios": len(statuses),
+        "passed": statuses.count("passed"),
+        "failed": statuses.count("failed"),
+        "incomplete": statuses.count("incomplete"),
+        "errors": statuses.count("error"),
+        "duration": round(duration, 3),
+    }
+
+
+def build_junit(records: List[Dict[str, Any]]) -> ET.ElementTree:
+    """JUnit XML report with one test suite per input file and one test case per scenario"""
+    root = ET.Element("testsuites")
+    for record in records:
+        scenarios = record["scenarios"]
+        suite = ET.SubElement(root, "testsuite", {
+            "name": record.get("feature") or record["file"],
+            "file": record["file"],
+            "tests": str(len(scenarios) + (1 if record["error"] else 0)),
+            "failures": str(sum(1 for scenario in scenarios if scenario["status"] in ("failed", "incomplete"))),
+            "errors": str(sum(1 for scenario in scenarios if scenario["status"] == "error") + (1 if record["error"] else 0)),
+            "time": str(record["duration"]),
+        })
+        for scenario in scenarios:
+            case = ET.SubElement(suite, "testcase", {
+                "classname": record.get("feature") or record["file"],
+                "name": scenario["name"],
+                "time": str(round(scenario.get("duration") or 0.0, 3)),
+            })
+            message = scenario.get("error") or json.dumps(scenario.get("result"), default=str)
+            if scenario["status"] == "error":
+                ET.SubElement(case, "error", {"message": message}).text = scenario.get("error")
+            elif scenario["status"] != "passed":
+                ET.SubElement(case, "failure", {"message": f"Scenario {scenario['status']}: {message}"})
+        if record["error"]:
+            case = ET.SubElement(suite, "testcase", {"classname": record["file"], "name": "setup", "time": "0"})
+            ET.SubElement(case, "error", {"message": record["error"]})
+    ET.indent(root)
+    return ET.ElementTree(root)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run Gherkin generation, execution and code generation headlessly")
+    parser.add_argument("paths", nargs="+", help=".feature files, user stories (.md/.txt) or directories of them")
+    parser.add_argument("--output-dir", default="artifacts", help="Directory receiving artifacts and reports")
+    parser.add_argument("--platform", choices=("Browser", "Mobile"), default="Browser")
+    parser.add_argument("--jobs", type=int, default=1, help="Files processed at the same time")
+    parser.add_argument("--max-parallel", type=int, default=DEFAULT_MAX_CONCURRENCY, help="Scenarios executed at the same time per file")
+    parser.add_argument("--frameworks", default="all", help="Comma separated frameworks to generate code for, 'all' or 'none'")
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false", help="Bypass the Gherkin and code caches")
+    parser.add_argument("--no-replay", dest="replay", action="store_false", help="Always run the agent instead of replaying recorded steps")
+    parser.add_argument("--setup", help="File with Gherkin steps run once per file instead of the Background, e.g. a login scenario")
+    parser.add_argument("--no-shared-setup", dest="share_setup", action="store_false", help="Run the Background inside every scenario instead of once per file")
+    parser.add_argument("--headed", action="store_true", help="Show the browser window")
+    parser.add_argument("--devices", help="JSON file with a list of Appium capability sets to run every file on at once")
+    parser.add_argument("--appium-url", default=DEFAULT_APPIUM_URL, help="Appium server used with --devices")
+    args = parser.parse_args(argv)
+    try:
+        args.generators = select_frameworks(args.frameworks)
+        files = collect_inputs(args.paths)
+        if args.setup:
+            with open(args.setup, encoding="utf-8") as handle:
+                args.setup = handle.read()
+        if args.devices:
+            with open(args.devices, encoding="utf-8") as handle:
+                args.devices = json.load(handle)
+            if not isinstance(args.devices, list) or not all(isinstance(device, dict) for device in args.devices):
+                raise argparse.ArgumentTypeError("--devices must contain a JSON list of capability objects")
+    except (argparse.ArgumentTypeError, OSError, ValueError) as e:
+        parser.error(str(e))
+    if not files:
+        parser.error("No .feature, .md or .txt files found")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    runtime = get_runtime()
+    started = time.perf_counter()
+    try:
+        # Run on the shared runtime so every file reuses the same warm browser
+        records = runtime.run(run_batch(files, args))
+    finally:
+        runtime.run(runtime.shutdown())
+
+    summary = summarize(records, time.perf_counter() - started)
+    write_json(os.path.join(args.output_dir, "summary.json"), {"summary": summary, "files": records})
+    build_junit(records).write(os.path.join(args.output_dir, "junit.xml"), encoding="utf-8", xml_declaration=True)
+    print(json.dumps(summary), file=sys.stderr)
+    return 0 if summary["passed"] == summary["scenarios"] and not summary["files_with_errors"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,136 +1,155 @@
 import os
-from agno.agent import Agent
-from agno.tools.reasoning import ReasoningTools
-from agno.models.openai import OpenAIChat
-from dotenv import load_dotenv
 from textwrap import dedent
+from typing import Any
+
+from dotenv import load_dotenv
 
 load_dotenv()
 
-# Initialize the agents
-gherkhin_agent = Agent(
-    model=OpenAIChat(id="gpt-4o", api_key=os.environ.get("OPENAI_API_KEY")),
-    markdown=True,
-    description=dedent("""
-    You are a highly skilled Quality Assurance (QA) expert specializing in
-    converting detailed manual test cases (which are derived from user stories and
-    acceptance criteria) into comprehensive, well-structured, and human-readable
-    Gherkin scenarios and scenario outlines. You understand that Gherkin serves
-    as living documentation and a communication tool for the whole team. Your goal
-    is to create Gherkin feature files that accurately represent the desired
-    behavior, are easy to understand for both technical and non-technical
-    stakeholders, and serve as a solid foundation for test automation.
-    """),
-    instructions=dedent("""
-    Analyze the provided input, which is a set of detailed manual test cases.
-    Each manual test case represents a specific scenario or example of how the
-    system should behave based on the original user story and its acceptance criteria.
-
-        Your task is to convert these manual test cases into comprehensive and
-        well-structured Gherkin scenarios and scenario outlines within a single
-        Feature file.
-
-        **Best Practices for Gherkin Generation:**
-
-        1.  **Feature Description:** Start the output with a clear and concise `Feature:` description that summarizes the overall functionality being tested. This should align with the user story's main goal.
-        2.  **Scenario vs. Scenario Outline:**
-            *   Use a `Scenario:` for individual test cases that cover a unique flow or specific set of inputs/outcomes.
-            *   Use a `Scenario Outline:` when multiple manual test cases cover the *same* workflow or steps but with *different test data* (inputs and potentially expected simple outcomes). Extract the varying data into an `Examples:` table below the Scenario Outline and use placeholders (< >) in the steps. This promotes the DRY (Don't Repeat Yourself) principle.
-        3.  **Descriptive Titles:** Use clear, concise, and action-oriented titles for both `Scenario` and `Scenario Outline`, derived from the manual test case titles or descriptions. The title should quickly convey the purpose of the scenario.
-        4.  **Tags:** Apply relevant and meaningful `@tags` above each Scenario or Scenario Outline (e.g., `@smoke`, `@regression`, `@login`, `@negative`, `@boundary`). Consider tags based on the test case type, priority, or related feature area to aid in test execution filtering and reporting.
-        5.  **Structured Steps (Given/When/Then/And/But):**
-            *   `Given`: Describe the initial context or preconditions required to perform the test (e.g., "Given the user is logged in", "Given the product is out of stock"). These set the scene. Avoid user interaction details here.
-            *   `When`: Describe the specific action or event that triggers the behavior being tested (e.g., "When the user adds the item to the cart", "When invalid credentials are provided"). There should ideally be only one main `When` per scenario.
-            *   `Then`: Describe the expected outcome or result after the action is performed. This verifies the behavior (e.g., "Then the item should appear in the cart", "Then an error message should be displayed"). This should directly map to the Expected Result in the manual test case.
-            *   `And` / `But`: Use these to extend a previous Given, When, or Then step. `And` is typically for additive conditions or actions, while `But` can be used for negative conditions (though `And not` is often clearer). Limit the number of `And` steps to maintain readability.
-        6.  **Level of Abstraction (What, Not How):** Write Gherkin steps at a high level, focusing on the *intent* and *behavior* (what the system does or what the user achieves) rather than the technical implementation details (how it's done, e.g., "click button X", "fill field Y"). Abstract away UI interactions where possible.
-        7.  **Clarity and Readability:** Use plain, unambiguous language that is easy for both technical and non-technical team members to understand. Avoid technical jargon. Maintain consistent phrasing. Use empty lines to separate scenarios for better readability.
-        8.  **Background:** If multiple scenarios within the feature file share the same initial preconditions, consider using a `Background:` section at the top of the feature file. This reduces repetition but ensure it doesn't make scenarios harder to understand.
-        9.  **Traceability (Optional but Recommended):** If the manual test cases reference user story or requirement IDs (e.g., Jira IDs), you can include these as tags or comments (using `#`) near the Feature or Scenario title for traceability.
-
-        Convert each relevant manual test case into one or more Gherkin scenarios/scenario outlines based on the above principles. Ensure the generated Gherkin accurately reflects the preconditions, steps, and expected results described in the manual test cases, while elevating the level of abstraction.
-
-        **IMPORTANT:** Your final output MUST be ONLY the markdown code block containing the Gherkin feature file content. Do not include any other text, explanations, or tool calls before or after the code block.
-    """),
-    # tools=[
-    #     ReasoningTools(
-    #         think=True,
-    #         analyze=True,
-    #         add_instructions=True,
-    #         add_few_shot=True,
-    #     ),
-    # ],
-    expected_output=dedent("""\
-    ```gherkin
-    Feature: [Clear and Concise Feature Description aligned with User Story]
-
-    @tag1 @tag2
-    Background:
-    Given [Common precondition 1]
-    And [Common precondition 2]
-    # Use Background for steps repeated at the start of every scenario in the file
-
-    @tag3
-    Scenario: [Descriptive Scenario Title for a specific case]
-    Given [Precondition specific to this scenario, if not in Background]
-    When [Action performed by the user or system event]
-    Then [Expected verifiable outcome 1]
-    And [Another expected outcome, if any]
-
-    @tag4 @tag5
-    Scenario Outline: [Descriptive Title for a set of similar cases with varying data]
-    Given [Precondition(s)]
-    When [Action using <placeholder>]
-    Then [Expected outcome using <placeholder>]
-    And [Another expected outcome using <placeholder>]
-
-    Examples:
-        | placeholder1 | placeholder2 | expected_outcome_data |
-        | data1_row1   | data2_row1   | outcome_data_row1     |
-        | data1_row2   | data2_row2   | outcome_data_row2     |
-        # Include columns for all placeholders in steps and relevant expected data
-
-    # Include scenarios/scenario outlines for positive, negative, edge, and boundary cases
-    # derived from the manual test cases.
-
-    # @jira-id-[number] # Optional: Add traceability tag
-    ```
-    Return ONLY the markdown code block containing the Gherkin feature file content.
-    """),
-)
-
-code_gen_agent = Agent(
-    model=OpenAIChat(id="gpt-4o", api_key=os.environ.get("OPENAI_API_KEY")),
-    markdown=True,
-    description=dedent("""
-    You are an expert test automation engineer capable of generating clean,
-    functional, and well-structured automation code in various programming
-    languages and frameworks (e.g., Python with Selenium/Playwright, JavaScript with Cypress, Java with Selenium/Cucumber, Robot Framework).
-    You translate Gherkin steps and browser interaction data into executable test scripts.
-    """),
-    instructions=dedent("""
-    Based on the provided Gherkin steps and browser interaction details (selectors, actions, URLs),
-    generate a single, self-contained test automation file in the requested format.
-    Include all necessary imports, dependencies, and helper functions.
-    Follow best practices for the specified language/framework (e.g., Page Object Model for Java, describe/it for Cypress).
-    Add clear comments and documentation where necessary.
-    Ensure the generated code is ready to be executed.
-    """),
-    # tools=[
-        # ReasoningTools(
-        # think=True,
-        # analyze=True,
-        # add_instructions=True,
-        # add_few_shot=True,
-        # ),
-    # ],
-    expected_output=dedent("""
-    ```[language_or_framework]
-    #[Feature Description (if applicable)]
-
-    #[Generated code based on instructions]
-    ...
-    ```
-    Return ONLY the code block in the specified language or framework.
-    """),
-)
+# agno is only imported when an agent is first built; see src/Agents/registry.py
+
+def build_gherkin_agent() -> Any:
+    """Agent converting manual test cases into Gherkin scenarios"""
+    from agno.agent import Agent
+    from agno.models.openai import OpenAIChat
+
+    return Agent(
+        model=OpenAIChat(id="gpt-4o", api_key=os.environ.get("OPENAI_API_KEY")),
+        markdown=True,
+        description=dedent("""
+        You are a highly skilled Quality Assurance (QA) expert specializing in
+        converting detailed manual test cases (which are derived from user stories and
+        acceptance criteria) into comprehensive, well-structured, and human-readable
+        Gherkin scenarios and scenario outlines. You understand that Gherkin serves
+        as living documentation and a communication tool for the whole team. Your goal
+        is to create Gherkin feature files that accurately represent the desired
+        behavior, are easy to understand for both technical and non-technical
+        stakeholders, and serve as a solid foundation for test automation.
+        """),
+        instructions=dedent("""
+        Analyze the provided input, which is a set of detailed manual test cases.
+        Each manual test case represents a specific scenario or example of how the
+        system should behave based on the original user story and its acceptance criteria.
+
+            Your task is to convert these manual test cases into comprehensive and
+            well-structured Gherkin scenarios and scenario outlines within a single
+            Feature file.
+
+            **Best Practices for Gherkin Generation:**
+
+            1.  **Feature Description:** Start the output with a clear and concise `Feature:` description that summarizes the overall functionality being tested. This should align with the user story's main goal.
+            2.  **Scenario vs. Scenario Outline:**
+                *   Use a `Scenario:` for individual test cases that cover a unique flow or specific set of inputs/outcomes.
+                *   Use a `Scenario Outline:` when multiple manual test cases cover the *same* workflow or steps but with *different test data* (inputs and potentially expected simple outcomes). Extract the varying data into an `Examples:` table below the Scenario Outline and use placeholders (< >) in the steps. This promotes the DRY (Don't Repeat Yourself) principle.
+            3.  **Descriptive Titles:** Use clear, concise, and action-oriented titles for both `Scenario` and `Scenario Outline`, derived from the manual test case titles or descriptions. The title should quickly convey the purpose of the scenario.
+            4.  **Tags:** Apply relevant and meaningful `@tags` above each Scenario or Scenario Outline (e.g., `@smoke`, `@regression`, `@login`, `@negative`, `@boundary`). Consider tags based on the test case type, priority, or related feature area to aid in test execution filtering and reporting.
+            5.  **Structured Steps (Given/When/Then/And/But):**
+                *   `Given`: Describe the initial context or preconditions required to perform the test (e.g., "Given the user is logged in", "Given the product is out of stock"). These set the scene. Avoid user interaction details here.
+                *   `When`: Describe the specific action or event that triggers the behavior being tested (e.g., "When the user adds the item to the cart", "When invalid credentials are provided"). There should ideally be only one main `When` per scenario.
+                *   `Then`: Describe the expected outcome or result after the action is performed. This verifies the behavior (e.g., "Then the item should appear in the cart", "Then an error message should be displayed"). This should directly map to the Expected Result in the manual test case.
+                *   `And` / `But`: Use these to extend a previous Given, When, or Then step. `And` is typically for additive conditions or actions, while `But` can be used for negative conditions (though `And not` is often clearer). Limit the number of `And` steps to maintain readability.
+            6.  **Level of Abstraction (What, Not How):** Write Gherkin steps at a high level, focusing on the *intent* and *behavior* (what the system does or what the user achieves) rather than the technical implementation details (how it's done, e.g., "click button X", "fill field Y"). Abstract away UI interactions where possible.
+            7.  **Clarity and Readability:** Use plain, unambiguous language that is easy for both technical and non-technical team members to understand. Avoid technical jargon. Maintain consistent phrasing. Use empty lines to separate scenarios for better readability.
+            8.  **Background:** If multiple scenarios within the feature file share the same initial preconditions, consider using a `Background:` section at the top of the feature file. This reduces repetition but ensure it doesn't make scenarios harder to understand.
+            9.  **Traceability (Optional but Recommended):** If the manual test cases reference user story or requirement IDs (e.g., Jira IDs), you can include these as tags or comments (using `#`) near the Feature or Scenario title for traceability.
+
+            Convert each relevant manual test case into one or more Gherkin scenarios/scenario outlines based on the above principles. Ensure the generated Gherkin accurately reflects the preconditions, steps, and expected results described in the manual test cases, while elevating the level of abstraction.
+
+            **IMPORTANT:** Your final output MUST be ONLY the markdown code block containing the Gherkin feature file content. Do not include any other text, explanations, or tool calls before or after the code block.
+        """),
+        # tools=[
+        #     ReasoningTools(
+        #         think=True,
+        #         analyze=True,
+        #         add_instructions=True,
+        #         add_few_shot=True,
+        #     ),
+        # ],
+        expected_output=dedent("""\
+        ```gherkin
+        Feature: [Clear and Concise Feature Description aligned with User Story]
+
+        @tag1 @tag2
+        Background:
+        Given [Common precondition 1]
+        And [Common precondition 2]
+        # Use Background for steps repeated at the start of every scenario in the file
+
+        @tag3
+        Scenario: [Descriptive Scenario Title for a specific case]
+        Given [Precondition specific to this scenario, if not in Background]
+        When [Action performed by the user or system event]
+        Then [Expected verifiable outcome 1]
+        And [Another expected outcome, if any]
+
+        @tag4 @tag5
+        Scenario Outline: [Descriptive Title for a set of similar cases with varying data]
+        Given [Precondition(s)]
+        When [Action using <placeholder>]
+        Then [Expected outcome using <placeholder>]
+        And [Another expected outcome using <placeholder>]
+
+        Examples:
+            | placeholder1 | placeholder2 | expected_outcome_data |
+            | data1_row1   | data2_row1   | outcome_data_row1     |
+            | data1_row2   | data2_row2   | outcome_data_row2     |
+            # Include columns for all placeholders in steps and relevant expected data
+
+        # Include scenarios/scenario outlines for positive, negative, edge, and boundary cases
+        # derived from the manual test cases.
+
+        # @jira-id-[number] # Optional: Add traceability tag
+        ```
+        Return ONLY the markdown code block containing the Gherkin feature file content.
+        """),
+    )
+
+def build_code_gen_agent() -> Any:
+    """Agent generating automation code from Gherkin and execution data"""
+    from agno.agent import Agent
+    from agno.models.openai import OpenAIChat
+
+    return Agent(
+        model=OpenAIChat(id="gpt-4o", api_key=os.environ.get("OPENAI_API_KEY")),
+        markdown=True,
+        description=dedent("""
+        You are an expert test automation engineer capable of generating clean,
+        functional, and well-structured automation code in various programming
+        languages and frameworks (e.g., Python with Selenium/Playwright, JavaScript with Cypress, Java with Selenium/Cucumber, Robot Framework).
+        You translate Gherkin steps and browser interaction data into executable test scripts.
+        """),
+        instructions=dedent("""
+        Based on the provided Gherkin steps and browser interaction details (selectors, actions, URLs),
+        generate a single, self-contained test automation file in the requested format.
+        Include all necessary imports, dependencies, and helper functions.
+        Follow best practices for the specified language/framework (e.g., Page Object Model for Java, describe/it for Cypress).
+        Add clear comments and documentation where necessary.
+        Ensure the generated code is ready to be executed.
+        """),
+        # tools=[
+            # ReasoningTools(
+            # think=True,
+            # analyze=True,
+            # add_instructions=True,
+            # add_few_shot=True,
+            # ),
+        # ],
+        expected_output=dedent("""
+        ```[language_or_framework]
+        #[Feature Description (if applicable)]
+
+        #[Generated code based on instructions]
+        ...
+        ```
+        Return ONLY the code block in the specified language or framework.
+        """),
+    )
+
+
+def __getattr__(name: str) -> Any:
+    # Keeps `from src.Agents.agents import code_gen_agent` working, building the agent on access
+    from src.Agents.registry import AGENT_ALIASES, get_agent
+
+    if name in AGENT_ALIASES:
+        return get_agent(AGENT_ALIASES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
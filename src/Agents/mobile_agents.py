@@ -1,56 +1,75 @@
 import os
 from textwrap import dedent
+from typing import Any
+
 from dotenv import load_dotenv
-from agno.agent import Agent
-from agno.models.openai import OpenAIChat
 
 load_dotenv()
 
-# Agent for converting manual mobile test cases into Gherkin scenarios
-mobile_gherkin_agent = Agent(
-    model=OpenAIChat(id="gpt-4o", api_key=os.environ.get("OPENAI_API_KEY")),
-    markdown=True,
-    description=dedent("""
-        You are a QA expert focused on testing native and hybrid mobile
-        applications on both iOS and Android platforms. Your role is to
-        transform detailed manual test cases into concise, well structured
-        Gherkin scenarios and scenario outlines.
-    """),
-    instructions=dedent("""
-        Analyze the provided manual mobile test cases and convert them into a
-        single Gherkin feature file. Follow best practices for clarity and use of
-        Scenario versus Scenario Outline. Steps should describe user intent on
-        the mobile app rather than implementation details such as specific taps
-        or swipes.
-
-        Return only a markdown code block containing the Gherkin feature file.
-    """),
-    expected_output=dedent("""
-    ```gherkin
-    Feature: [Feature name]
-        # ...
-    ```
-    """),
-)
-
-# Agent for generating Appium based PyTest code
-mobile_code_gen_agent = Agent(
-    model=OpenAIChat(id="gpt-4o", api_key=os.environ.get("OPENAI_API_KEY")),
-    markdown=True,
-    description=dedent("""
-        You are an expert mobile automation engineer. Generate executable
-        PyTest code that uses Appium to automate iOS and Android applications.
-    """),
-    instructions=dedent("""
-        Using the provided Gherkin steps and any execution details, produce a
-        single self contained Python file that utilises Appium and PyTest. Include
-        necessary imports, setup of desired capabilities, and clear comments.
-
-        Return only a python code block.
-    """),
-    expected_output=dedent("""
-    ```python
-    # [PyTest code using Appium]
-    ```
-    """),
-)
+# agno is only imported when an agent is first built; see src/Agents/registry.py
+
+def build_mobile_gherkin_agent() -> Any:
+    """Agent converting manual mobile test cases into Gherkin scenarios"""
+    from agno.agent import Agent
+    from agno.models.openai import OpenAIChat
+
+    return Agent(
+        model=OpenAIChat(id="gpt-4o", api_key=os.environ.get("OPENAI_API_KEY")),
+        markdown=True,
+        description=dedent("""
+            You are a QA expert focused on testing native and hybrid mobile
+            applications on both iOS and Android platforms. Your role is to
+            transform detailed manual test cases into concise, well structured
+            Gherkin scenarios and scenario outlines.
+        """),
+        instructions=dedent("""
+            Analyze the provided manual mobile test cases and convert them into a
+            single Gherkin feature file. Follow best practices for clarity and use of
+            Scenario versus Scenario Outline. Steps should describe user intent on
+            the mobile app rather than implementation details such as specific taps
+            or swipes.
+
+            Return only a markdown code block containing the Gherkin feature file.
+        """),
+        expected_output=dedent("""
+        ```gherkin
+        Feature: [Feature name]
+            # ...
+        ```
+        """),
+    )
+
+def build_mobile_code_gen_agent() -> Any:
+    """Agent generating Appium based PyTest code"""
+    from agno.agent import Agent
+    from agno.models.openai import OpenAIChat
+
+    return Agent(
+        model=OpenAIChat(id="gpt-4o", api_key=os.environ.get("OPENAI_API_KEY")),
+        markdown=True,
+        description=dedent("""
+            You are an expert mobile automation engineer. Generate executable
+            PyTest code that uses Appium to automate iOS and Android applications.
+        """),
+        instructions=dedent("""
+            Using the provided Gherkin steps and any execution details, produce a
+            single self contained Python file that utilises Appium and PyTest. Include
+            necessary imports, setup of desired capabilities, and clear comments.
+
+            Return only a python code block.
+        """),
+        expected_output=dedent("""
+        ```python
+        # [PyTest code using Appium]
+        ```
+        """),
+    )
+
+
+def __getattr__(name: str) -> Any:
+    # Keeps `from src.Agents.mobile_agents import mobile_gherkin_agent` working, building the agent on access
+    from src.Agents.registry import AGENT_ALIASES, get_agent
+
+    if name in AGENT_ALIASES:
+        return get_agent(AGENT_ALIASES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
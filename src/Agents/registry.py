@@ -0,0 +1,61 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+from src.Utilities.lazy import resolve
+
+# Functions building each agent, as "module:function"; agno is imported on the first build
+AGENT_FACTORIES = {
+    "gherkin": "src.Agents.agents:build_gherkin_agent",
+    "code_gen": "src.Agents.agents:build_code_gen_agent",
+    "mobile_gherkin": "src.Agents.mobile_agents:build_mobile_gherkin_agent",
+    "mobile_code_gen": "src.Agents.mobile_agents:build_mobile_code_gen_agent",
+}
+# Module attribute names the agents had when they were built at import time
+AGENT_ALIASES = {
+    "gherkhin_agent": "gherkin",
+    "code_gen_agent": "code_gen",
+    "mobile_gherkin_agent": "mobile_gherkin",
+    "mobile_code_gen_agent": "mobile_code_gen",
+}
+
+_agents: Dict[str, Any] = {}
+_agents_lock = threading.Lock()
+# Agents owned by the current task or thread, set by private_agents()
+_private_agents: ContextVar[Optional[Dict[str, Any]]] = ContextVar("fortiagent_private_agents", default=None)
+
+
+def build_agent(name: str) -> Any:
+    """Build a new agent registered under ``name``"""
+    if name not in AGENT_FACTORIES:
+        raise KeyError(f"Unknown agent: {name}")
+    return resolve(AGENT_FACTORIES[name])()
+
+
+def get_agent(name: str) -> Any:
+    """Return the agent registered under ``name``, building it on first use"""
+    private = _private_agents.get()
+    if private is not None:
+        if name not in private:
+            private[name] = build_agent(name)
+        return private[name]
+    with _agents_lock:
+        if name not in _agents:
+            _agents[name] = build_agent(name)
+        return _agents[name]
+
+
+@contextmanager
+def private_agents() -> Iterator[None]:
+    """Give the current task or thread agents of its own.
+
+    An agno Agent keeps the state of its current run on the instance, so
+    calls running at the same time must not share one. Inside this block
+    ``get_agent`` builds fresh agents instead of returning the shared ones.
+    """
+    token = _private_agents.set({})
+    try:
+        yield
+    finally:
+        _private_agents.reset(token)
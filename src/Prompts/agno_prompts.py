@@ -1,29 +1,114 @@
+import contextvars
+import functools
+import os
 import re
-from typing import Dict, Any
-import json
-
-import re
-from typing import Dict, Any
-import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Any, Optional
 import streamlit as st
 
-from src.Agents.agents import (
-    gherkhin_agent, # Import gherkhin_agent
-    code_gen_agent)
+from src.Agents.registry import get_agent, private_agents
 
 from src.Utilities.utils import (
     extract_selectors_from_history,
     analyze_actions)
 
+from src.Utilities.context_builder import build_codegen_context
+from src.Utilities.telemetry import set_agno_usage, set_context_stats, track_llm_call
+
+from src.Utilities.cache import (
+    ResponseCache,
+    agent_fingerprint,
+    digest,
+    normalize_text)
+
+# Markdown code block patterns used to extract generated code
+CODE_BLOCK_PATTERN = re.compile(r"```(?:python|gherkin|javascript|java|robot|markdown)?\n(.*?)```", re.DOTALL)
+CODE_BLOCK_START_PATTERN = re.compile(r"```(?:python|gherkin|javascript|java|robot|markdown)?\n")
+# Minimum number of seconds between streamed UI updates
+STREAM_UPDATE_INTERVAL = 0.1
+# Events closing an agno response stream, across agno versions
+COMPLETED_EVENTS = ("RunCompleted", "RunResponseCompleted")
+
+# Cache of generated Gherkin keyed on the normalized input and the agent configuration
+_gherkin_ttl = os.environ.get("FORTIAGENT_GHERKIN_CACHE_TTL")
+gherkin_cache = ResponseCache(
+    "gherkin",
+    ttl=float(_gherkin_ttl) if _gherkin_ttl else None,
+)
+
+# Cache of generated automation code keyed on Gherkin, execution trace and framework
+codegen_cache = ResponseCache("codegen", max_entries=256)
 
-def generate_gherkin_scenarios(manual_test_cases_markdown: str) -> str:
+
+def history_digest(history_data: Dict[str, Any]) -> str:
+    """Digest the parts of an execution history that feed code generation"""
+    return digest(
+        extract_selectors_from_history(history_data),
+        analyze_actions(history_data),
+        history_data.get('extracted_content', []),
+        history_data.get('urls', [])[:1],
+    )
+
+
+def cached_code_generation(framework: str, agent: str = "code_gen") -> Callable:
+    """Cache a code generator on the Gherkin text, the execution trace and the framework.
+
+    ``agent`` is the registry name of the agent, so it is only built when code is generated.
+    """
+    def decorator(generate: Callable[..., str]) -> Callable[..., str]:
+        @functools.wraps(generate)
+        def wrapper(
+            gherkin_steps: str,
+            history_data: Dict[str, Any],
+            use_cache: bool = True,
+            on_update: Optional[Callable[[str], None]] = None,
+        ) -> str:
+            gherkin_digest = digest(normalize_text(gherkin_steps))
+            trace_digest = history_digest(history_data)
+            cache_key = digest(framework, gherkin_digest, trace_digest, agent_fingerprint(get_agent(agent)))
+            if use_cache:
+                cached_code = codegen_cache.get(cache_key)
+                if cached_code is not None:
+                    return cached_code
+
+            code_content = generate(gherkin_steps, history_data, on_update=on_update)
+            codegen_cache.set(cache_key, code_content, {
+                "framework": framework,
+                "gherkin_digest": gherkin_digest,
+                "history_digest": trace_digest,
+            })
+            # Code generated for this scenario from an earlier execution is now stale
+            codegen_cache.evict(predicate=lambda meta: (
+                meta.get("framework") == framework
+                and meta.get("gherkin_digest") == gherkin_digest
+                and meta.get("history_digest") != trace_digest
+            ))
+            return code_content
+        return wrapper
+    return decorator
+
+
+def generate_gherkin_scenarios(
+    manual_test_cases_markdown: str,
+    use_cache: bool = True,
+    on_update: Optional[Callable[[str], None]] = None,
+) -> str:
     """Generate Gherkin scenarios from manual test cases using the QA agent"""
     try:
+        # Identical inputs to an identically configured agent reuse the previous generation
+        cache_key = digest(normalize_text(manual_test_cases_markdown), agent_fingerprint(get_agent("gherkin")))
+        if use_cache:
+            cached_content = gherkin_cache.get(cache_key)
+            if cached_content is not None:
+                return cached_content
+
         # The QA agent's description, instructions, and expected_output handle the Gherkin generation logic.
         # We need to provide the manual test cases as the input to the agent's run method.
-        run_response = gherkhin_agent.run(manual_test_cases_markdown)
+        response_content = run_agent(get_agent("gherkin"), manual_test_cases_markdown, on_update, stage="gherkin")
         # Extract the content from the agent's response
-        gherkin_content = extract_code_content(run_response.content)
+        gherkin_content = extract_code_content(response_content)
+        gherkin_cache.set(cache_key, gherkin_content)
         return gherkin_content
     except Exception as e:
         st.error(f"Error generating Gherkin scenarios: {str(e)}")
@@ -33,27 +118,87 @@ def generate_gherkin_scenarios(manual_test_cases_markdown: str) -> str:
 def extract_code_content(text: str) -> str:
     """Extract code from markdown code blocks if present"""
     # Look for content between triple backticks with optional language identifier
-    code_block_pattern = re.compile(r"```(?:python|gherkin|javascript|java|robot|markdown)?\n(.*?)```", re.DOTALL)
-    match = code_block_pattern.search(text)
+    match = CODE_BLOCK_PATTERN.search(text)
 
     if match:
         return match.group(1).strip()
     return text.strip()
 
-def generate_selenium_pytest_bdd(gherkin_steps: str, history_data: Dict[str, Any]) -> str:
+
+def extract_partial_code_content(text: str) -> str:
+    """Extract code from a markdown code block that may still be streaming"""
+    if CODE_BLOCK_PATTERN.search(text):
+        return extract_code_content(text)
+    opening = CODE_BLOCK_START_PATTERN.search(text)
+    if opening:
+        return text[opening.end():].strip()
+    # Hold back a fence whose language line has not fully arrived yet
+    return text.split("`", 1)[0].strip()
+
+
+def run_agent(
+    agent: Any,
+    prompt: str,
+    on_update: Optional[Callable[[str], None]] = None,
+    stage: str = "llm",
+    context_stats: Optional[Dict[str, Any]] = None,
+) -> str:
+    """Run an agent and return the response content.
+
+    When ``on_update`` is given the response is streamed and ``on_update`` is
+    called with the code extracted so far; the returned content is the same
+    as for a non-streaming run. Latency and token usage are recorded under
+    ``stage`` in the LLM telemetry, together with ``context_stats`` of
+    ``build_codegen_context`` when the prompt holds an execution context.
+    """
+    with track_llm_call(stage, getattr(agent.model, "id", "unknown")) as call:
+        set_context_stats(call, context_stats)
+        if on_update is None:
+            run_response = agent.run(prompt)
+            set_agno_usage(call, getattr(run_response, "metrics", None))
+            return run_response.content
+
+        chunks = []
+        last_update = 0.0
+        metrics = None
+        completed_content = None
+        for chunk in agent.run(prompt, stream=True):
+            # Usage comes from this stream's own events, not from the agent which
+            # another run may be using; the last event carries the totals
+            if getattr(chunk, "metrics", None) is not None:
+                metrics = chunk.metrics
+            delta = getattr(chunk, "content", None)
+            if getattr(chunk, "event", None) in COMPLETED_EVENTS:
+                # The completion event repeats the whole response
+                completed_content = delta if isinstance(delta, str) else None
+                continue
+            if not isinstance(delta, str) or not delta:
+                continue
+            chunks.append(delta)
+            # Throttle re-rendering so long responses do not redraw on every token
+            now = time.monotonic()
+            if now - last_update >= STREAM_UPDATE_INTERVAL:
+                on_update(extract_partial_code_content("".join(chunks)))
+                last_update = now
+        set_agno_usage(call, metrics)
+        content = "".join(chunks) or completed_content or ""
+        on_update(extract_partial_code_content(content))
+        return content
+
+@cached_code_generation("selenium_pytest_bdd")
+def generate_selenium_pytest_bdd(
+    gherkin_steps: str,
+    history_data: Dict[str, Any],
+    on_update: Optional[Callable[[str], None]] = None,
+) -> str:
     """Generate a single Python file with Selenium PyTest BDD automation code using the code generation agent"""
 
     # Extract feature name from Gherkin (optional, for context)
     feature_match = re.search(r"Feature:\s*(.+?)(?:\n|$)", gherkin_steps)
     feature_name = feature_match.group(1).strip() if feature_match else "Automated Test"
 
-    # Extract selectors and actions
-    selectors = extract_selectors_from_history(history_data)
-    actions = analyze_actions(history_data)
-
-    # Get URLs visited
-    urls = history_data.get('urls', [])
-    base_url = urls[0] if urls else "https://example.com"
+    # Build a compact, token-budgeted summary of the execution
+    execution_context, context_stats = build_codegen_context(history_data)
 
     # Create prompt for Selenium PyTest BDD code
     # The code generation agent's description, instructions, and expected_output handle the code generation logic.
@@ -67,16 +212,12 @@ def generate_selenium_pytest_bdd(gherkin_steps: str, history_data: Dict[str, Any
     ```
 
     Agent Execution Details:
-    - Base URL: {base_url}
-    - Element Selectors: {json.dumps(selectors, indent=2)}
-    - Actions Performed: {json.dumps(actions, indent=2)}
-    - Extracted Content: {json.dumps(history_data.get('extracted_content', []), indent=2)}
+{execution_context}
     """
 
     try:
         # Generate the single file
-        code_response = code_gen_agent.run(code_file_prompt)
-        code_content = extract_code_content(code_response.content)
+        code_content = extract_code_content(run_agent(get_agent("code_gen"), code_file_prompt, on_update, stage="codegen:selenium_pytest_bdd", context_stats=context_stats))
 
         return code_content
 
@@ -84,20 +225,20 @@ def generate_selenium_pytest_bdd(gherkin_steps: str, history_data: Dict[str, Any
         st.error(f"Error generating Selenium PyTest BDD code: {str(e)}")
         raise
 
-def generate_playwright_python(gherkin_steps: str, history_data: Dict[str, Any]) -> str:
+@cached_code_generation("playwright_python")
+def generate_playwright_python(
+    gherkin_steps: str,
+    history_data: Dict[str, Any],
+    on_update: Optional[Callable[[str], None]] = None,
+) -> str:
     """Generate a single Python file with Playwright automation code using the code generation agent"""
 
     # Extract feature name from Gherkin (optional, for context)
     feature_match = re.search(r"Feature:\s*(.+?)(?:\n|$)", gherkin_steps)
     feature_name = feature_match.group(1).strip() if feature_match else "Automated Test"
 
-    # Extract selectors and actions
-    selectors = extract_selectors_from_history(history_data)
-    actions = analyze_actions(history_data)
-
-    # Get URLs visited
-    urls = history_data.get('urls', [])
-    base_url = urls[0] if urls else "https://example.com"
+    # Build a compact, token-budgeted summary of the execution
+    execution_context, context_stats = build_codegen_context(history_data)
 
     # Create prompt for Playwright code
     # The code generation agent's description, instructions, and expected_output handle the code generation logic.
@@ -111,16 +252,12 @@ def generate_playwright_python(gherkin_steps: str, history_data: Dict[str, Any])
     ```
 
     Agent Execution Details:
-    - Base URL: {base_url}
-    - Element Selectors: {json.dumps(selectors, indent=2)}
-    - Actions Performed: {json.dumps(actions, indent=2)}
-    - Extracted Content: {json.dumps(history_data.get('extracted_content', []), indent=2)}
+{execution_context}
     """
 
     try:
         # Generate the single file
-        code_response = code_gen_agent.run(code_file_prompt)
-        code_content = extract_code_content(code_response.content)
+        code_content = extract_code_content(run_agent(get_agent("code_gen"), code_file_prompt, on_update, stage="codegen:playwright_python", context_stats=context_stats))
 
         return code_content
 
@@ -128,20 +265,20 @@ def generate_playwright_python(gherkin_steps: str, history_data: Dict[str, Any])
         st.error(f"Error generating Playwright code: {str(e)}")
         raise
 
-def generate_cypress_js(gherkin_steps: str, history_data: Dict[str, Any]) -> str:
+@cached_code_generation("cypress_js")
+def generate_cypress_js(
+    gherkin_steps: str,
+    history_data: Dict[str, Any],
+    on_update: Optional[Callable[[str], None]] = None,
+) -> str:
     """Generate a single JavaScript file with Cypress automation code using the code generation agent"""
 
     # Extract feature name from Gherkin (optional, for context)
     feature_match = re.search(r"Feature:\s*(.+?)(?:\n|$)", gherkin_steps)
     feature_name = feature_match.group(1).strip() if feature_match else "Automated Test"
 
-    # Extract selectors and actions
-    selectors = extract_selectors_from_history(history_data)
-    actions = analyze_actions(history_data)
-
-    # Get URLs visited
-    urls = history_data.get('urls', [])
-    base_url = urls[0] if urls else "https://example.com"
+    # Build a compact, token-budgeted summary of the execution
+    execution_context, context_stats = build_codegen_context(history_data)
 
     # Create prompt for Cypress code
     # The code generation agent's description, instructions, and expected_output handle the code generation logic.
@@ -155,16 +292,12 @@ def generate_cypress_js(gherkin_steps: str, history_data: Dict[str, Any]) -> str
     ```
 
     Agent Execution Details:
-    - Base URL: {base_url}
-    - Element Selectors: {json.dumps(selectors, indent=2)}
-    - Actions Performed: {json.dumps(actions, indent=2)}
-    - Extracted Content: {json.dumps(history_data.get('extracted_content', []), indent=2)}
+{execution_context}
     """
 
     try:
         # Generate the single file
-        code_response = code_gen_agent.run(code_file_prompt)
-        code_content = extract_code_content(code_response.content)
+        code_content = extract_code_content(run_agent(get_agent("code_gen"), code_file_prompt, on_update, stage="codegen:cypress_js", context_stats=context_stats))
 
         return code_content
 
@@ -172,20 +305,20 @@ def generate_cypress_js(gherkin_steps: str, history_data: Dict[str, Any]) -> str
         st.error(f"Error generating Cypress code: {str(e)}")
         raise
 
-def generate_robot_framework(gherkin_steps: str, history_data: Dict[str, Any]) -> str:
+@cached_code_generation("robot_framework")
+def generate_robot_framework(
+    gherkin_steps: str,
+    history_data: Dict[str, Any],
+    on_update: Optional[Callable[[str], None]] = None,
+) -> str:
     """Generate Robot Framework test file using the code generation agent"""
 
     # Extract feature name from Gherkin (optional, for context)
     feature_match = re.search(r"Feature:\s*(.+?)(?:\n|$)", gherkin_steps)
     feature_name = feature_match.group(1).strip() if feature_match else "Automated Test"
 
-    # Extract selectors and actions
-    selectors = extract_selectors_from_history(history_data)
-    actions = analyze_actions(history_data)
-
-    # Get URLs visited
-    urls = history_data.get('urls', [])
-    base_url = urls[0] if urls else "https://example.com"
+    # Build a compact, token-budgeted summary of the execution
+    execution_context, context_stats = build_codegen_context(history_data)
 
     # Create prompt for Robot Framework code
     # The code generation agent's description, instructions, and expected_output handle the code generation logic.
@@ -199,16 +332,12 @@ def generate_robot_framework(gherkin_steps: str, history_data: Dict[str, Any]) -
     ```
 
     Agent Execution Details:
-    - Base URL: {base_url}
-    - Element Selectors: {json.dumps(selectors, indent=2)}
-    - Actions Performed: {json.dumps(actions, indent=2)}
-    - Extracted Content: {json.dumps(history_data.get('extracted_content', []), indent=2)}
+{execution_context}
     """
 
     try:
         # Generate the single file
-        code_response = code_gen_agent.run(code_file_prompt)
-        code_content = extract_code_content(code_response.content)
+        code_content = extract_code_content(run_agent(get_agent("code_gen"), code_file_prompt, on_update, stage="codegen:robot_framework", context_stats=context_stats))
 
         return code_content
 
@@ -216,20 +345,20 @@ def generate_robot_framework(gherkin_steps: str, history_data: Dict[str, Any]) -
         st.error(f"Error generating Robot Framework code: {str(e)}")
         raise
 
-def generate_java_selenium(gherkin_steps: str, history_data: Dict[str, Any]) -> str:
+@cached_code_generation("java_selenium")
+def generate_java_selenium(
+    gherkin_steps: str,
+    history_data: Dict[str, Any],
+    on_update: Optional[Callable[[str], None]] = None,
+) -> str:
     """Generate a Java file with Selenium and Cucumber automation code using the code generation agent"""
 
     # Extract feature name from Gherkin (optional, for context)
     feature_match = re.search(r"Feature:\s*(.+?)(?:\n|$)", gherkin_steps)
     feature_name = feature_match.group(1).strip() if feature_match else "Automated Test"
 
-    # Extract selectors and actions
-    selectors = extract_selectors_from_history(history_data)
-    actions = analyze_actions(history_data)
-
-    # Get URLs visited
-    urls = history_data.get('urls', [])
-    base_url = urls[0] if urls else "https://example.com"
+    # Build a compact, token-budgeted summary of the execution
+    execution_context, context_stats = build_codegen_context(history_data)
 
     # Create prompt for Java Selenium Cucumber code
     # The code generation agent's description, instructions, and expected_output handle the code generation logic.
@@ -243,19 +372,51 @@ def generate_java_selenium(gherkin_steps: str, history_data: Dict[str, Any]) ->
     ```
 
     Agent Execution Details:
-    - Base URL: {base_url}
-    - Element Selectors: {json.dumps(selectors, indent=2)}
-    - Actions Performed: {json.dumps(actions, indent=2)}
-    - Extracted Content: {json.dumps(history_data.get('extracted_content', []), indent=2)}
+{execution_context}
     """
 
     try:
         # Generate the single file
-        code_response = code_gen_agent.run(code_file_prompt)
-        code_content = extract_code_content(code_response.content)
+        code_content = extract_code_content(run_agent(get_agent("code_gen"), code_file_prompt, on_update, stage="codegen:java_selenium", context_stats=context_stats))
 
         return code_content
 
     except Exception as e:
         st.error(f"Error generating Java Selenium Cucumber code: {str(e)}")
         raise
+
+def generate_all_frameworks(
+    gherkin_steps: str,
+    history_data: Dict[str, Any],
+    generators: Dict[str, Callable[..., str]],
+    max_workers: Optional[int] = None,
+    use_cache: bool = True,
+) -> Dict[str, Dict[str, str]]:
+    """Generate code for every framework concurrently.
+
+    Returns a mapping of framework name to either ``{"code": ...}`` or
+    ``{"error": ...}`` in the order of ``generators``, so one failing
+    framework does not discard the others.
+    """
+    if max_workers is None:
+        max_workers = int(os.environ.get("FORTIAGENT_CODEGEN_CONCURRENCY", len(generators) or 1))
+    results: Dict[str, Dict[str, str]] = {}
+
+    def generate(generator: Callable[..., str]) -> str:
+        # Concurrent runs must not share an agent, so every generator builds its own
+        with private_agents():
+            return generator(gherkin_steps, history_data, use_cache=use_cache)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        # Each worker gets a copy of the caller's context so telemetry keeps the run id
+        futures = {
+            executor.submit(contextvars.copy_context().run, generate, generator): framework
+            for framework, generator in generators.items()
+        }
+        for future in as_completed(futures):
+            framework = futures[future]
+            try:
+                results[framework] = {"code": future.result()}
+            except Exception as e:
+                results[framework] = {"error": str(e)}
+    return {framework: results[framework] for framework in generators}
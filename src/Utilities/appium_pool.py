@@ -0,0 +1,241 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Appium sessions open at the same time, across all capability sets
+DEFAULT_MAX_SESSIONS = int(os.environ.get("FORTIAGENT_APPIUM_SESSIONS", "4"))
+# Scenarios served by one session before it is closed and created again
+DEFAULT_SESSION_MAX_USES = int(os.environ.get("FORTIAGENT_APPIUM_MAX_USES", "20"))
+# Capabilities naming the app under test, Android first
+APP_ID_CAPABILITIES = ("appium:appPackage", "appPackage", "appium:bundleId", "bundleId")
+
+
+def capabilities_key(capabilities: Dict[str, Any]) -> str:
+    """Stable key of a capability set"""
+    return json.dumps(capabilities, sort_keys=True, default=str)
+
+
+def app_id(capabilities: Dict[str, Any]) -> Optional[str]:
+    """Package or bundle id of the app under test, if the capabilities name one"""
+    return next((capabilities[name] for name in APP_ID_CAPABILITIES if capabilities.get(name)), None)
+
+
+def create_driver(server_url: str, capabilities: Dict[str, Any]) -> Any:
+    """Open an Appium session"""
+    from appium import webdriver
+
+    try:
+        from appium.options.common import AppiumOptions
+    except ImportError:
+        # Appium-Python-Client < 2 takes the capabilities directly
+        return webdriver.Remote(server_url, capabilities)
+    return webdriver.Remote(server_url, options=AppiumOptions().load_capabilities(capabilities))
+
+
+class _Session:
+    """Book-keeping for one open Appium session."""
+
+    __slots__ = ("driver", "server_url", "capabilities", "key", "uses", "in_use", "last_used")
+
+    def __init__(self, driver: Any, server_url: str, capabilities: Dict[str, Any]):
+        self.driver = driver
+        self.server_url = server_url
+        self.capabilities = capabilities
+        self.key = (server_url, capabilities_key(capabilities))
+        self.uses = 0
+        self.in_use = False
+        self.last_used = time.monotonic()
+
+
+class AppiumSessionPool:
+    """Reusable Appium sessions keyed by server URL and desired capabilities.
+
+    Creating a session installs and launches the app, which dominates short
+    scenarios. Released sessions stay open and the next scenario with the
+    same capabilities gets one back after a health check and an app reset
+    (terminate and activate), instead of a new session. At most
+    ``max_sessions`` sessions are open; when the limit is reached, the least
+    recently used idle session of another capability set is closed, or the
+    caller waits. Sessions are closed after ``max_uses`` scenarios or when a
+    scenario using them fails and they no longer respond.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        max_uses: int = DEFAULT_SESSION_MAX_USES,
+        factory: Callable[[str, Dict[str, Any]], Any] = create_driver,
+    ):
+        self.max_sessions = max(1, int(max_sessions))
+        self.max_uses = max(1, int(max_uses))
+        self.factory = factory
+        self._sessions: List[_Session] = []
+        self._condition = threading.Condition()
+        self.created = 0
+        self.reused = 0
+        self.recycled = 0
+
+    def acquire(self, server_url: str, capabilities: Dict[str, Any], timeout: Optional[float] = None) -> _Session:
+        """Return a healthy session for the capabilities, reset to a freshly launched app"""
+        key = (server_url, capabilities_key(capabilities))
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            evicted = None
+            with self._condition:
+                session = self._take_idle(key)
+                if session is None and len(self._sessions) >= self.max_sessions:
+                    evicted = self._evict_idle()
+                if session is None and len(self._sessions) < self.max_sessions:
+                    # Reserve the slot; the session itself is created outside the lock
+                    session = _Session(None, server_url, capabilities)
+                    session.in_use = True
+                    self._sessions.append(session)
+                if session is None:
+                    remaining = deadline - time.monotonic() if deadline is not None else None
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f"No Appium session available within {timeout}s")
+                    self._condition.wait(remaining)
+                    continue
+            if evicted is not None:
+                self._quit(evicted.driver)
+
+            if session.driver is None:
+                try:
+                    session.driver = self.factory(server_url, capabilities)
+                except Exception:
+                    self._remove(session)
+                    raise
+                self.created += 1
+            elif not self._reset(session):
+                # The session died while idle: close it and look again
+                self._discard(session)
+                continue
+            else:
+                self.reused += 1
+            session.uses += 1
+            return session
+
+    def release(self, session: _Session, failed: bool = False) -> None:
+        """Hand a session back, closing it when it is worn out or broken"""
+        if session.uses >= self.max_uses or (failed and not self._is_healthy(session.driver)):
+            self.recycled += 1
+            self._discard(session)
+            return
+        with self._condition:
+            session.in_use = False
+            session.last_used = time.monotonic()
+            self._condition.notify_all()
+
+    @contextmanager
+    def session(self, server_url: str, capabilities: Dict[str, Any], timeout: Optional[float] = None) -> Iterator[Any]:
+        """Context manager yielding the driver of a pooled session"""
+        session = self.acquire(server_url, capabilities, timeout)
+        failed = False
+        try:
+            yield session.driver
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.release(session, failed=failed)
+
+    def close(self) -> None:
+        """Close every idle session; sessions in use are closed when released"""
+        with self._condition:
+            idle = []
+            for session in self._sessions:
+                if session.in_use:
+                    # Worn out, so it is closed on release
+                    session.uses = self.max_uses
+                else:
+                    session.in_use = True
+                    idle.append(session)
+        for session in idle:
+            self._discard(session)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "open": len(self._sessions),
+                "in_use": sum(1 for session in self._sessions if session.in_use),
+                "created": self.created,
+                "reused": self.reused,
+                "recycled": self.recycled,
+            }
+
+    def _take_idle(self, key: tuple) -> Optional[_Session]:
+        idle = [session for session in self._sessions if session.key == key and not session.in_use]
+        if not idle:
+            return None
+        session = max(idle, key=lambda session: session.last_used)
+        session.in_use = True
+        return session
+
+    def _evict_idle(self) -> Optional[_Session]:
+        """Remove the least recently used idle session from the pool; the caller closes it"""
+        idle = [session for session in self._sessions if not session.in_use]
+        if not idle:
+            return None
+        session = min(idle, key=lambda session: session.last_used)
+        self._sessions.remove(session)
+        return session
+
+    def _remove(self, session: _Session) -> None:
+        with self._condition:
+            if session in self._sessions:
+                self._sessions.remove(session)
+            self._condition.notify_all()
+
+    def _discard(self, session: _Session) -> None:
+        self._quit(session.driver)
+        self._remove(session)
+
+    def _reset(self, session: _Session) -> bool:
+        """Health-check a reused session and restart its app; False if the session is unusable"""
+        if not self._is_healthy(session.driver):
+            return False
+        app = app_id(session.capabilities)
+        if app is None:
+            return True
+        try:
+            session.driver.terminate_app(app)
+            session.driver.activate_app(app)
+            return True
+        except Exception as e:
+            print(f"Error resetting app {app}: {e}")
+            return False
+
+    @staticmethod
+    def _is_healthy(driver: Any) -> bool:
+        if driver is None or getattr(driver, "session_id", None) is None:
+            return False
+        try:
+            driver.get_window_size()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit(driver: Any) -> None:
+        if driver is None:
+            return
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Error closing Appium session: {e}")
+
+
+_pool: Optional[AppiumSessionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_appium_pool() -> AppiumSessionPool:
+    """Return the process-wide Appium session pool, creating it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = AppiumSessionPool()
+        return _pool
@@ -0,0 +1,199 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+# Location of the on-disk cache shared by every cache namespace
+DEFAULT_CACHE_PATH = os.environ.get("FORTIAGENT_CACHE_PATH", ".fortiagent_cache.sqlite3")
+# Set FORTIAGENT_CACHE_DISABLED=1 to bypass the LLM response caches
+CACHE_DISABLED = os.environ.get("FORTIAGENT_CACHE_DISABLED", "").lower() in ("1", "true", "yes")
+
+
+def normalize_text(text: str) -> str:
+    """Normalize whitespace so trivially different inputs share a cache entry"""
+    lines = (" ".join(line.split()) for line in text.replace("\r\n", "\n").split("\n"))
+    return "\n".join(lines).strip()
+
+
+def digest(*parts: Any) -> str:
+    """Return a stable SHA-256 digest of the given parts"""
+    hasher = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, str):
+            part = json.dumps(part, sort_keys=True, default=str, separators=(",", ":"))
+        hasher.update(part.encode("utf-8"))
+        hasher.update(b"\x00")
+    return hasher.hexdigest()
+
+
+def agent_fingerprint(agent: Any) -> str:
+    """Identify an agent by its model id and a hash of its prompt configuration"""
+    model_id = getattr(getattr(agent, "model", None), "id", "unknown")
+    prompt_hash = digest(
+        str(getattr(agent, "description", "") or ""),
+        str(getattr(agent, "instructions", "") or ""),
+        str(getattr(agent, "expected_output", "") or ""),
+    )
+    return f"{model_id}:{prompt_hash}"
+
+
+class ResponseCache:
+    """Disk-backed LLM response cache with LRU eviction and an optional TTL.
+
+    Entries live in a SQLite file so they survive Streamlit reruns and app
+    restarts. Each cache uses its own ``namespace`` inside that file and keeps
+    at most ``max_entries`` of them, evicting the least recently used first.
+    Hit and miss counters are kept in the same file, so the UI sees the
+    lookups made by the job worker processes.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        path: str = DEFAULT_CACHE_PATH,
+        max_entries: int = 512,
+        ttl: Optional[float] = None,
+        enabled: bool = not CACHE_DISABLED,
+    ):
+        self.namespace = namespace
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    metadata TEXT,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cache_stats (
+                    namespace TEXT PRIMARY KEY,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    misses INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for a key, or None on a miss"""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, created_at FROM responses WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                conn.execute(
+                    "DELETE FROM responses WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                )
+                row = None
+            self._count(conn, "hits" if row is not None else "misses")
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE responses SET last_access = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key),
+            )
+            return row[0]
+
+    def _count(self, conn: sqlite3.Connection, column: str) -> None:
+        conn.execute("INSERT OR IGNORE INTO cache_stats (namespace) VALUES (?)", (self.namespace,))
+        conn.execute(f"UPDATE cache_stats SET {column} = {column} + 1 WHERE namespace = ?", (self.namespace,))
+
+    def set(self, key: str, value: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """Store a value and evict the least recently used entries over the limit"""
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (self.namespace, key, value, json.dumps(metadata or {}), now, now),
+            )
+            conn.execute(
+                """
+                DELETE FROM responses WHERE namespace = ? AND key NOT IN (
+                    SELECT key FROM responses WHERE namespace = ?
+                    ORDER BY last_access DESC LIMIT ?
+                )
+                """,
+                (self.namespace, self.namespace, self.max_entries),
+            )
+
+    def delete(self, key: str) -> None:
+        """Remove one entry, e.g. a cached plan that stopped working"""
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM responses WHERE namespace = ? AND key = ?", (self.namespace, key))
+
+    def evict(
+        self,
+        older_than: Optional[float] = None,
+        predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> int:
+        """Delete entries older than ``older_than`` seconds or whose metadata matches ``predicate``"""
+        cutoff = time.time() - older_than if older_than is not None else None
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT key, metadata, created_at FROM responses WHERE namespace = ?",
+                (self.namespace,),
+            ).fetchall()
+            stale_keys = [
+                (self.namespace, key)
+                for key, metadata, created_at in rows
+                if (cutoff is not None and created_at < cutoff)
+                or (predicate is not None and predicate(json.loads(metadata or "{}")))
+            ]
+            conn.executemany(
+                "DELETE FROM responses WHERE namespace = ? AND key = ?", stale_keys
+            )
+        return len(stale_keys)
+
+    def clear(self) -> None:
+        """Remove every entry in this namespace"""
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM responses WHERE namespace = ?", (self.namespace,))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the hit/miss counters of every process and the number of stored entries"""
+        with self._lock, self._connect() as conn:
+            entries = conn.execute(
+                "SELECT COUNT(*) FROM responses WHERE namespace = ?", (self.namespace,)
+            ).fetchone()[0]
+            counters = conn.execute(
+                "SELECT hits, misses FROM cache_stats WHERE namespace = ?", (self.namespace,)
+            ).fetchone()
+        hits, misses = counters if counters is not None else (0, 0)
+        return {
+            "namespace": self.namespace,
+            "enabled": self.enabled,
+            "hits": hits,
+            "misses": misses,
+            "entries": entries,
+        }
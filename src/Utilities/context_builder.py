@@ -0,0 +1,162 @@
+import json
+import logging
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.Utilities.utils import analyze_actions, extract_selectors_from_history
+
+try:  # Optional exact token counting
+    import tiktoken
+    _encoding = tiktoken.get_encoding("o200k_base")
+except Exception:  # pragma: no cover - tiktoken may not be installed
+    _encoding = None
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of prompt tokens spent on execution details per code-gen call
+DEFAULT_TOKEN_BUDGET = int(os.environ.get("FORTIAGENT_CODEGEN_TOKEN_BUDGET", "6000"))
+# Longest extracted content entry kept in the prompt, in characters
+MAX_CONTENT_CHARS = 300
+
+# Element attributes worth sending to the code generator
+ELEMENT_FIELDS = ("tag", "id", "name", "type", "placeholder", "text")
+ELEMENT_DETAILS_BLOB = re.compile(r"\s*Element Details: \{.*\}\s*$", re.DOTALL)
+
+
+def estimate_tokens(text: str) -> int:
+    """Count tokens with tiktoken when available, otherwise estimate ~4 chars per token"""
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def _compact(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _element_selector(details: Dict[str, Any]) -> Optional[str]:
+    if details.get("id") and details.get("css_selector"):
+        return details["css_selector"]
+    return details.get("relative_xpath") or details.get("absolute_xpath") or details.get("xpath")
+
+
+def build_codegen_context(
+    history_data: Dict[str, Any],
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+) -> Tuple[str, Dict[str, Any]]:
+    """Build the execution-details section of a code-generation prompt.
+
+    Elements are deduplicated and reduced to the attributes that matter for
+    locating them, actions reference elements by ref instead of repeating
+    their details, and everything is serialized compactly. Sections are added
+    in priority order until ``token_budget`` is spent: base URL, elements used
+    by actions, actions, remaining selectors and finally raw extracted content.
+
+    Returns the context text and a stats dict with the token counts of the
+    verbose serialization (``tokens_before``) and of this one (``tokens_after``).
+    """
+    selectors = extract_selectors_from_history(history_data)
+    actions = analyze_actions(history_data)
+    extracted_content = history_data.get('extracted_content', [])
+    urls = history_data.get('urls', [])
+    base_url = next((url for url in urls if url), "https://example.com")
+
+    verbose = (
+        f"- Base URL: {base_url}\n"
+        f"- Element Selectors: {json.dumps(selectors, indent=2)}\n"
+        f"- Actions Performed: {json.dumps(actions, indent=2, default=str)}\n"
+        f"- Extracted Content: {json.dumps(extracted_content, indent=2, default=str)}"
+    )
+
+    # Deduplicate elements by selector; actions refer to them by reference
+    elements: Dict[str, Dict[str, Any]] = {}
+    element_ids: Dict[str, str] = {}
+    compact_actions: List[Dict[str, Any]] = []
+    for action in actions:
+        entry: Dict[str, Any] = {"action": action["name"]}
+        if action.get("type") and action["type"] != "unknown":
+            entry["type"] = action["type"]
+        if action.get("value") is not None:
+            entry["value"] = action["value"]
+        details = action.get("element_details")
+        selector = _element_selector(details) if isinstance(details, dict) else None
+        if selector:
+            if selector not in element_ids:
+                element_id = f"e{len(element_ids) + 1}"
+                element_ids[selector] = element_id
+                element = {"selector": selector}
+                element.update({field: details[field] for field in ELEMENT_FIELDS if details.get(field)})
+                elements[element_id] = element
+            entry["element"] = element_ids[selector]
+        compact_actions.append(entry)
+
+    other_selectors = sorted({value for value in selectors.values() if value not in element_ids})
+
+    # Element detail blobs are already represented by the elements table
+    contents: List[str] = []
+    seen_contents = set()
+    for content in extracted_content:
+        text = ELEMENT_DETAILS_BLOB.sub("", content) if isinstance(content, str) else _compact(content)
+        text = text.strip()[:MAX_CONTENT_CHARS]
+        if text and text not in seen_contents:
+            seen_contents.add(text)
+            contents.append(text)
+
+    base_line = f"- Base URL: {base_url}"
+    used_tokens = estimate_tokens(base_line)
+    sections: List[Tuple[str, List[Any]]] = []
+    omitted: Dict[str, int] = {}
+
+    def add_section(label: str, items: List[Any]) -> None:
+        nonlocal used_tokens
+        # Lower priority sections are dropped once a higher one did not fit
+        if omitted:
+            if items:
+                omitted[label] = len(items)
+            return
+        # The "- label: [...]" line costs tokens of its own once it holds an item
+        header_tokens = estimate_tokens(f"- {label}: []") + 1
+        kept = []
+        for item in items:
+            item_tokens = estimate_tokens(_compact(item)) + 1 + (0 if kept else header_tokens)
+            if used_tokens + item_tokens > token_budget:
+                break
+            kept.append(item)
+            used_tokens += item_tokens
+        if len(kept) < len(items):
+            omitted[label] = len(items) - len(kept)
+        if kept:
+            sections.append((label, kept))
+
+    def render() -> str:
+        lines = [base_line] + [f"- {label}: {_compact(kept)}" for label, kept in sections if kept]
+        if omitted:
+            lines.append(f"- Omitted for brevity: {_compact(omitted)}")
+        return "\n".join(lines)
+
+    add_section("Elements", [{"ref": element_id, **element} for element_id, element in elements.items()])
+    add_section("Actions Performed", compact_actions)
+    add_section("Other Selectors", other_selectors)
+    add_section("Extracted Content", contents)
+
+    context = render()
+    # Item estimates do not add up exactly and leave out the omitted note, so
+    # drop the lowest priority items until the rendered context fits
+    while estimate_tokens(context) > token_budget and any(kept for _, kept in sections):
+        label, kept = next((label, kept) for label, kept in reversed(sections) if kept)
+        kept.pop()
+        omitted[label] = omitted.get(label, 0) + 1
+        context = render()
+
+    stats = {
+        "tokens_before": estimate_tokens(verbose),
+        "tokens_after": estimate_tokens(context),
+        "token_budget": token_budget,
+        "omitted": omitted,
+    }
+    logger.info(
+        "Code-gen context reduced from %s to %s tokens (budget %s)",
+        stats["tokens_before"], stats["tokens_after"], token_budget,
+    )
+    return context, stats
@@ -0,0 +1,108 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from src.Utilities.appium_pool import AppiumSessionPool, get_appium_pool
+from src.Utilities.gherkin import ScenarioUnit, parse_units
+from src.Utilities.mobile_steps import compile_steps, run_plan
+
+# Capabilities naming a device, most specific first
+DEVICE_NAME_CAPABILITIES = ("appium:deviceName", "deviceName", "appium:udid", "udid", "platformName")
+
+
+def device_names(devices: List[Dict[str, Any]]) -> List[str]:
+    """Display name of every capability set, numbered when several share one"""
+    names = [
+        next((str(caps[name]) for name in DEVICE_NAME_CAPABILITIES if caps.get(name)), "device")
+        for caps in devices
+    ]
+    return [f"{name} ({i + 1})" if names.count(name) > 1 else name for i, name in enumerate(names)]
+
+
+def device_info(driver: Any) -> Dict[str, Any]:
+    """Information the device reports about itself, falling back to the session capabilities"""
+    try:
+        return driver.execute_script("mobile: deviceInfo")
+    except Exception as e:
+        capabilities = getattr(driver, "capabilities", None)
+        return dict(capabilities) if capabilities else {"error": str(e)}
+
+
+def run_device(
+    name: str,
+    units: List[ScenarioUnit],
+    server_url: str,
+    capabilities: Dict[str, Any],
+    pool: AppiumSessionPool,
+) -> Dict[str, Any]:
+    """Run every scenario on one device, one after the other"""
+    started = time.perf_counter()
+    result: Dict[str, Any] = {
+        "device": name,
+        "capabilities": capabilities,
+        "device_info": None,
+        "scenarios": [],
+        "error": None,
+    }
+    try:
+        for unit in units:
+            # Devices have no shared setup, so every scenario runs the Background itself
+            plan = compile_steps(unit.executable())
+            scenario_started = time.perf_counter()
+            with pool.session(server_url, capabilities) as driver:
+                if result["device_info"] is None:
+                    result["device_info"] = device_info(driver)
+                history = run_plan(plan, driver)
+            errors = [error for error in history["errors"] if error]
+            result["scenarios"].append({
+                "name": unit.name,
+                "tags": unit.tags,
+                "example": unit.example,
+                "status": "failed" if errors else "passed",
+                "error": errors[-1] if errors else None,
+                "duration": round(time.perf_counter() - scenario_started, 3),
+                "history": history,
+            })
+    except Exception as e:
+        result["error"] = str(e)
+    result["duration"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def execute_device_matrix(
+    gherkin: str,
+    server_url: str,
+    devices: List[Dict[str, Any]],
+    pool: Optional[AppiumSessionPool] = None,
+) -> Dict[str, Any]:
+    """Run a feature on several devices at the same time and merge the results into a matrix.
+
+    Each capability set gets its own thread and runs the scenarios in order,
+    so the run takes as long as the slowest device rather than the sum of
+    all of them. Devices beyond the pool's session limit wait for a free
+    session. ``matrix`` has one row per scenario with the status on every
+    device.
+    """
+    units = parse_units(gherkin)
+    pool = pool if pool is not None else get_appium_pool()
+    names = device_names(devices)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, len(devices)), thread_name_prefix="fortiagent-device") as executor:
+        results = list(executor.map(
+            lambda args: run_device(args[0], units, server_url, args[1], pool), zip(names, devices)
+        ))
+
+    matrix = []
+    for position, unit in enumerate(units):
+        row = {"scenario": unit.name}
+        for result in results:
+            outcomes = result["scenarios"]
+            row[result["device"]] = outcomes[position]["status"] if position < len(outcomes) else "error"
+        matrix.append(row)
+    return {
+        "devices": results,
+        "matrix": matrix,
+        "duration": round(time.perf_counter() - started, 3),
+        "device_time": round(sum(result["duration"] for result in results), 3),
+    }
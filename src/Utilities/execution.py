@@ -0,0 +1,129 @@
+import asyncio
+import inspect
+import os
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from src.Utilities.gherkin import parse_feature, parse_units, render_background
+from src.Utilities.history_processor import HistoryProcessor
+from src.Utilities.trace import ExecutionTrace, current_trace
+
+# Default number of scenarios executed at the same time
+DEFAULT_MAX_CONCURRENCY = int(os.environ.get("FORTIAGENT_MAX_CONCURRENCY", "4"))
+
+
+def parse_scenarios(steps: str) -> List[str]:
+    """Split Gherkin content into one text block per scenario and Examples row, without the feature's Background"""
+    return [unit.executable(include_background=False) for unit in parse_units(steps)]
+
+
+def parse_background(steps: str) -> Optional[str]:
+    """Return the Background block of Gherkin content, or None if there is none"""
+    return render_background(parse_feature(steps).background)
+
+
+class ContextPool:
+    """Bounded pool of isolated contexts opened on a single browser or device.
+
+    At most ``max_size`` contexts are open at any time; callers waiting for a
+    slot are served in arrival order.
+    """
+
+    def __init__(self, env: Any, max_size: int = DEFAULT_MAX_CONCURRENCY):
+        self.env = env
+        self.max_size = max(1, int(max_size))
+        self._semaphore = asyncio.Semaphore(self.max_size)
+
+    @asynccontextmanager
+    async def context(self):
+        async with self._semaphore:
+            async with await self.env.new_context() as context:
+                yield context
+
+
+class ScenarioRun:
+    """Outcome of running one scenario.
+
+    ``history`` is None when the scenario was fully replayed without the agent.
+    """
+
+    __slots__ = ("scenario", "history", "trace", "processor", "replay")
+
+    def __init__(
+        self,
+        scenario: str,
+        history: Any,
+        trace: ExecutionTrace,
+        processor: HistoryProcessor,
+        replay: Any = None,
+    ):
+        self.scenario = scenario
+        self.history = history
+        self.trace = trace
+        self.processor = processor
+        self.replay = replay
+
+
+async def run_scenarios(
+    scenarios: List[str],
+    pool: ContextPool,
+    agent_factory: Callable[[str, Any, Any], Any],
+    replayer: Optional[Callable[[str, Any, HistoryProcessor], Awaitable[Any]]] = None,
+    setup: Optional[Callable[[str, Any], Awaitable[str]]] = None,
+) -> List[Any]:
+    """Run every scenario as its own agent task, each in its own pooled context.
+
+    ``setup(scenario, context)``, if given, prepares each fresh context, e.g.
+    with the state left by the feature's Background, and returns the
+    scenario text to run in it.
+    ``replayer(scenario, context, processor)``, if given, first replays the
+    scenario's recorded steps and returns a ``ReplayOutcome`` (or None when
+    nothing is recorded); the agent is only started when replay diverged.
+    ``agent_factory(scenario, context, replay)`` builds the agent for one
+    scenario, resuming after ``replay`` when it is not None.
+    Results are ``ScenarioRun`` objects in scenario order, holding the
+    ``ExecutionTrace`` recorded by the controller actions and a
+    ``HistoryProcessor`` fed step by step while the agent runs; a scenario
+    that raised is represented by its exception so one failure does not
+    cancel the others.
+    """
+    async def run_one(scenario: str):
+        # Each task runs in its own copy of the context, so traces never mix
+        trace = ExecutionTrace()
+        current_trace.set(trace)
+        processor = HistoryProcessor()
+        async with pool.context() as context:
+            if setup is not None:
+                scenario = await setup(scenario, context)
+            replay = await replayer(scenario, context, processor) if replayer is not None else None
+            if replay is not None and replay.completed:
+                return ScenarioRun(scenario, None, trace, processor, replay)
+            agent = agent_factory(scenario, context, replay)
+            history = await agent.run(**_step_hooks(agent, trace, processor))
+            # Pick up any steps the hooks did not see
+            processor.process_history(history)
+            return ScenarioRun(scenario, history, trace, processor, replay)
+
+    return await asyncio.gather(
+        *(run_one(scenario) for scenario in scenarios),
+        return_exceptions=True,
+    )
+
+
+def _step_hooks(agent: Any, trace: ExecutionTrace, processor: HistoryProcessor) -> Dict[str, Any]:
+    """Keyword arguments for agent.run that record each agent step as it happens"""
+    try:
+        parameters = inspect.signature(agent.run).parameters
+    except (TypeError, ValueError):
+        return {}
+
+    hooks: Dict[str, Any] = {}
+    if "on_step_start" in parameters:
+        async def on_step_start(running_agent: Any) -> None:
+            state = getattr(running_agent, "state", None)
+            trace.begin_step(getattr(state, "n_steps", len(trace.steps) + 1))
+
+        hooks["on_step_start"] = on_step_start
+    if "on_step_end" in parameters:
+        hooks["on_step_end"] = processor.on_step_end
+    return hooks
@@ -0,0 +1,361 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+STEP_KEYWORDS = ("Given", "When", "Then", "And", "But", "*")
+SCENARIO_KEYWORDS = ("Scenario", "Example")
+OUTLINE_KEYWORDS = ("Scenario Outline", "Scenario Template")
+EXAMPLES_KEYWORDS = ("Examples", "Scenarios")
+DOC_STRING_DELIMITERS = ('"""', "```")
+PLACEHOLDER = re.compile(r"<([^<>]+)>")
+
+
+class Step:
+    """One Gherkin step with its data table or doc string."""
+
+    __slots__ = ("keyword", "text", "table", "doc_string", "line")
+
+    def __init__(self, keyword: str, text: str, line: int):
+        self.keyword = keyword
+        self.text = text
+        self.table: List[List[str]] = []
+        self.doc_string: Optional[List[str]] = None
+        self.line = line
+
+    def substitute(self, values: Dict[str, str]) -> "Step":
+        """Copy of the step with the <placeholders> of an Examples row filled in"""
+        step = Step(self.keyword, fill(self.text, values), self.line)
+        step.table = [[fill(cell, values) for cell in row] for row in self.table]
+        if self.doc_string is not None:
+            step.doc_string = [fill(line, values) for line in self.doc_string]
+        return step
+
+    def render(self, indent: str = "    ") -> str:
+        lines = [f"{indent}{self.keyword} {self.text}".rstrip()]
+        for row in self.table:
+            cells = [cell.replace("|", "\\|") for cell in row]
+            lines.append(f"{indent}  | {' | '.join(cells)} |")
+        if self.doc_string is not None:
+            lines.append(f'{indent}  """')
+            lines.extend(f"{indent}  {line}" for line in self.doc_string)
+            lines.append(f'{indent}  """')
+        return "\n".join(lines)
+
+
+class Background:
+    """Steps run before every scenario of a feature or rule."""
+
+    __slots__ = ("name", "steps", "line")
+
+    def __init__(self, name: str, line: int):
+        self.name = name
+        self.steps: List[Step] = []
+        self.line = line
+
+
+class Examples:
+    """An Examples table of a Scenario Outline."""
+
+    __slots__ = ("name", "tags", "header", "rows", "line")
+
+    def __init__(self, name: str, tags: List[str], line: int):
+        self.name = name
+        self.tags = tags
+        self.header: List[str] = []
+        self.rows: List[List[str]] = []
+        self.line = line
+
+
+class Scenario:
+    """A Scenario, or a Scenario Outline when it has Examples."""
+
+    __slots__ = ("keyword", "name", "tags", "description", "steps", "examples", "line")
+
+    def __init__(self, keyword: str, name: str, tags: List[str], line: int):
+        self.keyword = keyword
+        self.name = name
+        self.tags = tags
+        self.description: List[str] = []
+        self.steps: List[Step] = []
+        self.examples: List[Examples] = []
+        self.line = line
+
+    @property
+    def outline(self) -> bool:
+        return self.keyword in OUTLINE_KEYWORDS
+
+
+class Rule:
+    """A Rule grouping scenarios, optionally with its own Background."""
+
+    __slots__ = ("name", "tags", "background", "scenarios", "line")
+
+    def __init__(self, name: str, tags: List[str], line: int):
+        self.name = name
+        self.tags = tags
+        self.background: Optional[Background] = None
+        self.scenarios: List[Scenario] = []
+        self.line = line
+
+
+class Feature:
+    """Root of a parsed Gherkin document."""
+
+    __slots__ = ("name", "tags", "description", "background", "scenarios", "rules")
+
+    def __init__(self, name: str = "", tags: Optional[List[str]] = None):
+        self.name = name
+        self.tags = tags or []
+        self.description: List[str] = []
+        self.background: Optional[Background] = None
+        # Scenarios outside any Rule
+        self.scenarios: List[Scenario] = []
+        self.rules: List[Rule] = []
+
+
+class ScenarioUnit:
+    """One executable scenario: a plain Scenario or a single Examples row of an outline.
+
+    ``text`` is the scenario block with placeholders filled in, without any
+    Background; ``background`` is the feature's Background and
+    ``rule_background`` the one of the enclosing Rule, if any.
+    """
+
+    __slots__ = ("name", "text", "tags", "feature", "rule", "background", "rule_background", "outline", "example", "line")
+
+    def __init__(
+        self,
+        name: str,
+        text: str,
+        tags: List[str],
+        feature: str,
+        rule: Optional[str],
+        background: Optional[str],
+        rule_background: Optional[str],
+        outline: Optional[str] = None,
+        example: Optional[Dict[str, str]] = None,
+        line: int = 0,
+    ):
+        self.name = name
+        self.text = text
+        self.tags = tags
+        self.feature = feature
+        self.rule = rule
+        self.background = background
+        self.rule_background = rule_background
+        # Name of the outline and the Examples row the unit was expanded from
+        self.outline = outline
+        self.example = example
+        self.line = line
+
+    def executable(self, include_background: bool = True) -> str:
+        """Scenario text to run, preceded by the Rule's and, optionally, the feature's Background"""
+        backgrounds = [self.background] if include_background and self.background else []
+        if self.rule_background:
+            backgrounds.append(self.rule_background)
+        if not backgrounds:
+            return self.text
+        # A single Background block: parsing a second one would replace the first
+        background = "\n".join([backgrounds[0]] + [extra.split("\n", 1)[1] for extra in backgrounds[1:]])
+        return f"{background}\n\n{self.text}"
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "name": self.name,
+            "tags": self.tags,
+            "feature": self.feature,
+            "rule": self.rule,
+            "outline": self.outline,
+            "example": self.example,
+            "line": self.line,
+        }
+
+
+def fill(text: str, values: Dict[str, str]) -> str:
+    """Replace the <placeholders> of an outline with the values of an Examples row"""
+    return PLACEHOLDER.sub(lambda match: values.get(match.group(1), match.group(0)), text)
+
+
+def table_row(line: str) -> List[str]:
+    """Cells of a | separated table row, honouring escaped pipes"""
+    cells = re.split(r"(?<!\\)\|", line.strip()[1:])
+    if cells and not cells[-1].strip():
+        cells = cells[:-1]
+    return [cell.strip().replace("\\|", "|") for cell in cells]
+
+
+def _header(line: str, keywords: Tuple[str, ...]) -> Optional[Tuple[str, str]]:
+    """(keyword, name) when a line starts with one of ``keywords`` followed by a colon"""
+    for keyword in keywords:
+        if line.startswith(keyword) and line[len(keyword):].lstrip().startswith(":"):
+            return keyword, line[len(keyword):].lstrip()[1:].strip()
+    return None
+
+
+def is_header(line: str) -> bool:
+    """Whether a stripped line opens a Feature, Rule, Background, Scenario or Examples block"""
+    keywords = ("Feature", "Rule", "Background") + OUTLINE_KEYWORDS + SCENARIO_KEYWORDS + EXAMPLES_KEYWORDS
+    return _header(line, keywords) is not None
+
+
+def parse_feature(text: str) -> Feature:
+    """Parse Gherkin content into a Feature.
+
+    Lenient by design, since the content usually comes from an LLM: lines
+    that are not part of the grammar become descriptions or are ignored,
+    and steps before any Scenario header open an unnamed scenario.
+    """
+    feature = Feature()
+    rule: Optional[Rule] = None
+    scenario: Optional[Scenario] = None
+    background: Optional[Background] = None
+    examples: Optional[Examples] = None
+    step: Optional[Step] = None
+    tags: List[str] = []
+    doc_string: Optional[str] = None
+    doc_indent = 0
+    # Element that free text lines describe
+    described: Optional[List[str]] = feature.description
+
+    for number, raw_line in enumerate(text.split("\n"), 1):
+        line = raw_line.strip()
+        if doc_string is not None:
+            if line == doc_string:
+                doc_string = None
+            else:
+                # Keep indentation relative to the opening delimiter
+                prefix = raw_line[:doc_indent]
+                step.doc_string.append(raw_line[doc_indent:].rstrip() if not prefix.strip() else line)
+            continue
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("@"):
+            tags.extend(tag for tag in line.split() if tag.startswith("@"))
+            continue
+
+        header = _header(line, ("Feature",))
+        if header:
+            feature.name, feature.tags, tags = header[1], tags, []
+            described = feature.description
+            continue
+        header = _header(line, ("Rule",))
+        if header:
+            rule = Rule(header[1], tags, number)
+            feature.rules.append(rule)
+            scenario = background = examples = step = None
+            tags, described = [], None
+            continue
+        header = _header(line, ("Background",))
+        if header:
+            background = Background(header[1], number)
+            if rule is not None:
+                rule.background = background
+            else:
+                feature.background = background
+            scenario = examples = step = None
+            tags, described = [], None
+            continue
+        header = _header(line, OUTLINE_KEYWORDS + SCENARIO_KEYWORDS)
+        if header:
+            scenario = Scenario(header[0], header[1], tags, number)
+            (rule.scenarios if rule is not None else feature.scenarios).append(scenario)
+            background = examples = step = None
+            tags, described = [], scenario.description
+            continue
+        header = _header(line, EXAMPLES_KEYWORDS)
+        if header and scenario is not None:
+            examples = Examples(header[1], tags, number)
+            scenario.examples.append(examples)
+            if not scenario.outline:
+                # Examples make a plain Scenario an outline
+                scenario.keyword = OUTLINE_KEYWORDS[0]
+            step, tags, described = None, [], None
+            continue
+
+        keyword = line.split(" ", 1)[0]
+        if keyword in STEP_KEYWORDS and examples is None:
+            if background is None and scenario is None:
+                scenario = Scenario(SCENARIO_KEYWORDS[0], "", [], number)
+                (rule.scenarios if rule is not None else feature.scenarios).append(scenario)
+            step = Step(keyword, line[len(keyword):].strip(), number)
+            (background if background is not None else scenario).steps.append(step)
+            described = None
+        elif line.startswith("|"):
+            if examples is not None:
+                if examples.header:
+                    examples.rows.append(table_row(line))
+                else:
+                    examples.header = table_row(line)
+            elif step is not None:
+                step.table.append(table_row(line))
+        elif line.startswith(DOC_STRING_DELIMITERS) and step is not None:
+            doc_string = line[:3]
+            doc_indent = len(raw_line) - len(raw_line.lstrip())
+            step.doc_string = []
+        elif described is not None:
+            described.append(line)
+    return feature
+
+
+def render_background(*backgrounds: Optional[Background]) -> Optional[str]:
+    """One Background block with the steps of the given backgrounds in order"""
+    steps = [step for background in backgrounds if background is not None for step in background.steps]
+    if not steps:
+        return None
+    return "\n".join(["  Background:"] + [step.render() for step in steps])
+
+
+def render_scenario(name: str, steps: List[Step]) -> str:
+    return "\n".join([f"  Scenario: {name}".rstrip()] + [step.render() for step in steps])
+
+
+def expand(feature: Feature) -> List[ScenarioUnit]:
+    """Executable units of a feature in document order; every Examples row becomes its own unit"""
+    background = render_background(feature.background)
+    groups = [(None, feature.scenarios)] + [(rule, rule.scenarios) for rule in feature.rules]
+    units = []
+    for rule, scenarios in groups:
+        rule_background = render_background(rule.background) if rule is not None else None
+        rule_tags = rule.tags if rule is not None else []
+        for scenario in scenarios:
+            tags = _unique(feature.tags + rule_tags + scenario.tags)
+            scenario_name = scenario.name or f"Scenario {len(units) + 1}"
+            if not scenario.outline or not any(examples.rows for examples in scenario.examples):
+                units.append(ScenarioUnit(
+                    scenario_name,
+                    render_scenario(scenario_name, scenario.steps),
+                    tags,
+                    feature.name,
+                    rule.name if rule is not None else None,
+                    background,
+                    rule_background,
+                    line=scenario.line,
+                ))
+                continue
+            number = 0
+            for examples in scenario.examples:
+                for row in examples.rows:
+                    number += 1
+                    values = dict(zip(examples.header, row + [""] * (len(examples.header) - len(row))))
+                    name = f"{fill(scenario_name, values)} (example {number})"
+                    units.append(ScenarioUnit(
+                        name,
+                        render_scenario(name, [step.substitute(values) for step in scenario.steps]),
+                        _unique(tags + examples.tags),
+                        feature.name,
+                        rule.name if rule is not None else None,
+                        background,
+                        rule_background,
+                        outline=scenario.name,
+                        example=values,
+                        line=scenario.line,
+                    ))
+    return units
+
+
+def parse_units(text: str) -> List[ScenarioUnit]:
+    """Parse Gherkin content and expand it into executable units"""
+    return expand(parse_feature(text))
+
+
+def _unique(tags: List[str]) -> List[str]:
+    return list(dict.fromkeys(tags))
@@ -0,0 +1,183 @@
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+XPATH_PATTERN = re.compile(r"xpath='([^']+)'")
+CONTENT_XPATH_PATTERN = re.compile(r"The xpath of the element is (.+)")
+CONTENT_INDEX_PATTERN = re.compile(r"element (\d+)")
+
+# Actions whose parameters carry the index of the element they act on
+ELEMENT_ACTIONS = ("input_text", "click_element", "perform_element_action")
+# Action the agent calls when it finished a Gherkin step; kept for replay, not analysed
+STEP_MARKER_ACTION = "complete_gherkin_step"
+
+
+class HistoryProcessor:
+    """Single-pass, incremental analysis of an agent's history.
+
+    Walks each ``AgentHistory`` step exactly once and builds the detailed
+    actions list, the element XPath map and the extracted content that the
+    UI and the code generators need. Steps can be fed as they complete (see
+    ``on_step_end``) or all at once after the run; either way every step is
+    processed once. No Streamlit dependency, so it is usable from scripts.
+    """
+
+    def __init__(self):
+        self.steps_processed = 0
+        self.urls: List[Optional[str]] = []
+        self.errors: List[Optional[str]] = []
+        self.action_names: List[str] = []
+        self.model_actions: List[Dict[str, Any]] = []
+        self.actions: List[Dict[str, Any]] = []
+        # Error of each entry of ``actions``, or None if it succeeded
+        self.action_errors: List[Optional[str]] = []
+        self.element_xpaths: Dict[Any, str] = {}
+        self.extracted_content: List[Any] = []
+        # (action number, action name, interacted element) for the raw DOM view
+        self.interacted_elements: List[Tuple[int, str, Any]] = []
+        # Per step: the URL it started on and its actions with their target XPaths, for replay
+        self.steps: List[Dict[str, Any]] = []
+
+    def process_history(self, history: Any) -> "HistoryProcessor":
+        """Process the steps of an AgentHistoryList that have not been seen yet"""
+        steps = getattr(history, "history", history)
+        for step in steps[self.steps_processed:]:
+            self.process_step(step)
+        return self
+
+    async def on_step_end(self, agent: Any) -> None:
+        """Agent hook processing each step as soon as it completes"""
+        history = getattr(agent, "history", None)
+        if history is None:
+            history = getattr(getattr(agent, "state", None), "history", None)
+        if history is not None:
+            self.process_history(history)
+
+    def process_step(self, step: Any) -> None:
+        """Process one AgentHistory step"""
+        self.steps_processed += 1
+        state = getattr(step, "state", None)
+        model_output = getattr(step, "model_output", None)
+        actions = []
+        if model_output is not None:
+            interacted = getattr(state, "interacted_element", None) or []
+            actions = [
+                (action.model_dump(exclude_none=True), element)
+                for action, element in zip(model_output.action, interacted)
+            ]
+        self.process_actions(getattr(state, "url", None), actions, getattr(step, "result", None) or [])
+
+    def process_actions(self, url: Optional[str], actions: List[Tuple[Dict[str, Any], Any]], results: List[Any]) -> None:
+        """Process the (action data, interacted element) pairs and results of one step.
+
+        Used for agent steps and for steps executed by trace replay, which do
+        not count towards ``steps_processed``.
+        """
+        self.urls.append(url)
+        self.errors.append(next((result.error for result in results if result.error), None))
+
+        step_actions = []
+        for i, (action_data, element) in enumerate(actions):
+            action_data["interacted_element"] = element
+            name = next((key for key in action_data if key != "interacted_element"), None)
+            if name != STEP_MARKER_ACTION:
+                self._process_action(action_data, element)
+                self.action_errors.append(results[i].error if i < len(results) else None)
+            if name is not None:
+                step_actions.append({
+                    "name": name,
+                    "params": action_data[name],
+                    "xpath": self._element_xpath(element) if element else None,
+                    "error": bool(i < len(results) and results[i].error),
+                })
+        self.steps.append({"url": url, "actions": step_actions})
+
+        for result in results:
+            if result.extracted_content:
+                self._process_content(result.extracted_content)
+
+    def _process_action(self, action_data: Dict[str, Any], element: Any) -> None:
+        i = len(self.model_actions)
+        action_name = next((key for key in action_data if key != "interacted_element"), "Unknown Action")
+        self.model_actions.append(action_data)
+        self.action_names.append(action_name)
+
+        action_detail = {"name": action_name, "index": i, "element_details": {}}
+        element_details = action_detail["element_details"]
+
+        if "get_xpath_of_element" in action_data:
+            element_index = action_data["get_xpath_of_element"].get("index")
+            element_details["index"] = element_index
+            xpath = self._element_xpath(element) if element else None
+            if xpath:
+                self.element_xpaths[element_index] = xpath
+                element_details["xpath"] = xpath
+        else:
+            for key in ELEMENT_ACTIONS:
+                params = action_data.get(key)
+                if params and "index" in params:
+                    element_index = params["index"]
+                    element_details["index"] = element_index
+                    xpath = self._element_xpath(element) if element else None
+                    if xpath:
+                        self.element_xpaths[element_index] = xpath
+                    if element_index in self.element_xpaths:
+                        element_details["xpath"] = self.element_xpaths[element_index]
+
+        if element:
+            self.interacted_elements.append((i, action_name, element))
+        self.actions.append(action_detail)
+
+    def _process_content(self, content: Any) -> None:
+        self.extracted_content.append(content)
+        # Look for XPath information in extracted content
+        if isinstance(content, str):
+            xpath_match = CONTENT_XPATH_PATTERN.search(content)
+            if xpath_match:
+                index_match = CONTENT_INDEX_PATTERN.search(content)
+                if index_match:
+                    self.element_xpaths[int(index_match.group(1))] = xpath_match.group(1)
+
+    @staticmethod
+    def _element_xpath(element: Any) -> Optional[str]:
+        xpath = getattr(element, "xpath", None)
+        if isinstance(xpath, str):
+            return xpath
+        # Fall back to the repr of the DOMHistoryElement
+        xpath_match = XPATH_PATTERN.search(str(element))
+        return xpath_match.group(1) if xpath_match else None
+
+    @classmethod
+    def merge(cls, processors: Iterable["HistoryProcessor"]) -> "HistoryProcessor":
+        """Concatenate the output of several processors in order.
+
+        Element indexes are only unique within one run, so the element XPath
+        maps are not merged; keep each processor's ``element_xpaths`` instead.
+        """
+        merged = cls()
+        for processor in processors:
+            offset = len(merged.model_actions)
+            merged.steps_processed += processor.steps_processed
+            merged.urls.extend(processor.urls)
+            merged.errors.extend(processor.errors)
+            merged.action_names.extend(processor.action_names)
+            merged.model_actions.extend(processor.model_actions)
+            merged.actions.extend(processor.actions)
+            merged.action_errors.extend(processor.action_errors)
+            merged.extracted_content.extend(processor.extracted_content)
+            merged.steps.extend(processor.steps)
+            merged.interacted_elements.extend(
+                (offset + i, name, element) for i, name, element in processor.interacted_elements
+            )
+        return merged
+
+    def to_dict(self) -> Dict[str, Any]:
+        """History dictionary in the shape expected by the code generators"""
+        return {
+            "urls": self.urls,
+            "action_names": self.action_names,
+            "detailed_actions": self.actions,
+            "element_xpaths": self.element_xpaths,
+            "extracted_content": self.extracted_content,
+            "errors": self.errors,
+            "model_actions": self.model_actions,
+        }
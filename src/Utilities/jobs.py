@@ -0,0 +1,308 @@
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.Utilities.lazy import resolve
+
+# SQLite file shared by the UI process and the worker processes
+DEFAULT_JOBS_PATH = os.environ.get("FORTIAGENT_JOBS_PATH", ".fortiagent_jobs.sqlite3")
+# Number of worker processes; each one owns its own event loop and browser
+DEFAULT_WORKERS = int(os.environ.get("FORTIAGENT_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Seconds an idle worker waits before looking for new jobs
+POLL_INTERVAL = float(os.environ.get("FORTIAGENT_JOB_POLL_INTERVAL", "0.5"))
+# Finished jobs are deleted after this many seconds
+JOB_RETENTION = float(os.environ.get("FORTIAGENT_JOB_RETENTION", str(24 * 3600)))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED_STATUSES = (SUCCEEDED, FAILED)
+
+# Functions running each kind of job, as "module:function"; called with (payload, progress)
+JOB_HANDLERS = {
+    "gherkin": "src.Utilities.pipeline:run_gherkin_job",
+    "execute": "src.Utilities.pipeline:run_execute_job",
+    "codegen": "src.Utilities.pipeline:run_codegen_job",
+    "codegen_all": "src.Utilities.pipeline:run_codegen_all_job",
+}
+
+
+class JobStore:
+    """SQLite-backed queue of generate/execute/codegen jobs.
+
+    The UI enqueues jobs and polls them by id; worker processes claim queued
+    jobs one at a time, report progress while they run and store the result
+    or error. Payloads and results are stored as JSON.
+    """
+
+    def __init__(self, path: str = DEFAULT_JOBS_PATH):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    progress TEXT,
+                    result TEXT,
+                    error TEXT,
+                    worker TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, kind: str, payload: Dict[str, Any]) -> str:
+        """Queue a job and return its id"""
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, json.dumps(payload, default=str), time.time()),
+            )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job without its payload, or None if it does not exist"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, kind, status, progress, result, error, created_at, started_at, finished_at "
+                "FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def claim(self, worker: str) -> Optional[Dict[str, Any]]:
+        """Mark the oldest queued job as running on ``worker``, a ``worker_token``, and return it with its payload"""
+        with self._connect() as conn:
+            # BEGIN IMMEDIATE takes the write lock so two workers never claim the same job
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT id, kind, payload FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                    (QUEUED,),
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, worker = ?, started_at = ? WHERE id = ?",
+                        (RUNNING, worker, time.time(), row["id"]),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return {"id": row["id"], "kind": row["kind"], "payload": json.loads(row["payload"])}
+
+    def set_progress(self, job_id: str, progress: str) -> None:
+        """Store the latest progress of a running job, e.g. the partially generated text"""
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET progress = ? WHERE id = ?", (progress, job_id))
+
+    def succeed(self, job_id: str, result: Any) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, finished_at = ? WHERE id = ?",
+                (SUCCEEDED, json.dumps(result, default=str), time.time(), job_id),
+            )
+
+    def fail(self, job_id: str, error: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                (FAILED, error, time.time(), job_id),
+            )
+
+    def fail_orphans(self) -> int:
+        """Fail running jobs whose worker process no longer exists"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT id, worker FROM jobs WHERE status = ?", (RUNNING,)).fetchall()
+            orphans = [row["id"] for row in rows if row["worker"] is None or not worker_alive(str(row["worker"]))]
+            if not orphans:
+                return 0
+            # A job may have finished since it was read, so only running ones are failed
+            cursor = conn.execute(
+                f"UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE status = ? "
+                f"AND id IN ({','.join('?' for _ in orphans)})",
+                (FAILED, "Worker process exited while running the job", time.time(), RUNNING, *orphans),
+            )
+            return cursor.rowcount
+
+    def prune(self, older_than: float = JOB_RETENTION) -> int:
+        """Delete finished jobs older than ``older_than`` seconds"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"DELETE FROM jobs WHERE status IN ({','.join('?' for _ in FINISHED_STATUSES)}) AND finished_at < ?",
+                (*FINISHED_STATUSES, time.time() - older_than),
+            )
+            return cursor.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+
+def pid_alive(pid: int) -> bool:
+    """Whether a process with this pid exists on this machine"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # The process exists but belongs to another user
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def process_start_time(pid: int) -> Optional[str]:
+    """Start time of a process in clock ticks since boot, or None where /proc is not available"""
+    try:
+        with open(f"/proc/{pid}/stat", encoding="utf-8") as handle:
+            stat = handle.read()
+    except OSError:
+        return None
+    # The command name may contain spaces, so count fields after it; starttime is field 22
+    return stat.rsplit(")", 1)[1].split()[19]
+
+
+def worker_token(pid: Optional[int] = None) -> str:
+    """Identity of a worker process: its pid and start time, so a reused pid is not mistaken for it"""
+    pid = pid if pid is not None else os.getpid()
+    started = process_start_time(pid)
+    return f"{pid}:{started}" if started is not None else str(pid)
+
+
+def worker_alive(token: str) -> bool:
+    """Whether the worker process a ``worker_token`` was taken from still runs"""
+    pid, _, started = token.partition(":")
+    try:
+        pid = int(pid)
+    except ValueError:
+        return False
+    if not pid_alive(pid):
+        return False
+    # Without a start time only the pid can be checked
+    return not started or process_start_time(pid) == started
+
+
+def run_job(store: JobStore, job: Dict[str, Any]) -> None:
+    """Run one claimed job and store its result or error"""
+    try:
+        handler = resolve(JOB_HANDLERS[job["kind"]])
+        result = handler(job["payload"], lambda progress: store.set_progress(job["id"], progress))
+    except Exception as e:
+        traceback.print_exc()
+        store.fail(job["id"], str(e))
+    else:
+        store.succeed(job["id"], result)
+
+
+def worker_main(path: str, poll_interval: float = POLL_INTERVAL) -> None:
+    """Entry point of a worker process: claim and run jobs until the parent exits"""
+    store = JobStore(path)
+    token = worker_token()
+    parent = os.getppid()
+    while os.getppid() == parent:
+        job = store.claim(token)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        run_job(store, job)
+
+
+class JobWorkerPool:
+    """Worker processes serving a job store.
+
+    Workers are started with the ``spawn`` method so they never inherit the
+    threads of the Streamlit server. ``ensure_running`` replaces workers that
+    died and fails the jobs they were running. Jobs left running by workers
+    of an earlier server are failed once, when the pool first starts; jobs
+    of workers that are still alive, e.g. those of another server sharing
+    the store, are left alone.
+    """
+
+    def __init__(self, path: str = DEFAULT_JOBS_PATH, processes: int = DEFAULT_WORKERS):
+        self.path = path
+        self.processes = max(1, int(processes))
+        self.store = JobStore(path)
+        self._context = multiprocessing.get_context("spawn")
+        self._workers: List[Any] = []
+        self._started = False
+        self._lock = threading.Lock()
+
+    def ensure_running(self) -> None:
+        """Start the worker processes that are not running"""
+        with self._lock:
+            alive = [worker for worker in self._workers if worker.is_alive()]
+            if not self._started or len(alive) < len(self._workers):
+                # At start-up, or after one of our workers died
+                self.store.fail_orphans()
+                self._started = True
+            self._workers = alive
+            while len(self._workers) < self.processes:
+                worker = self._context.Process(
+                    target=worker_main, args=(self.path,), name="fortiagent-worker", daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            for worker in self._workers:
+                worker.terminate()
+            for worker in self._workers:
+                worker.join(timeout)
+            self._workers = []
+
+    def submit(self, kind: str, payload: Dict[str, Any]) -> str:
+        """Queue a job, making sure workers are there to run it"""
+        self.ensure_running()
+        self.store.prune()
+        return self.store.enqueue(kind, payload)
+
+
+_pool: Optional[JobWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> JobWorkerPool:
+    """Return the process-wide worker pool, creating it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = JobWorkerPool()
+        return _pool
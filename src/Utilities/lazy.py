@@ -0,0 +1,45 @@
+import importlib
+import importlib.util
+import sys
+from types import ModuleType
+from typing import Any, Callable
+
+
+def resolve(target: str) -> Callable[..., Any]:
+    """Import the object named by a "module:attribute" string"""
+    module_name, attribute = target.split(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Return a module whose code only runs when one of its attributes is first used"""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+class LazyCallable:
+    """Function given as "module:function" that is imported on its first call."""
+
+    __slots__ = ("target", "__name__", "_function")
+
+    def __init__(self, target: str):
+        self.target = target
+        self.__name__ = target.split(":")[1]
+        self._function = None
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        if self._function is None:
+            self._function = resolve(self.target)
+        return self._function(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"LazyCallable({self.target!r})"
@@ -0,0 +1,166 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from src.Utilities.cache import digest
+from src.Utilities.gherkin import is_header, parse_units
+
+QUOTED = re.compile(r'"([^\"]+)"')
+# Compiled plans kept in memory, by digest of the Gherkin text
+MAX_PLANS = 256
+
+
+class MobileStep:
+    """One Gherkin line compiled to the device action it performs."""
+
+    __slots__ = ("line", "kind", "element_id", "value")
+
+    def __init__(self, line: str, kind: Optional[str] = None, element_id: Optional[str] = None, value: Optional[str] = None):
+        self.line = line
+        # "tap", "enter", "verify", or None for lines that only document the scenario
+        self.kind = kind
+        self.element_id = element_id
+        self.value = value
+
+
+def compile_step(line: str) -> MobileStep:
+    """Turn one Gherkin line into a step, matching its keywords and quoted arguments once"""
+    lower = line.lower()
+    if "tap" in lower:
+        match = QUOTED.search(line)
+        if match:
+            return MobileStep(line, "tap", match.group(1))
+    elif "enter" in lower or "type" in lower:
+        # Expect pattern: enter "value" into "field"
+        matches = QUOTED.findall(line)
+        if len(matches) >= 2:
+            return MobileStep(line, "enter", matches[1], matches[0])
+    elif "see" in lower or "should" in lower:
+        match = QUOTED.search(line)
+        if match:
+            return MobileStep(line, "verify", match.group(1))
+    return MobileStep(line)
+
+
+_plans: "OrderedDict[str, Tuple[MobileStep, ...]]" = OrderedDict()
+_plans_lock = threading.Lock()
+
+
+def compile_steps(gherkin_steps: str) -> Tuple[MobileStep, ...]:
+    """Executable plan of a Gherkin text, compiled on first use and cached by its digest"""
+    key = digest(gherkin_steps)
+    with _plans_lock:
+        plan = _plans.get(key)
+        if plan is not None:
+            _plans.move_to_end(key)
+            return plan
+    # Outlines run once per Examples row; bare step lists are used as they are
+    units = parse_units(gherkin_steps)
+    text = "\n".join(unit.executable() for unit in units) if units else gherkin_steps
+    # Only steps become plan lines; headers, including the one given to a bare step list, are dropped
+    plan = tuple(
+        compile_step(line)
+        for line in (raw_line.strip() for raw_line in text.splitlines())
+        if line and not line.startswith("#") and not line.endswith(":") and not is_header(line)
+    )
+    with _plans_lock:
+        _plans[key] = plan
+        while len(_plans) > MAX_PLANS:
+            _plans.popitem(last=False)
+    return plan
+
+
+class LocatorCache:
+    """Elements found on the current screen, by accessibility id.
+
+    Repeated references to an element skip the ``find_element`` round trip
+    until the screen changes. After a tap the current activity is compared
+    with the one the elements were found on; drivers that cannot report it
+    (iOS) drop the cache after every tap. A cached element that turned stale
+    anyway is looked up again once. Verifications always use ``lookup``,
+    since a screen can change without changing its activity.
+    """
+
+    def __init__(self, driver: Any):
+        self.driver = driver
+        self.elements: Dict[str, Any] = {}
+        self.screen = self._screen()
+        self.hits = 0
+        self.misses = 0
+
+    def find(self, element_id: str) -> Any:
+        element = self.elements.get(element_id)
+        if element is not None:
+            self.hits += 1
+            return element
+        return self.lookup(element_id)
+
+    def lookup(self, element_id: str) -> Any:
+        """Find an element on the device, bypassing and then updating the cache"""
+        self.misses += 1
+        element = self.driver.find_element("accessibility id", element_id)
+        self.elements[element_id] = element
+        return element
+
+    def forget(self, element_id: str) -> None:
+        self.elements.pop(element_id, None)
+
+    def refresh(self) -> None:
+        """Drop the cached elements if the screen may have changed"""
+        screen = self._screen()
+        if screen is None or screen != self.screen:
+            self.elements.clear()
+        self.screen = screen
+
+    def _screen(self) -> Optional[str]:
+        try:
+            return self.driver.current_activity
+        except Exception:
+            return None
+
+
+def run_step(step: MobileStep, locators: LocatorCache) -> Tuple[Optional[str], Optional[str]]:
+    """Perform one compiled step; return what it did for the history and its error, if any"""
+    if step.kind is None:
+        return None, None
+    for attempt in range(2):
+        cached = step.kind != "verify" and step.element_id in locators.elements
+        try:
+            if step.kind == "verify":
+                # A cached element only proves the element was there earlier
+                locators.lookup(step.element_id)
+                return f"Verified element {step.element_id} is visible", None
+            element = locators.find(step.element_id)
+            if step.kind == "tap":
+                element.click()
+                locators.refresh()
+                return f"Tapped element {step.element_id}", None
+            element.send_keys(step.value)
+            return f"Entered {step.value} into {step.element_id}", None
+        except Exception as e:
+            locators.forget(step.element_id)
+            if cached and attempt == 0:
+                # The cached element went stale; find it again
+                continue
+            if step.kind == "tap":
+                content = f"Error tapping element {step.element_id}: {e}"
+            elif step.kind == "enter":
+                content = f"Error entering text into {step.element_id}: {e}"
+            else:
+                content = f"Verification failed for {step.element_id}: {e}"
+            return content, content
+    return None, None
+
+
+def run_plan(plan: Tuple[MobileStep, ...], driver: Any) -> Dict[str, Any]:
+    """Execute a compiled plan on a driver and return its history dictionary"""
+    history: Dict[str, Any] = {"action_names": [], "extracted_content": [], "urls": [], "errors": []}
+    locators = LocatorCache(driver)
+    for step in plan:
+        history["action_names"].append(step.line)
+        content, error = run_step(step, locators)
+        if content is not None:
+            history["extracted_content"].append(content)
+        history["errors"].append(error)
+    return history
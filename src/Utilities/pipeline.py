@@ -0,0 +1,429 @@
+import asyncio
+import io
+import os
+import re
+import zipfile
+from typing import Any, Callable, Dict, Optional
+
+from src.Utilities.execution import ContextPool, parse_background, run_scenarios
+from src.Utilities.gherkin import parse_units
+from src.Utilities.lazy import LazyCallable
+from src.Utilities.runtime import get_runtime
+from src.Utilities.trace import ExecutionTrace, current_trace
+from src.Utilities.history_processor import HistoryProcessor
+from src.Utilities.replay import ReplayStore, continuation_task, get_state, replay_steps
+from src.Utilities.plan_cache import StepPlanCache, gherkin_steps, step_marker_instructions
+from src.Utilities.session_state import SharedSetup
+from src.Utilities.run_store import RunStore, history_to_dict
+from src.Utilities.telemetry import current_run_id, new_run_id, record_agent_history, track_chat_model
+from src.Prompts.browser_prompts import generate_browser_task
+
+# browser_use, droidrun and the agno generators are imported on first use, so the UI
+# process, which only queues jobs, starts without them
+
+
+# Dictionary mapping framework names to their generation functions
+FRAMEWORK_GENERATORS = {
+    "Selenium + PyTest BDD (Python)": LazyCallable("src.Prompts.agno_prompts:generate_selenium_pytest_bdd"),
+    "Playwright (Python)": LazyCallable("src.Prompts.agno_prompts:generate_playwright_python"),
+    "Cypress (JavaScript)": LazyCallable("src.Prompts.agno_prompts:generate_cypress_js"),
+    "Robot Framework": LazyCallable("src.Prompts.agno_prompts:generate_robot_framework"),
+    "Selenium + Cucumber (Java)": LazyCallable("src.Prompts.agno_prompts:generate_java_selenium")
+}
+
+# Dictionary mapping framework names to their file extensions
+FRAMEWORK_EXTENSIONS = {
+    "Selenium + PyTest BDD (Python)": "py",
+    "Playwright (Python)": "py",
+    "Cypress (JavaScript)": "js",
+    "Robot Framework": "robot",
+    "Selenium + Cucumber (Java)": "java"
+}
+
+
+def extract_feature_name(gherkin_steps: str) -> str:
+    """Build a file-name friendly feature name from the Gherkin Feature line"""
+    feature_match = re.search(r"Feature:\s*(.+?)(?:\n|$)", gherkin_steps)
+    if feature_match:
+        return feature_match.group(1).strip().replace(" ", "_").lower()
+    return "automated_test"
+
+
+def framework_slug(framework: str) -> str:
+    """File-name friendly identifier of a framework, e.g. playwright_python"""
+    return re.sub(r"[^a-z0-9]+", "_", framework.lower()).strip("_")
+
+
+def code_file_name(framework: str, feature_name: str) -> str:
+    """Relative path of the generated code of one framework for a feature"""
+    return f"{framework_slug(framework)}/{feature_name}_automation.{FRAMEWORK_EXTENSIONS[framework]}"
+
+
+def build_code_archive(generated_code: Dict[str, Dict[str, str]], feature_name: str) -> bytes:
+    """Bundle the generated code of every framework into a single zip archive"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for framework, generated in generated_code.items():
+            if "code" not in generated:
+                continue
+            archive.writestr(code_file_name(framework, feature_name), generated["code"])
+    return buffer.getvalue()
+
+
+# Model driving the browser and mobile agents
+AGENT_MODEL = "gpt-4o"
+# Page every browser scenario starts from
+START_URL = os.environ.get("FORTIAGENT_START_URL", "https://ftc-sso.fortinet.com")
+
+# Recorded steps of passed browser scenarios, replayed instead of re-running the agent
+replay_store = ReplayStore()
+# Verified actions of single Gherkin steps, shared by every scenario containing the step
+step_plans = StepPlanCache()
+# Full per-scenario records of every execution, loaded by the UI on demand
+run_store = RunStore()
+
+
+def store_scenario(run_id: str, position: int, feature: str, outcome: Dict[str, Any]) -> Optional[str]:
+    """Write a scenario outcome, with its agent history, to the run store and return its scenario id"""
+    record = {**outcome, "agent_history": history_to_dict(outcome.get("agent_history"))}
+    try:
+        return run_store.save(
+            run_id,
+            record,
+            position=position,
+            feature=feature,
+            name=outcome["name"],
+            status=outcome["status"],
+            duration=outcome.get("duration") or 0.0,
+        )
+    except Exception as e:
+        print(f"Error storing scenario record: {e}")
+        return None
+
+
+def scenario_status(history: Any) -> str:
+    """passed, failed or incomplete depending on how the agent finished"""
+    is_successful = getattr(history, "is_successful", None)
+    success = is_successful() if callable(is_successful) else None
+    if success is None:
+        return "incomplete"
+    return "passed" if success else "failed"
+
+
+async def execute_test(
+    steps: str,
+    platform: str,
+    max_parallel: int,
+    run_id: Optional[str] = None,
+    env_factory: Optional[Callable[[], Any]] = None,
+    replay: bool = True,
+    setup: Optional[str] = None,
+    share_setup: bool = True,
+) -> Dict[str, Any]:
+    """Execute the Gherkin scenarios and collect detailed execution information.
+
+    With ``replay``, browser scenarios that passed before are replayed from
+    their recorded steps and the agent only takes over where the page no
+    longer matches the recording. Other scenarios start with the Gherkin
+    steps that have a cached plan for the current page.
+
+    With ``share_setup``, the feature's Background, or the ``setup`` scenario
+    when given, runs once and every browser scenario starts from a snapshot
+    of the cookies and localStorage it left behind.
+    """
+    # LLM calls made by this execution are recorded under the caller's run id
+    run_id = run_id or new_run_id()
+    current_run_id.set(run_id)
+    from browser_use import Browser, Agent as BrowserAgent
+    from browser_use.llm import ChatOpenAI
+    from src.Utilities.utils import controller
+
+    runtime = get_runtime()
+    if platform == "Browser":
+        env = await runtime.acquire(platform, env_factory or Browser)
+        AgentClass = BrowserAgent
+        agent_kwargs = {"browser": env}
+    else:
+        # Optional mobile automation support via droidrun
+        try:
+            from droidrun import Droid, Agent as MobileAgent
+        except Exception as e:  # pragma: no cover - droidrun may not be installed
+            raise RuntimeError("droidrun is required for mobile execution") from e
+        env = await runtime.acquire(platform, env_factory or Droid)
+        AgentClass = MobileAgent
+        agent_kwargs = {"droid": env}
+
+    failed = False
+    try:
+        # One unit per scenario and per Examples row of every outline; the Background is handled below
+        units = parse_units(steps)
+        scenarios = [unit.executable(include_background=False) for unit in units]
+
+        # A single device cannot be shared, so mobile runs stay sequential
+        max_concurrency = max_parallel if platform == "Browser" else 1
+        pool = ContextPool(env, max_size=max_concurrency)
+
+        initial_actions = [
+            {'go_to_url': {'url': START_URL, 'new_tab': False}},
+        ]
+
+        setup_scenario = setup or parse_background(steps)
+        shared_setup = None
+
+        def start_actions(scenario: str):
+            # Scenarios seeded with the setup state already are on the right page
+            if shared_setup is not None and not shared_setup.includes_setup(scenario):
+                return []
+            return initial_actions
+
+        def build_agent(scenario: str, context, replay_outcome):
+            context_kwargs = {"browser_context": context} if platform == "Browser" else {}
+            task = generate_browser_task(scenario)
+            if replay and platform == "Browser":
+                # Step markers split the agent's actions into per-step plans
+                task += step_marker_instructions(gherkin_steps(scenario))
+            if replay_outcome is not None:
+                # Resume where replay stopped instead of starting over
+                task = continuation_task(task, replay_outcome)
+            llm = ChatOpenAI(model=AGENT_MODEL)
+            if platform == "Browser":
+                # One telemetry record per agent step; mobile runs are recorded per run from their history
+                llm = track_chat_model(llm, "browser_agent")
+            return AgentClass(
+                task=task,
+                initial_actions=(start_actions(scenario) or None) if replay_outcome is None else None,
+                llm=llm,
+                use_vision=False,
+                controller=controller,
+                **agent_kwargs,
+                **context_kwargs,
+            )
+
+        async def replay_scenario(scenario: str, context, processor: HistoryProcessor):
+            recorded_steps = replay_store.load(scenario, START_URL)
+            if recorded_steps is None:
+                return await step_plans.replay(scenario, context, controller, processor, start_actions(scenario))
+            outcome = await replay_steps(recorded_steps, context, controller, processor, start_actions(scenario))
+            if outcome.completed:
+                # Replayed actions only show the page still works as recorded; the Then steps
+                # are checked by the agent on the page the replay ended on
+                outcome.verify = [f"{step.keyword} {step.text}" for step in gherkin_steps(scenario) if step.assertion]
+                if outcome.verify:
+                    outcome.diverged_at = outcome.steps_total
+                    outcome.reason = "the Then steps are verified by the agent"
+            return outcome
+
+        async def run_setup_steps(context) -> Optional[str]:
+            # The setup gets its own trace so it does not mix with the scenario's
+            current_trace.set(ExecutionTrace())
+            processor = HistoryProcessor()
+            replay_outcome = await replay_scenario(setup_scenario, context, processor) if replay else None
+            if replay_outcome is None or not replay_outcome.completed:
+                agent = build_agent(setup_scenario, context, replay_outcome)
+                history = await agent.run(on_step_end=processor.on_step_end)
+                processor.process_history(history)
+                if scenario_status(history) != "passed":
+                    return None
+                if replay and not replay_outcome.verify:
+                    replay_store.save(setup_scenario, START_URL, processor.steps)
+                    if replay_outcome.kind == "steps":
+                        step_plans.record(
+                            setup_scenario, processor.steps[replay_outcome.handover:], current_trace.get().checkpoints
+                        )
+            return getattr(await get_state(context), "url", None)
+
+        async def run_setup(context) -> Optional[str]:
+            return await asyncio.create_task(run_setup_steps(context))
+
+        if share_setup and setup_scenario and platform == "Browser":
+            shared_setup = SharedSetup(setup_scenario, START_URL, run_setup, controller)
+        elif setup_scenario:
+            # Without a shared setup every scenario performs the setup steps itself
+            scenarios = [f"{setup_scenario}\n\n{scenario}" for scenario in scenarios]
+
+        # Execute the scenarios concurrently, each in its own context
+        replayer = replay_scenario if replay and platform == "Browser" else None
+        scenario_runs = await run_scenarios(
+            scenarios, pool, build_agent, replayer, shared_setup.prepare if shared_setup is not None else None
+        )
+
+        # Merge per-scenario results in scenario order
+        all_results = []
+        scenario_outcomes = []
+        scenario_model_actions = []
+        scenario_element_xpaths = []
+        processors = []
+        traces = []
+
+        feature_name = extract_feature_name(steps)
+
+        for position, (unit, scenario, scenario_run) in enumerate(zip(units, scenarios, scenario_runs)):
+            if isinstance(scenario_run, Exception):
+                all_results.append({"status": "error", "details": str(scenario_run)})
+                outcome = {
+                    "name": unit.name,
+                    "tags": unit.tags,
+                    "example": unit.example,
+                    "scenario": scenario,
+                    "status": "error",
+                    "error": str(scenario_run),
+                    "duration": 0.0,
+                }
+                outcome["scenario_id"] = store_scenario(run_id, position, feature_name, outcome)
+                scenario_outcomes.append(outcome)
+                scenario_model_actions.append([])
+                scenario_element_xpaths.append({})
+                continue
+
+            history = scenario_run.history
+            replay_outcome = scenario_run.replay
+            if history is not None:
+                if platform != "Browser":
+                    record_agent_history("mobile_agent", AGENT_MODEL, history)
+                result = history.final_result()
+                if isinstance(result, str):
+                    # Convert string result to JSON format
+                    result = {"status": result, "details": "Execution completed"}
+                status = scenario_status(history)
+                duration = getattr(history, "total_duration_seconds", None)
+                duration = duration() if callable(duration) else 0.0
+            else:
+                result = {
+                    "status": "Replayed",
+                    "details": f"Replayed {replay_outcome.steps_replayed} recorded steps without the agent",
+                }
+                status = "passed"
+                duration = 0.0
+            if replay_outcome is not None:
+                duration += replay_outcome.duration
+            all_results.append(result)
+            # Record passing runs so the next execution can replay them
+            if replay and platform == "Browser" and status == "passed" and history is not None:
+                # A fully replayed recording stays as it is; the agent only verified it
+                if replay_outcome is None or not replay_outcome.verify:
+                    replay_store.save(scenario_run.scenario, START_URL, scenario_run.processor.steps)
+                if replay_outcome is not None and replay_outcome.kind == "steps":
+                    step_plans.record(
+                        scenario_run.scenario,
+                        scenario_run.processor.steps[replay_outcome.handover:],
+                        scenario_run.trace.checkpoints,
+                    )
+            elif replay_outcome is not None and replay_outcome.kind == "steps" and status != "passed":
+                # A plan may have left the page in a state the rest of the scenario could not work with
+                step_plans.discard(replay_outcome.used)
+            errors = [error for error in scenario_run.processor.errors if error]
+            outcome = {
+                "name": unit.name,
+                "tags": unit.tags,
+                "example": unit.example,
+                "scenario": scenario,
+                "status": status,
+                "result": result,
+                "error": errors[-1] if errors else None,
+                "duration": duration,
+                "replay": replay_outcome.to_dict() if replay_outcome is not None else None,
+                "trace": scenario_run.trace.to_dict(),
+                "agent_history": history,
+            }
+            outcome["scenario_id"] = store_scenario(run_id, position, feature_name, outcome)
+            scenario_outcomes.append(outcome)
+
+            # Actions, XPaths and content were collected step by step during the run
+            processors.append(scenario_run.processor)
+            traces.append(scenario_run.trace)
+            scenario_model_actions.append(scenario_run.processor.model_actions)
+            scenario_element_xpaths.append(scenario_run.processor.element_xpaths)
+
+        processed = HistoryProcessor.merge(processors)
+
+        device_info = {}
+        if platform == "Mobile":
+            try:
+                async with pool.context() as context:
+                    driver = getattr(context, "driver", None)
+                    if driver is not None:
+                        if hasattr(driver, "execute_script"):
+                            info = driver.execute_script("mobile: deviceInfo")
+                            if asyncio.iscoroutine(info):
+                                info = await info
+                            device_info = info
+                        elif hasattr(driver, "capabilities"):
+                            device_info = driver.capabilities
+            except Exception as e:
+                device_info = {"error": str(e)}
+
+        run_store.prune()
+        return {
+            "results": all_results,
+            "scenarios": scenario_outcomes,
+            "actions": processed.actions,
+            "action_errors": processed.action_errors,
+            "scenario_element_xpaths": scenario_element_xpaths,
+            "extracted_content": processed.extracted_content,
+            "interacted_elements": processed.interacted_elements,
+            "scenario_model_actions": scenario_model_actions,
+            "device_info": device_info,
+            "setup": shared_setup.to_dict() if shared_setup is not None else None,
+            "run_id": run_id,
+            "history": {
+                **processed.to_dict(),
+                "trace": ExecutionTrace.merge(traces).to_dict(),
+            },
+        }
+    except Exception:
+        failed = True
+        raise
+    finally:
+        await runtime.release(platform, env, failed=failed)
+
+
+def run_gherkin_job(payload: Dict[str, Any], progress: Callable[[str], None]) -> str:
+    """Job handler generating Gherkin scenarios from manual test cases"""
+    from src.Prompts.agno_prompts import generate_gherkin_scenarios
+
+    current_run_id.set(payload.get("run_id"))
+    return generate_gherkin_scenarios(payload["manual_test_cases"], use_cache=payload.get("use_cache", True), on_update=progress)
+
+
+def run_execute_job(payload: Dict[str, Any], progress: Callable[[str], None]) -> Dict[str, Any]:
+    """Job handler executing Gherkin scenarios on the worker's browser or device.
+
+    Workers that only generate text never launch a browser: the first execute
+    job a worker claims launches it, and the runtime keeps it warm for the next.
+    """
+    progress("Executing scenarios...")
+    execution = get_runtime().run(execute_test(
+        payload["steps"],
+        payload["platform"],
+        payload["max_parallel"],
+        payload.get("run_id"),
+        replay=payload.get("replay", True),
+        setup=payload.get("setup"),
+        share_setup=payload.get("share_setup", True),
+    ))
+    # Histories and traces are in the run store; the UI loads them when asked
+    for scenario in execution["scenarios"]:
+        scenario.pop("agent_history", None)
+        scenario.pop("trace", None)
+    execution["interacted_elements"] = [
+        (i, action_name, str(element)) for i, action_name, element in execution["interacted_elements"]
+    ]
+    return execution
+
+
+def run_codegen_job(payload: Dict[str, Any], progress: Callable[[str], None]) -> str:
+    """Job handler generating the automation code of one framework"""
+    current_run_id.set(payload.get("run_id"))
+    generator = FRAMEWORK_GENERATORS[payload["framework"]]
+    return generator(payload["steps"], payload["history"], use_cache=payload.get("use_cache", True), on_update=progress)
+
+
+def run_codegen_all_job(payload: Dict[str, Any], progress: Callable[[str], None]) -> Dict[str, Dict[str, str]]:
+    """Job handler generating the automation code of every framework"""
+    from src.Prompts.agno_prompts import generate_all_frameworks
+
+    current_run_id.set(payload.get("run_id"))
+    progress(f"Generating code for {len(FRAMEWORK_GENERATORS)} frameworks...")
+    return generate_all_frameworks(
+        payload["steps"], payload["history"], FRAMEWORK_GENERATORS, use_cache=payload.get("use_cache", True)
+    )
@@ -0,0 +1,210 @@
+import json
+import re
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from src.Utilities.cache import ResponseCache, digest
+from src.Utilities.history_processor import STEP_MARKER_ACTION, HistoryProcessor
+from src.Utilities.replay import (
+    TERMINAL_ACTIONS,
+    ReplayOutcome,
+    action_runner,
+    get_state,
+    replay_actions,
+    run_initial_actions,
+)
+from src.Utilities.trace import record_checkpoint
+
+STEP_KEYWORDS = ("Given", "When", "Then", "And", "But", "*")
+# Steps checking an outcome always go to the agent: replaying their actions would not verify anything
+ASSERTION_KEYWORDS = ("Then",)
+# Path segments that identify a record rather than a page, e.g. /users/42 or /orders/3f2a9c1e
+ID_SEGMENT = re.compile(r"^(?:\d+|[0-9a-f]{8,}|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})$", re.I)
+
+
+class PlanStep:
+    """One Gherkin step of a scenario."""
+
+    __slots__ = ("keyword", "text", "assertion")
+
+    def __init__(self, keyword: str, text: str, assertion: bool):
+        self.keyword = keyword
+        self.text = text
+        self.assertion = assertion
+
+
+def gherkin_steps(scenario: str) -> List[PlanStep]:
+    """Steps of a scenario block in order; And/But take the kind of the step they continue"""
+    steps: List[PlanStep] = []
+    assertion = False
+    for line in scenario.split("\n"):
+        line = line.strip()
+        keyword = line.split(" ", 1)[0]
+        if keyword in STEP_KEYWORDS:
+            if keyword not in ("And", "But", "*"):
+                assertion = keyword in ASSERTION_KEYWORDS
+            steps.append(PlanStep(keyword, line[len(keyword):].strip(), assertion))
+        elif steps and (line.startswith("|") or line.startswith('"""')):
+            # Data tables and doc strings belong to the step above them
+            steps[-1].text += "\n" + line
+    return steps
+
+
+def normalize_step(text: str) -> str:
+    """Step text without its keyword and with whitespace collapsed"""
+    return "\n".join(" ".join(line.split()) for line in text.strip().split("\n"))
+
+
+def url_pattern(url: Optional[str]) -> str:
+    """URL without query and fragment, with record ids in the path replaced by *"""
+    parts = urlsplit(url or "")
+    segments = ["*" if ID_SEGMENT.match(segment) else segment for segment in parts.path.rstrip("/").split("/")]
+    return f"{parts.scheme}://{parts.netloc}{'/'.join(segments)}"
+
+
+def page_fingerprint(url: Optional[str], selector_map: Dict[int, Any]) -> str:
+    """Fingerprint of a page from its URL pattern and the set of its interactive elements.
+
+    It ignores element indices and record ids, so the same page reached in
+    another run or scenario gets the same value.
+    """
+    signature = sorted({
+        (getattr(node, "tag_name", "") or "", getattr(node, "xpath", "") or "")
+        for node in (selector_map or {}).values()
+    })
+    return digest(url_pattern(url), signature)
+
+
+def step_marker_instructions(steps: List[PlanStep]) -> str:
+    """Task addendum asking the agent to mark the end of every Gherkin step"""
+    numbered = "\n".join(f"    {number}. {step.keyword} {step.text}" for number, step in enumerate(steps, 1))
+    return (
+        "\n\n    **Step Markers:** The Gherkin steps of this scenario are numbered below. As soon as a step is "
+        "fully done, call the \"Mark Gherkin step complete\" action with its number before starting the next one.\n"
+        f"{numbered}\n"
+    )
+
+
+class StepPlanCache:
+    """Verified action sequences of Gherkin steps, keyed by step text and the page the step starts on.
+
+    A plan is stored once the scenario it came from passed and is reused by
+    any scenario sharing the step, e.g. "Given the user is logged in", on a
+    page with the same fingerprint. Each value also holds the fingerprint of
+    the page the step ended on, which replay checks before trusting the plan;
+    plans that fail are deleted.
+    """
+
+    def __init__(self, cache: Optional[ResponseCache] = None):
+        # Verified plans are not LLM responses, so FORTIAGENT_CACHE_DISABLED does not apply
+        self.cache = cache if cache is not None else ResponseCache("step_plans", max_entries=2048, enabled=True)
+
+    @staticmethod
+    def key(step_text: str, fingerprint: str) -> str:
+        return digest(normalize_step(step_text), fingerprint)
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self.cache.get(key)
+        return json.loads(value) if value is not None else None
+
+    def save(self, step_text: str, fingerprint: str, actions: List[Dict[str, Any]], after: str) -> None:
+        self.cache.set(
+            self.key(step_text, fingerprint),
+            json.dumps({"actions": actions, "after": after}, default=str),
+            metadata={"step": normalize_step(step_text), "actions": len(actions)},
+        )
+
+    def discard(self, keys: List[str]) -> None:
+        for key in keys:
+            self.cache.delete(key)
+
+    def record(self, scenario: str, steps: List[Dict[str, Any]], checkpoints: Dict[int, str]) -> int:
+        """Store the actions the agent performed for each marked Gherkin step; return how many were stored.
+
+        ``steps`` are the processor steps of the agent's part of a passed run
+        and ``checkpoints`` the page fingerprints recorded at step boundaries.
+        """
+        plan_steps = gherkin_steps(scenario)
+        stored = 0
+        pending: List[Dict[str, Any]] = []
+        for step in steps:
+            for action in step["actions"]:
+                if action.get("error") or action["name"] in TERMINAL_ACTIONS:
+                    continue
+                if action["name"] != STEP_MARKER_ACTION:
+                    pending.append({"name": action["name"], "params": action["params"], "xpath": action.get("xpath")})
+                    continue
+                number = (action["params"] or {}).get("step")
+                before, after = checkpoints.get(number), checkpoints.get((number or 0) + 1)
+                if (
+                    isinstance(number, int) and 1 <= number <= len(plan_steps)
+                    and not plan_steps[number - 1].assertion
+                    and pending and before and after
+                ):
+                    self.save(plan_steps[number - 1].text, before, pending, after)
+                    stored += 1
+                pending = []
+        return stored
+
+    async def replay(
+        self,
+        scenario: str,
+        context: Any,
+        controller: Any,
+        processor: HistoryProcessor,
+        initial_actions: Optional[List[Dict[str, Any]]] = None,
+    ) -> ReplayOutcome:
+        """Perform the leading Gherkin steps of a scenario from cached plans, without the LLM.
+
+        Stops at the first assertion step, step without a plan, or plan that
+        fails or does not end on its recorded page; the agent continues from
+        there. Failing plans are deleted.
+        """
+        plan_steps = gherkin_steps(scenario)
+        outcome = ReplayOutcome(len(plan_steps), kind="steps")
+        started = time.perf_counter()
+        act = action_runner(controller, context)
+
+        try:
+            reason = await run_initial_actions(act, initial_actions)
+            if reason is not None:
+                outcome.diverged_at, outcome.reason = 0, reason
+                return outcome
+
+            state = await get_state(context)
+            fingerprint = page_fingerprint(getattr(state, "url", None), getattr(state, "selector_map", {}))
+            for number, step in enumerate(plan_steps, 1):
+                record_checkpoint(number, fingerprint)
+                if step.assertion:
+                    outcome.diverged_at, outcome.reason = number - 1, f"Step {number} is a verification"
+                    return outcome
+                key = self.key(step.text, fingerprint)
+                plan = self.load(key)
+                if plan is None:
+                    outcome.diverged_at, outcome.reason = number - 1, f"No cached plan for step {number}"
+                    return outcome
+
+                actions, results, reason = await replay_actions(plan["actions"], context, act, state)
+                if actions:
+                    processor.process_actions(getattr(state, "url", None), actions, results)
+                state = await get_state(context)
+                fingerprint = page_fingerprint(getattr(state, "url", None), getattr(state, "selector_map", {}))
+                if reason is None and fingerprint != plan["after"]:
+                    reason = "the page differs from the recorded one"
+                if reason is not None:
+                    self.discard([key])
+                    # The agent redoes the step from wherever the plan left the page
+                    record_checkpoint(number, fingerprint)
+                    outcome.diverged_at, outcome.reason = number - 1, f"Cached plan of step {number} failed: {reason}"
+                    return outcome
+                outcome.used.append(key)
+                outcome.steps_replayed += 1
+            return outcome
+        except Exception as e:
+            outcome.diverged_at = outcome.steps_replayed
+            outcome.reason = f"Replay error: {e}"
+            return outcome
+        finally:
+            outcome.duration = time.perf_counter() - started
+            outcome.handover = len(processor.steps)
@@ -0,0 +1,234 @@
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from src.Utilities.cache import ResponseCache, digest, normalize_text
+from src.Utilities.history_processor import HistoryProcessor
+
+# Actions that end the agent loop and have nothing to replay
+TERMINAL_ACTIONS = ("done",)
+
+
+class ReplayOutcome:
+    """How far the replay of a recorded scenario got."""
+
+    __slots__ = ("kind", "steps_total", "steps_replayed", "diverged_at", "reason", "duration", "handover", "used", "verify")
+
+    def __init__(self, steps_total: int, kind: str = "scenario"):
+        # "scenario" for recorded agent steps, "steps" for cached plans of Gherkin steps
+        self.kind = kind
+        self.steps_total = steps_total
+        self.steps_replayed = 0
+        self.diverged_at: Optional[int] = None
+        self.reason: Optional[str] = None
+        self.duration = 0.0
+        # Number of processor steps recorded before the agent took over
+        self.handover = 0
+        # Cache keys of the plans that were replayed
+        self.used: List[str] = []
+        # Then steps left for the agent to check after every recorded action was replayed
+        self.verify: List[str] = []
+
+    @property
+    def completed(self) -> bool:
+        return self.diverged_at is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "steps_total": self.steps_total,
+            "steps_replayed": self.steps_replayed,
+            "diverged_at": self.diverged_at,
+            "reason": self.reason,
+            "duration": round(self.duration, 3),
+        }
+
+
+class ReplayStore:
+    """Recorded steps of scenarios that passed, keyed by scenario text and start URL."""
+
+    def __init__(self, cache: Optional[ResponseCache] = None):
+        # Recorded runs are not LLM responses, so FORTIAGENT_CACHE_DISABLED does not apply
+        self.cache = cache if cache is not None else ResponseCache("replay", max_entries=1024, enabled=True)
+
+    @staticmethod
+    def key(scenario: str, start_url: str) -> str:
+        return digest(normalize_text(scenario), start_url)
+
+    def load(self, scenario: str, start_url: str) -> Optional[List[Dict[str, Any]]]:
+        value = self.cache.get(self.key(scenario, start_url))
+        return json.loads(value) if value is not None else None
+
+    def save(self, scenario: str, start_url: str, steps: List[Dict[str, Any]]) -> None:
+        # Failed attempts the agent recovered from are not worth replaying
+        steps = [
+            {"url": step["url"], "actions": [action for action in step["actions"] if not action.get("error")]}
+            for step in steps
+        ]
+        self.cache.set(
+            self.key(scenario, start_url),
+            json.dumps(steps, default=str),
+            metadata={"start_url": start_url, "steps": len(steps)},
+        )
+
+
+def same_page(recorded_url: Optional[str], current_url: Optional[str]) -> bool:
+    """Whether two URLs point at the same page, ignoring the fragment and a trailing slash"""
+    if not recorded_url or not current_url:
+        return True
+    recorded, current = urlsplit(recorded_url), urlsplit(current_url)
+    return (
+        (recorded.scheme, recorded.netloc, recorded.path.rstrip("/"), recorded.query)
+        == (current.scheme, current.netloc, current.path.rstrip("/"), current.query)
+    )
+
+
+async def get_state(context: Any) -> Any:
+    """Read the current page state, refreshing the cached selector map"""
+    for name in ("get_state_summary", "get_browser_state_with_recovery", "get_state"):
+        getter = getattr(context, name, None)
+        if callable(getter):
+            return await getter()
+    raise RuntimeError("Browser context does not expose its page state")
+
+
+def find_element(selector_map: Dict[int, Any], xpath: str) -> Optional[tuple]:
+    """Return the (index, node) of the element with the recorded XPath in the current state"""
+    for index, node in selector_map.items():
+        if getattr(node, "xpath", None) == xpath:
+            return index, node
+    return None
+
+
+def action_runner(controller: Any, context: Any) -> Callable[[Dict[str, Any]], Awaitable[Any]]:
+    """Return a function executing one action, given as {name: params}, through the controller"""
+    ActionModel = controller.registry.create_action_model()
+
+    async def act(action_data: Dict[str, Any]) -> Any:
+        return await controller.act(ActionModel(**action_data), context)
+
+    return act
+
+
+async def replay_actions(
+    actions: List[Dict[str, Any]],
+    context: Any,
+    act: Callable[[Dict[str, Any]], Awaitable[Any]],
+    state: Any,
+) -> Tuple[List[Tuple[Dict[str, Any], Any]], List[Any], Optional[str]]:
+    """Execute recorded actions, re-resolving their target elements by XPath.
+
+    Returns the executed (action data, element) pairs, their results and the
+    reason replay stopped, or None when every action succeeded.
+    """
+    executed = []
+    results = []
+    for action in actions:
+        if action["name"] in TERMINAL_ACTIONS:
+            continue
+        params = dict(action["params"] or {})
+        element = None
+        if action.get("xpath") and "index" in params:
+            # Earlier actions may have changed the page
+            if executed:
+                state = await get_state(context)
+            match = find_element(getattr(state, "selector_map", {}) or {}, action["xpath"])
+            if match is None:
+                return executed, results, f"Element {action['xpath']} not found for {action['name']}"
+            params["index"], element = match
+        action_data = {action["name"]: params}
+        result = await act(action_data)
+        executed.append((action_data, element))
+        results.append(result)
+        if getattr(result, "error", None):
+            return executed, results, f"{action['name']} failed: {result.error}"
+    return executed, results, None
+
+
+async def run_initial_actions(
+    act: Callable[[Dict[str, Any]], Awaitable[Any]],
+    initial_actions: Optional[List[Dict[str, Any]]],
+) -> Optional[str]:
+    """Run the actions every scenario starts with; return why one failed, if it did"""
+    for action_data in initial_actions or []:
+        result = await act(action_data)
+        if getattr(result, "error", None):
+            return f"Initial action failed: {result.error}"
+    return None
+
+
+async def replay_steps(
+    steps: List[Dict[str, Any]],
+    context: Any,
+    controller: Any,
+    processor: HistoryProcessor,
+    initial_actions: Optional[List[Dict[str, Any]]] = None,
+) -> ReplayOutcome:
+    """Execute recorded steps directly through the controller, without the LLM.
+
+    Element indices change between runs, so every action targeting an
+    element is re-resolved by its recorded XPath against the current
+    selector map. Replay stops at the first step whose URL differs from the
+    recording, whose element is missing or whose action fails; everything
+    before it has been executed and fed to ``processor``.
+    """
+    outcome = ReplayOutcome(len(steps))
+    started = time.perf_counter()
+    act = action_runner(controller, context)
+
+    try:
+        reason = await run_initial_actions(act, initial_actions)
+        if reason is not None:
+            outcome.diverged_at, outcome.reason = 0, reason
+            return outcome
+
+        for number, step in enumerate(steps):
+            state = await get_state(context)
+            if not same_page(step.get("url"), getattr(state, "url", None)):
+                outcome.diverged_at = number
+                outcome.reason = f"Expected {step.get('url')}, found {getattr(state, 'url', None)}"
+                return outcome
+
+            actions, results, reason = await replay_actions(step["actions"], context, act, state)
+            if actions:
+                processor.process_actions(getattr(state, "url", None), actions, results)
+            if reason is not None:
+                outcome.diverged_at, outcome.reason = number, reason
+                return outcome
+            outcome.steps_replayed += 1
+        return outcome
+    except Exception as e:
+        outcome.diverged_at = outcome.steps_replayed
+        outcome.reason = f"Replay error: {e}"
+        return outcome
+    finally:
+        outcome.duration = time.perf_counter() - started
+        outcome.handover = len(processor.steps)
+
+
+def continuation_task(task: str, outcome: ReplayOutcome) -> str:
+    """Agent task resuming a scenario after replay diverged"""
+    if outcome.verify:
+        checks = "\n".join(f"    - {step}" for step in outcome.verify)
+        return (
+            f"{task}\n\n"
+            f"NOTE: Every recorded action of this scenario was already replayed and the browser is on the "
+            f"resulting page. Do not perform the actions again. Only check the following verification steps "
+            f"on the current page and fail the scenario if any of them does not hold:\n{checks}"
+        )
+    if outcome.kind == "steps":
+        if not outcome.steps_replayed:
+            return task
+        return (
+            f"{task}\n\n"
+            f"NOTE: Gherkin steps 1 to {outcome.steps_replayed} of this scenario were already performed "
+            f"and the browser is on the resulting page. Cached actions stopped because: {outcome.reason}. "
+            f"Continue with step {outcome.steps_replayed + 1} from the current page state; do not start over."
+        )
+    return (
+        f"{task}\n\n"
+        f"NOTE: The first {outcome.steps_replayed} recorded steps of this scenario were already replayed "
+        f"and the browser is on the resulting page. Replay stopped because: {outcome.reason}. "
+        f"Continue the scenario from the current page state; do not start over."
+    )
@@ -0,0 +1,150 @@
+import gzip
+import json
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+# Directory holding the compressed scenario records and their index
+DEFAULT_RUNS_DIR = os.environ.get("FORTIAGENT_RUNS_DIR", "runs")
+# Records older than this many seconds are deleted
+RUN_RETENTION = float(os.environ.get("FORTIAGENT_RUN_RETENTION", str(30 * 24 * 3600)))
+
+
+def history_to_dict(history: Any) -> Any:
+    """JSON-friendly form of an agent history"""
+    if history is None:
+        return None
+    model_dump = getattr(history, "model_dump", None)
+    if callable(model_dump):
+        return model_dump()
+    return str(history)
+
+
+class RunStore:
+    """Append-only store of scenario executions, keyed by run id and scenario id.
+
+    Each scenario's full record (agent history, trace, result) is written
+    once to its own gzip-compressed JSON file under ``<run id>/``, so
+    concurrent runs never overwrite each other. A SQLite index holds the
+    small fields the UI lists (time, feature, scenario, status, duration);
+    records are only read and decompressed when one is opened.
+    """
+
+    def __init__(self, path: str = DEFAULT_RUNS_DIR):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS scenarios (
+                    run_id TEXT NOT NULL,
+                    scenario_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    feature TEXT,
+                    name TEXT,
+                    status TEXT,
+                    duration REAL,
+                    file TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    PRIMARY KEY (run_id, scenario_id)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS scenarios_created ON scenarios (created_at)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(os.path.join(self.path, "index.sqlite3"), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def save(
+        self,
+        run_id: str,
+        record: Dict[str, Any],
+        position: int = 0,
+        feature: str = "",
+        name: str = "",
+        status: str = "",
+        duration: float = 0.0,
+    ) -> str:
+        """Write a scenario record and index it; return its scenario id"""
+        scenario_id = uuid.uuid4().hex
+        run_dir = os.path.join(self.path, run_id)
+        os.makedirs(run_dir, exist_ok=True)
+        file = os.path.join(run_id, f"{scenario_id}.json.gz")
+        data = gzip.compress(json.dumps(record, default=str).encode("utf-8"))
+        # Write under a temporary name so readers never see a partial record
+        temp_path = os.path.join(self.path, f"{file}.tmp")
+        with open(temp_path, "wb") as handle:
+            handle.write(data)
+        os.replace(temp_path, os.path.join(self.path, file))
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO scenarios VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, scenario_id, position, time.time(), feature, name, status, duration, file, len(data)),
+            )
+        return scenario_id
+
+    def load(self, run_id: str, scenario_id: str) -> Optional[Dict[str, Any]]:
+        """Read and decompress one scenario record, or None if it does not exist"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT file FROM scenarios WHERE run_id = ? AND scenario_id = ?", (run_id, scenario_id)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            with gzip.open(os.path.join(self.path, row["file"]), "rt", encoding="utf-8") as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return None
+
+    def scenarios(self, run_id: str) -> List[Dict[str, Any]]:
+        """Index entries of a run in execution order"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM scenarios WHERE run_id = ? ORDER BY created_at, position", (run_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def runs(self, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
+        """Most recent runs with their scenario counts, newest first"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT run_id, MIN(created_at) AS started_at, MAX(created_at) AS finished_at,
+                       GROUP_CONCAT(DISTINCT feature) AS features, COUNT(*) AS scenarios,
+                       SUM(status = 'passed') AS passed, SUM(duration) AS duration, SUM(size) AS size
+                FROM scenarios GROUP BY run_id ORDER BY finished_at DESC LIMIT ? OFFSET ?
+                """,
+                (limit, offset),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def prune(self, older_than: float = RUN_RETENTION) -> int:
+        """Delete records older than ``older_than`` seconds; return how many were deleted"""
+        cutoff = time.time() - older_than
+        with self._connect() as conn:
+            rows = conn.execute("SELECT run_id, file FROM scenarios WHERE created_at < ?", (cutoff,)).fetchall()
+            conn.execute("DELETE FROM scenarios WHERE created_at < ?", (cutoff,))
+        for row in rows:
+            try:
+                os.remove(os.path.join(self.path, row["file"]))
+            except FileNotFoundError:
+                pass
+        for run_id in {row["run_id"] for row in rows}:
+            try:
+                os.rmdir(os.path.join(self.path, run_id))
+            except OSError:
+                # Newer records of the run are still there
+                pass
+        return len(rows)
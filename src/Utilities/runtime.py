@@ -0,0 +1,165 @@
+import asyncio
+import concurrent.futures
+import os
+import threading
+from typing import Any, Callable, Coroutine, Dict, Optional
+
+# Number of runs served by one browser/device before it is relaunched
+DEFAULT_MAX_USES = int(os.environ.get("FORTIAGENT_RUNTIME_MAX_USES", "20"))
+
+
+class _Environment:
+    """Book-keeping for one launched browser or device."""
+
+    def __init__(self, env: Any):
+        self.env = env
+        self.uses = 0
+        self.active = 0
+        self.retired = False
+
+
+class BrowserRuntime:
+    """Process-wide background event loop owning warm browser/device environments.
+
+    Streamlit re-executes the script on every interaction, so anything created
+    inside ``asyncio.run`` is thrown away. The runtime keeps one event loop alive
+    on a daemon thread and one launched environment per platform, which is
+    health-checked before reuse and relaunched after ``max_uses`` runs or once
+    it has crashed.
+    """
+
+    def __init__(self, max_uses: int = DEFAULT_MAX_USES):
+        self.max_uses = max(1, int(max_uses))
+        self._environments: Dict[str, _Environment] = {}
+        self._retired: Dict[int, _Environment] = {}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run_loop, name="fortiagent-runtime", daemon=True
+        )
+        self._thread.start()
+        self._lock = self.run(self._create_lock())
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    @staticmethod
+    async def _create_lock() -> asyncio.Lock:
+        return asyncio.Lock()
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """Schedule a coroutine on the runtime loop and return its future"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the runtime loop and wait for its result"""
+        return self.submit(coro).result(timeout)
+
+    def prewarm(self, platform: str, factory: Callable[[], Any]) -> None:
+        """Launch the environment for a platform in the background if needed"""
+        if platform not in self._environments:
+            self.submit(self._prewarm(platform, factory))
+
+    async def _prewarm(self, platform: str, factory: Callable[[], Any]) -> None:
+        try:
+            async with self._lock:
+                if platform not in self._environments:
+                    self._environments[platform] = _Environment(await self._launch(factory))
+        except Exception as e:
+            print(f"Error pre-launching {platform} environment: {e}")
+
+    async def acquire(self, platform: str, factory: Callable[[], Any]) -> Any:
+        """Return a healthy, launched environment for the platform"""
+        async with self._lock:
+            slot = self._environments.get(platform)
+            if slot is not None and (slot.uses >= self.max_uses or not await self._is_healthy(slot.env)):
+                await self._retire(platform, slot)
+                slot = None
+            if slot is None:
+                slot = _Environment(await self._launch(factory))
+                self._environments[platform] = slot
+            slot.uses += 1
+            slot.active += 1
+            return slot.env
+
+    async def release(self, platform: str, env: Any, failed: bool = False) -> None:
+        """Hand an environment back, recycling it if the run crashed it"""
+        async with self._lock:
+            slot = self._environments.get(platform)
+            if slot is None or slot.env is not env:
+                slot = self._retired.get(id(env))
+                if slot is None:
+                    return
+            slot.active -= 1
+            if failed and not slot.retired and not await self._is_healthy(env):
+                await self._retire(platform, slot)
+            elif slot.retired and slot.active <= 0:
+                self._retired.pop(id(env), None)
+                await self._close(env)
+
+    async def shutdown(self) -> None:
+        """Close every environment owned by the runtime"""
+        async with self._lock:
+            for platform, slot in list(self._environments.items()):
+                await self._retire(platform, slot, force=True)
+
+    async def _retire(self, platform: str, slot: _Environment, force: bool = False) -> None:
+        # Runs still using the environment keep it until they release it
+        if self._environments.get(platform) is slot:
+            del self._environments[platform]
+        slot.retired = True
+        if force or slot.active <= 0:
+            self._retired.pop(id(slot.env), None)
+            await self._close(slot.env)
+        else:
+            self._retired[id(slot.env)] = slot
+
+    @staticmethod
+    async def _launch(factory: Callable[[], Any]) -> Any:
+        env = factory()
+        # Start the underlying browser now instead of on the first context
+        for name in ("start", "get_playwright_browser"):
+            starter = getattr(env, name, None)
+            if callable(starter):
+                result = starter()
+                if asyncio.iscoroutine(result):
+                    await result
+                break
+        return env
+
+    @staticmethod
+    async def _is_healthy(env: Any) -> bool:
+        for name in ("playwright_browser", "browser"):
+            browser = getattr(env, name, None)
+            is_connected = getattr(browser, "is_connected", None)
+            if callable(is_connected):
+                try:
+                    return bool(is_connected())
+                except Exception:
+                    return False
+        return True
+
+    @staticmethod
+    async def _close(env: Any) -> None:
+        closer = getattr(env, "close", None)
+        if not callable(closer):
+            return
+        try:
+            result = closer()
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            print(f"Error closing environment: {e}")
+
+
+_runtime: Optional[BrowserRuntime] = None
+_runtime_lock = threading.Lock()
+
+
+def get_runtime() -> BrowserRuntime:
+    """Return the process-wide runtime, creating it on first use"""
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            _runtime = BrowserRuntime()
+        return _runtime
@@ -0,0 +1,203 @@
+import asyncio
+import json
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from src.Utilities.cache import digest, normalize_text
+from src.Utilities.plan_cache import url_pattern
+from src.Utilities.replay import action_runner, get_state
+
+# Seconds a snapshot of the state after setup is reused before setup runs again
+DEFAULT_SESSION_TTL = float(os.environ.get("FORTIAGENT_SESSION_TTL", "1800"))
+
+# Cookie that keeps the seeding script active; clearing the cookies of a context disables the script
+SEED_COOKIE = "__fortiagent_seed"
+
+# Restores the snapshot's localStorage once per tab, so later changes by the scenario are kept
+LOCAL_STORAGE_SCRIPT = """
+(origins) => {
+    if (!document.cookie.split("; ").includes("__fortiagent_seed=1")) return;
+    if (window.sessionStorage.getItem("__fortiagent_seeded")) return;
+    const entry = origins.find((origin) => origin.origin === window.location.origin);
+    if (!entry) return;
+    for (const item of entry.localStorage || []) window.localStorage.setItem(item.name, item.value);
+    window.sessionStorage.setItem("__fortiagent_seeded", "1");
+}
+"""
+
+CLEAR_STORAGE_SCRIPT = """
+() => {
+    try {
+        window.localStorage.clear();
+        window.sessionStorage.clear();
+    } catch (e) {}
+}
+"""
+
+
+class StorageSnapshot:
+    """Cookies and localStorage captured after setup, with the page setup ended on."""
+
+    __slots__ = ("state", "url", "created_at", "ttl")
+
+    def __init__(self, state: Dict[str, Any], url: str, ttl: float = DEFAULT_SESSION_TTL):
+        self.state = state
+        self.url = url
+        self.created_at = time.time()
+        self.ttl = ttl
+
+    @property
+    def expired(self) -> bool:
+        return time.time() - self.created_at > self.ttl
+
+
+# Snapshots by setup text and start URL; shared by every execution in the process
+_snapshots: Dict[str, StorageSnapshot] = {}
+
+
+async def playwright_context(context: Any) -> Any:
+    """Return the Playwright BrowserContext behind a browser_use context"""
+    get_session = getattr(context, "get_session", None)
+    if callable(get_session):
+        session = await get_session()
+        if getattr(session, "context", None) is not None:
+            return session.context
+    for name in ("browser_context", "context"):
+        candidate = getattr(context, name, None)
+        if candidate is not None and hasattr(candidate, "storage_state"):
+            return candidate
+    raise RuntimeError("Browser context does not expose its Playwright context")
+
+
+async def snapshot_storage_state(context: Any) -> Dict[str, Any]:
+    """Cookies and localStorage of every origin of a context"""
+    return await (await playwright_context(context)).storage_state()
+
+
+async def seed_storage_state(context: Any, state: Dict[str, Any]) -> None:
+    """Load a storage state snapshot into a fresh context"""
+    browser_context = await playwright_context(context)
+    if state.get("cookies"):
+        await browser_context.add_cookies(state["cookies"])
+    if state.get("origins"):
+        # Init scripts cannot be removed, so the script only seeds while this cookie exists
+        await browser_context.add_cookies(
+            [{"name": SEED_COOKIE, "value": "1", "url": origin["origin"]} for origin in state["origins"]]
+        )
+        await browser_context.add_init_script(
+            script=f"({LOCAL_STORAGE_SCRIPT})({json.dumps(state['origins'])})"
+        )
+
+
+async def clear_storage_state(context: Any) -> None:
+    """Drop the cookies and localStorage of a context, e.g. after its session expired"""
+    browser_context = await playwright_context(context)
+    await browser_context.clear_cookies()
+    for page in browser_context.pages:
+        try:
+            await page.evaluate(CLEAR_STORAGE_SCRIPT)
+        except Exception as e:
+            print(f"Could not clear the storage of {page.url}: {e}")
+
+
+class SharedSetup:
+    """Runs a feature's Background, or a setup scenario, once and forks its state into every scenario.
+
+    The first scenario runs setup in its own context and snapshots the
+    resulting storage state; later scenarios get a fresh context seeded with
+    the snapshot and open the page setup ended on. A scenario that lands
+    anywhere else, typically the login page, was logged out: the snapshot is
+    dropped, the context's cookies and localStorage are cleared and setup runs
+    again. Snapshots expire after ``ttl`` seconds.
+    When setup fails, scenarios run the setup steps themselves.
+    """
+
+    def __init__(
+        self,
+        setup: str,
+        start_url: str,
+        run_setup: Callable[[Any], Awaitable[Optional[str]]],
+        controller: Any,
+        ttl: float = DEFAULT_SESSION_TTL,
+    ):
+        self.setup = setup
+        self.key = digest(normalize_text(setup), start_url)
+        # Runs the setup steps in a context and returns the URL they ended on, or None if they failed
+        self.run_setup = run_setup
+        self.controller = controller
+        self.ttl = ttl
+        self.runs = 0
+        self.seeded = 0
+        self.logouts = 0
+        self.duration = 0.0
+        self.error: Optional[str] = None
+        self._failed = False
+        self._lock = asyncio.Lock()
+
+    def includes_setup(self, scenario: str) -> bool:
+        """Whether a scenario returned by ``prepare`` performs the setup steps itself"""
+        return scenario.startswith(self.setup)
+
+    async def prepare(self, scenario: str, context: Any) -> str:
+        """Bring a fresh scenario context into the state after setup; return the scenario to run in it"""
+        stale = None
+        for _ in range(2):
+            async with self._lock:
+                if self._failed:
+                    return self._with_setup(scenario)
+                snapshot = _snapshots.get(self.key)
+                if snapshot is not None and (snapshot is stale or snapshot.expired):
+                    _snapshots.pop(self.key, None)
+                    snapshot = None
+                if snapshot is None:
+                    if stale is not None:
+                        await clear_storage_state(context)
+                    return await self._run(scenario, context)
+            # Seeding happens outside the lock so scenarios still start in parallel
+            if await self._seed(context, snapshot):
+                self.seeded += 1
+                return scenario
+            stale = snapshot
+            self.logouts += 1
+        await clear_storage_state(context)
+        return self._with_setup(scenario)
+
+    async def _run(self, scenario: str, context: Any) -> str:
+        self.runs += 1
+        started = time.perf_counter()
+        try:
+            url = await self.run_setup(context)
+            if url is not None:
+                _snapshots[self.key] = StorageSnapshot(await snapshot_storage_state(context), url, self.ttl)
+                return scenario
+            self.error = "Setup steps did not pass"
+        except Exception as e:
+            self.error = f"Setup error: {e}"
+        finally:
+            self.duration += time.perf_counter() - started
+        self._failed = True
+        await clear_storage_state(context)
+        return self._with_setup(scenario)
+
+    async def _seed(self, context: Any, snapshot: StorageSnapshot) -> bool:
+        """Seed a context and open the page setup ended on; False if the session is no longer valid"""
+        await seed_storage_state(context, snapshot.state)
+        act = action_runner(self.controller, context)
+        result = await act({"go_to_url": {"url": snapshot.url, "new_tab": False}})
+        if getattr(result, "error", None):
+            return False
+        state = await get_state(context)
+        return url_pattern(getattr(state, "url", None)) == url_pattern(snapshot.url)
+
+    def _with_setup(self, scenario: str) -> str:
+        return f"{self.setup}\n\n{scenario}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "setup_runs": self.runs,
+            "seeded_scenarios": self.seeded,
+            "logouts": self.logouts,
+            "duration": round(self.duration, 3),
+            "error": self.error,
+        }
@@ -0,0 +1,291 @@
+import glob
+import json
+import logging
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# JSONL files receiving one record per LLM call. Every process writes its own
+# file next to this path (logs/llm_calls.<pid>.jsonl), rotated when it grows too large
+TELEMETRY_PATH = os.environ.get("FORTIAGENT_TELEMETRY_PATH", os.path.join("logs", "llm_calls.jsonl"))
+TELEMETRY_MAX_BYTES = int(os.environ.get("FORTIAGENT_TELEMETRY_MAX_BYTES", str(5 * 1024 * 1024)))
+TELEMETRY_BACKUPS = int(os.environ.get("FORTIAGENT_TELEMETRY_BACKUPS", "5"))
+# Telemetry files not written to for this many seconds are deleted
+TELEMETRY_RETENTION = float(os.environ.get("FORTIAGENT_TELEMETRY_RETENTION", str(30 * 24 * 3600)))
+
+# USD per one million tokens as (prompt, completion)
+MODEL_PRICING = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+}
+
+# Identifier grouping the LLM calls of one generate/execute/codegen run
+current_run_id: ContextVar[Optional[str]] = ContextVar("current_run_id", default=None)
+
+_logger = logging.getLogger("fortiagent.telemetry")
+_logger.propagate = False
+
+
+def process_path(pid: Optional[int] = None) -> str:
+    """Telemetry file written by one process"""
+    root, ext = os.path.splitext(TELEMETRY_PATH)
+    return f"{root}.{pid if pid is not None else os.getpid()}{ext}"
+
+
+def telemetry_files() -> List[str]:
+    """Every telemetry file of every process, rotated backups included"""
+    root, ext = os.path.splitext(TELEMETRY_PATH)
+    return sorted(set(glob.glob(glob.escape(TELEMETRY_PATH) + "*") + glob.glob(f"{glob.escape(root)}.*{ext}*")))
+
+
+def files_signature() -> Tuple[Tuple[str, float, int], ...]:
+    """(path, mtime, size) of every telemetry file; changes whenever a record is written"""
+    signature = []
+    for path in telemetry_files():
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        signature.append((path, stat.st_mtime, stat.st_size))
+    return tuple(signature)
+
+
+def prune_files(older_than: float = TELEMETRY_RETENTION) -> int:
+    """Delete telemetry files, e.g. of long gone processes, not written to for ``older_than`` seconds"""
+    removed = 0
+    for path in telemetry_files():
+        try:
+            if os.path.getmtime(path) < time.time() - older_than:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+def _ensure_handler() -> None:
+    # Rotation is only safe with a single writer, so each process has its own
+    # file; a forked child replaces the handler it inherited
+    path = process_path()
+    if any(getattr(handler, "baseFilename", None) == os.path.abspath(path) for handler in _logger.handlers):
+        return
+    for handler in list(_logger.handlers):
+        _logger.removeHandler(handler)
+        handler.close()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    prune_files()
+    handler = RotatingFileHandler(
+        path, maxBytes=TELEMETRY_MAX_BYTES, backupCount=TELEMETRY_BACKUPS, encoding="utf-8"
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    _logger.addHandler(handler)
+    _logger.setLevel(logging.INFO)
+
+
+def new_run_id() -> str:
+    """Create a run id and make it current for this task or thread"""
+    run_id = uuid.uuid4().hex[:12]
+    current_run_id.set(run_id)
+    return run_id
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimated USD cost of a call; unknown models cost 0"""
+    prompt_price, completion_price = MODEL_PRICING.get(model, (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+class LLMCall:
+    """Measurements of one LLM call, filled in while the call runs."""
+
+    __slots__ = (
+        "stage", "model", "run_id", "prompt_tokens", "completion_tokens", "retries", "calls", "latency", "error",
+        "context_tokens_before", "context_tokens_after",
+    )
+
+    def __init__(self, stage: str, model: str, run_id: Optional[str] = None):
+        self.stage = stage
+        self.model = model
+        self.run_id = run_id
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.retries = 0
+        self.calls = 1
+        self.latency = 0.0
+        self.error: Optional[str] = None
+        # Execution context of a code-gen prompt, before and after compaction
+        self.context_tokens_before = 0
+        self.context_tokens_after = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "timestamp": time.time(),
+            "run_id": self.run_id,
+            "stage": self.stage,
+            "model": self.model,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "latency": round(self.latency, 3),
+            "retries": self.retries,
+            "calls": self.calls,
+            "cost": round(estimate_cost(self.model, self.prompt_tokens, self.completion_tokens), 6),
+            "error": self.error,
+            "context_tokens_before": self.context_tokens_before,
+            "context_tokens_after": self.context_tokens_after,
+        }
+
+
+def record_llm_call(call: LLMCall) -> None:
+    """Append a call record to the telemetry file"""
+    try:
+        _ensure_handler()
+        _logger.info(json.dumps(call.to_dict()))
+    except Exception as e:  # pragma: no cover - telemetry must never break a run
+        print(f"Error recording LLM telemetry: {e}")
+
+
+@contextmanager
+def track_llm_call(stage: str, model: str) -> Iterator[LLMCall]:
+    """Time an LLM call and record it; the caller fills in token usage"""
+    call = LLMCall(stage, model, current_run_id.get())
+    started = time.perf_counter()
+    try:
+        yield call
+    except Exception as e:
+        call.error = str(e)
+        raise
+    finally:
+        call.latency = time.perf_counter() - started
+        record_llm_call(call)
+
+
+def _total(value: Any) -> int:
+    if isinstance(value, (list, tuple)):
+        return int(sum(v or 0 for v in value))
+    return int(value or 0)
+
+
+def set_agno_usage(call: LLMCall, metrics: Any) -> None:
+    """Copy token usage from an agno run response's metrics onto a call"""
+    if metrics is None:
+        return
+    get = metrics.get if isinstance(metrics, dict) else lambda key: getattr(metrics, key, None)
+    call.prompt_tokens = _total(get("input_tokens") or get("prompt_tokens"))
+    call.completion_tokens = _total(get("output_tokens") or get("completion_tokens"))
+
+
+def set_context_stats(call: LLMCall, stats: Optional[Dict[str, Any]]) -> None:
+    """Copy the token counts of a compacted code-gen context onto a call"""
+    if not stats:
+        return
+    call.context_tokens_before = int(stats.get("tokens_before") or 0)
+    call.context_tokens_after = int(stats.get("tokens_after") or 0)
+
+
+def set_chat_usage(call: LLMCall, usage: Any) -> None:
+    """Copy token usage from a chat completion's usage onto a call"""
+    if usage is None:
+        return
+    call.prompt_tokens = int(getattr(usage, "prompt_tokens", 0) or 0)
+    call.completion_tokens = int(getattr(usage, "completion_tokens", 0) or 0)
+
+
+def track_chat_model(llm: Any, stage: str) -> Any:
+    """Record every ``ainvoke`` of a chat model, e.g. each step of a browser agent, as its own call"""
+    ainvoke = llm.ainvoke
+    model = str(getattr(llm, "model", "") or "")
+
+    async def tracked_ainvoke(*args: Any, **kwargs: Any) -> Any:
+        with track_llm_call(stage, model) as call:
+            result = await ainvoke(*args, **kwargs)
+            set_chat_usage(call, getattr(result, "usage", None))
+            return result
+
+    llm.ainvoke = tracked_ainvoke
+    return llm
+
+
+def record_agent_history(stage: str, model: str, history: Any) -> None:
+    """Record the LLM usage of a finished agent run whose model could not be tracked per call.
+
+    This is an approximation: the whole run becomes one record with
+    ``calls`` set to its number of steps and ``latency`` to its duration,
+    including the time spent performing actions.
+    """
+    call = LLMCall(stage, model, current_run_id.get())
+    usage = getattr(history, "usage", None)
+    if usage is not None:
+        call.prompt_tokens = int(getattr(usage, "total_prompt_tokens", 0) or 0)
+        call.completion_tokens = int(getattr(usage, "total_completion_tokens", 0) or 0)
+    elif callable(getattr(history, "total_input_tokens", None)):
+        call.prompt_tokens = int(history.total_input_tokens() or 0)
+    if callable(getattr(history, "total_duration_seconds", None)):
+        call.latency = float(history.total_duration_seconds() or 0.0)
+    steps = getattr(history, "history", None) or []
+    # Every agent step is one LLM call; steps that errored are retried by the agent
+    call.calls = max(1, len(steps))
+    if callable(getattr(history, "errors", None)):
+        call.retries = sum(1 for error in history.errors() if error)
+    record_llm_call(call)
+
+
+def load_records(run_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Read the call records of every process, rotated files included, optionally for one run"""
+    records = []
+    for path in telemetry_files():
+        try:
+            with open(path, encoding="utf-8") as handle:
+                for line in handle:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if run_id is None or record.get("run_id") == run_id:
+                        records.append(record)
+        except OSError:
+            # Rotated or pruned while reading
+            continue
+    records.sort(key=lambda record: record.get("timestamp", 0))
+    return records
+
+
+def aggregate(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Per-stage totals of calls, tokens, latency and cost, most expensive first"""
+    stages: Dict[str, Dict[str, Any]] = {}
+    for record in records:
+        stage = stages.setdefault(record["stage"], {
+            "stage": record["stage"],
+            "model": record.get("model"),
+            "calls": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "total_latency": 0.0,
+            "max_latency": 0.0,
+            "retries": 0,
+            "errors": 0,
+            "cost": 0.0,
+            "context_tokens_before": 0,
+            "context_tokens_after": 0,
+        })
+        stage["calls"] += record.get("calls", 1)
+        stage["prompt_tokens"] += record.get("prompt_tokens", 0)
+        stage["completion_tokens"] += record.get("completion_tokens", 0)
+        stage["total_latency"] += record.get("latency", 0.0)
+        stage["max_latency"] = max(stage["max_latency"], record.get("latency", 0.0))
+        stage["retries"] += record.get("retries", 0)
+        stage["errors"] += 1 if record.get("error") else 0
+        stage["cost"] += record.get("cost", 0.0)
+        stage["context_tokens_before"] += record.get("context_tokens_before", 0)
+        stage["context_tokens_after"] += record.get("context_tokens_after", 0)
+    for stage in stages.values():
+        stage["total_latency"] = round(stage["total_latency"], 3)
+        stage["cost"] = round(stage["cost"], 6)
+    return sorted(stages.values(), key=lambda stage: (stage["cost"], stage["total_latency"]), reverse=True)
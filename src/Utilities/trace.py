@@ -0,0 +1,271 @@
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Order in which selectors are preferred when generating automation code
+SELECTOR_PRIORITY = ("css", "relative_xpath", "absolute_xpath")
+
+
+class TraceSelector:
+    """One way of locating an element, e.g. a CSS selector or an XPath."""
+
+    __slots__ = ("kind", "value")
+
+    def __init__(self, kind: str, value: str):
+        self.kind = kind
+        self.value = value
+
+    def to_list(self) -> List[str]:
+        return [self.kind, self.value]
+
+
+class TraceElement:
+    """An element the agent looked at or interacted with."""
+
+    __slots__ = ("key", "tag", "id", "name", "type", "text", "selectors", "details")
+
+    def __init__(
+        self,
+        key: str,
+        tag: str = "",
+        id: str = "",
+        name: str = "",
+        type: str = "",
+        text: str = "",
+        selectors: Tuple[TraceSelector, ...] = (),
+        details: Optional[Dict[str, Any]] = None,
+    ):
+        self.key = key
+        self.tag = tag
+        self.id = id
+        self.name = name
+        self.type = type
+        self.text = text
+        self.selectors = selectors
+        self.details = details
+
+    @classmethod
+    def from_details(cls, details: Dict[str, Any]) -> "TraceElement":
+        """Build an element from the payload returned by the element introspection script"""
+        selectors = tuple(
+            TraceSelector(kind, details[field])
+            for kind, field in (
+                ("css", "css_selector"),
+                ("relative_xpath", "relative_xpath"),
+                ("absolute_xpath", "absolute_xpath"),
+            )
+            if details.get(field)
+        )
+        return cls(
+            key=details.get("absolute_xpath") or details.get("relative_xpath") or details.get("css_selector") or "",
+            tag=details.get("tag", ""),
+            id=details.get("id", ""),
+            name=details.get("name", ""),
+            type=details.get("type", ""),
+            text=details.get("text", ""),
+            selectors=selectors,
+            details=details,
+        )
+
+    def best_selector(self) -> Optional[str]:
+        """Return the most robust selector recorded for this element"""
+        by_kind = {selector.kind: selector.value for selector in self.selectors}
+        # A CSS selector is only preferred when it is anchored on an ID
+        if not self.id:
+            by_kind.pop("css", None)
+        for kind in SELECTOR_PRIORITY:
+            if by_kind.get(kind):
+                return by_kind[kind]
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "tag": self.tag,
+            "id": self.id,
+            "name": self.name,
+            "type": self.type,
+            "text": self.text,
+            "selectors": [selector.to_list() for selector in self.selectors],
+            "details": self.details,
+        }
+
+    @classmethod
+    def from_dict(cls, key: str, data: Dict[str, Any]) -> "TraceElement":
+        return cls(
+            key=key,
+            tag=data.get("tag", ""),
+            id=data.get("id", ""),
+            name=data.get("name", ""),
+            type=data.get("type", ""),
+            text=data.get("text", ""),
+            selectors=tuple(TraceSelector(kind, value) for kind, value in data.get("selectors", [])),
+            details=data.get("details"),
+        )
+
+
+class TraceAction:
+    """A controller action together with the element it targeted."""
+
+    __slots__ = ("name", "type", "index", "element", "value")
+
+    def __init__(
+        self,
+        name: str,
+        type: str,
+        index: Optional[int] = None,
+        element: Optional[TraceElement] = None,
+        value: Optional[str] = None,
+    ):
+        self.name = name
+        self.type = type
+        self.index = index
+        self.element = element
+        self.value = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"name": self.name, "type": self.type}
+        if self.index is not None:
+            data["index"] = self.index
+        if self.element is not None:
+            data["element"] = self.element.key
+        if self.value is not None:
+            data["value"] = self.value
+        return data
+
+
+class TraceStep:
+    """The actions recorded during one agent step."""
+
+    __slots__ = ("number", "url", "actions")
+
+    def __init__(self, number: int, url: str = "", actions: Optional[List[TraceAction]] = None):
+        self.number = number
+        self.url = url
+        self.actions = actions if actions is not None else []
+
+
+class ExecutionTrace:
+    """Structured record of a scenario execution.
+
+    Controller actions write into the trace of the running scenario (see
+    ``current_trace``) so code generation can read selectors and element
+    details directly instead of parsing them back out of the agent's text
+    output. Elements are stored once and referenced by key from actions.
+    """
+
+    __slots__ = ("steps", "elements", "checkpoints")
+
+    def __init__(self):
+        self.steps: List[TraceStep] = []
+        self.elements: Dict[str, TraceElement] = {}
+        # Fingerprint of the page each Gherkin step started on, by step number
+        self.checkpoints: Dict[int, str] = {}
+
+    def begin_step(self, number: int, url: str = "") -> TraceStep:
+        """Start recording actions for a new agent step"""
+        step = TraceStep(number, url)
+        self.steps.append(step)
+        return step
+
+    def record_element(self, details: Dict[str, Any]) -> Optional[TraceElement]:
+        """Record an element from its introspection payload, reusing an identical one"""
+        if not details or "error" in details:
+            return None
+        element = TraceElement.from_details(details)
+        return self.elements.setdefault(element.key, element)
+
+    def record_action(
+        self,
+        name: str,
+        type: str,
+        index: Optional[int] = None,
+        details: Optional[Dict[str, Any]] = None,
+        value: Optional[str] = None,
+        xpath: Optional[str] = None,
+    ) -> TraceAction:
+        """Append an action to the current step"""
+        element = self.record_element(details) if details else None
+        if element is None and xpath:
+            element = self.elements.setdefault(
+                xpath, TraceElement(xpath, selectors=(TraceSelector("absolute_xpath", xpath),))
+            )
+        action = TraceAction(name, type, index, element, value)
+        if not self.steps:
+            self.begin_step(0)
+        self.steps[-1].actions.append(action)
+        return action
+
+    def record_checkpoint(self, step_number: int, fingerprint: str) -> None:
+        """Remember the page a Gherkin step starts on"""
+        self.checkpoints[step_number] = fingerprint
+
+    def actions(self) -> Iterable[TraceAction]:
+        for step in self.steps:
+            yield from step.actions
+
+    def selectors(self) -> Dict[str, str]:
+        """Best selector of every recorded element, named in recording order"""
+        selectors = {}
+        for element in self.elements.values():
+            selector = element.best_selector()
+            if selector:
+                selectors[f"element_{len(selectors) + 1}"] = selector
+        return selectors
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "steps": [
+                {"number": step.number, "url": step.url, "actions": [action.to_dict() for action in step.actions]}
+                for step in self.steps
+            ],
+            "elements": {key: element.to_dict() for key, element in self.elements.items()},
+            "checkpoints": self.checkpoints,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ExecutionTrace":
+        trace = cls()
+        for key, element_data in data.get("elements", {}).items():
+            trace.elements[key] = TraceElement.from_dict(key, element_data)
+        for step_data in data.get("steps", []):
+            step = trace.begin_step(step_data.get("number", 0), step_data.get("url", ""))
+            for action_data in step_data.get("actions", []):
+                step.actions.append(TraceAction(
+                    action_data["name"],
+                    action_data["type"],
+                    action_data.get("index"),
+                    trace.elements.get(action_data.get("element")),
+                    action_data.get("value"),
+                ))
+        trace.checkpoints = {int(number): fingerprint for number, fingerprint in data.get("checkpoints", {}).items()}
+        return trace
+
+    @classmethod
+    def merge(cls, traces: Iterable["ExecutionTrace"]) -> "ExecutionTrace":
+        """Concatenate the traces of several scenarios in order.
+
+        Checkpoints are numbered per scenario and are not merged.
+        """
+        merged = cls()
+        for trace in traces:
+            merged.steps.extend(trace.steps)
+            for key, element in trace.elements.items():
+                merged.elements.setdefault(key, element)
+        return merged
+
+
+# Trace of the scenario running in the current task; None outside of a scenario
+current_trace: ContextVar[Optional[ExecutionTrace]] = ContextVar("current_trace", default=None)
+
+
+def record_action(name: str, type: str, **kwargs: Any) -> None:
+    """Record an action on the current scenario's trace, if one is active"""
+    trace = current_trace.get()
+    if trace is not None:
+        trace.record_action(name, type, **kwargs)
+
+
+def record_checkpoint(step_number: int, fingerprint: str) -> None:
+    """Record the page a Gherkin step starts on in the current scenario's trace, if one is active"""
+    trace = current_trace.get()
+    if trace is not None:
+        trace.record_checkpoint(step_number, fingerprint)
@@ -1,10 +1,18 @@
 from browser_use import Browser, Agent as BrowserAgent, Controller, ActionResult
 
+import ast
+import inspect
+import json
 import re
+from collections import OrderedDict, defaultdict, deque
 
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, List
 
+from src.Utilities.trace import ExecutionTrace, current_trace, record_action, record_checkpoint
+from src.Utilities.plan_cache import page_fingerprint
+from src.Utilities.replay import get_state
+
 # Set up custom controller actions
 controller = Controller()
 
@@ -22,6 +30,7 @@ async def get_xpath_of_element(params: ElementOnPage, browser: Browser):
     xpath = element_node.xpath
     if xpath is None:
         return ActionResult(error="Element not found, try another index")
+    record_action("get_xpath_of_element", "xpath", index=params.index, xpath=xpath)
     return ActionResult(extracted_content="The xpath of the element is "+xpath, include_in_memory=True)
 
 class ElementProperties(BaseModel):
@@ -30,22 +39,35 @@ class ElementProperties(BaseModel):
 
 @controller.action("Get element property", param_model=ElementProperties)
 async def get_element_property(params: ElementProperties, browser: Browser):
-    page = browser.get_current_page()
+    page = await get_current_page(browser)
     session = await browser.get_session()
     state = session.cached_state
     
     if params.index not in state.selector_map:
         return ActionResult(error="Element not found")
     
-    element_node = state.selector_map[params.index]
-    element = await page.query_selector(element_node.selector)
+    element_index = await get_element_index(browser, page, state.selector_map)
+    element_details = element_index.get(params.index)
     
-    if element is None:
+    if element_details is None or "error" in element_details:
         return ActionResult(error="Element not found on page")
     
     try:
-        property_value = await element.get_property(params.property_name)
-        json_value = await property_value.json_value()
+        # Properties are live values, so read them from the page in one call
+        json_value = await page.evaluate(
+            """([xpath, propertyName]) => {
+                const path = xpath.startsWith('/') ? xpath : '/' + xpath;
+                const element = document.evaluate(
+                    path, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+                ).singleNodeValue;
+                return element ? element[propertyName] : null;
+            }""",
+            [element_details["absolute_xpath"], params.property_name],
+        )
+        record_action(
+            "get_element_property", "verification",
+            index=params.index, details=element_details, value=f"{params.property_name}={json_value}",
+        )
         return ActionResult(
             extracted_content=f"Element {params.index} {params.property_name}: {json_value}",
             include_in_memory=True
@@ -60,7 +82,7 @@ class ElementAction(BaseModel):
 
 @controller.action("Perform element action", param_model=ElementAction)
 async def perform_element_action(params: ElementAction, browser: Browser):
-    page = browser.get_current_page()
+    page = await get_current_page(browser)
     session = await browser.get_session()
     state = session.cached_state
     
@@ -73,24 +95,33 @@ async def perform_element_action(params: ElementAction, browser: Browser):
     if element is None:
         return ActionResult(error="Element not found on page")
     
-    # Capture detailed element information before performing action
+    # Capture detailed element information before performing action; only this
+    # element is described, since the page index would be stale after the action
     element_details = await get_detailed_element_info(element, element_node, page)
+    # The action may change the DOM, so later lookups must re-read the page
+    invalidate_element_index(browser)
     
     try:
         if params.action == "click":
             await element.click()
+            record_action("perform_element_action", "click", index=params.index, details=element_details)
             return ActionResult(
                 extracted_content=f"Clicked element {params.index}\nElement Details: {element_details}",
                 include_in_memory=True
             )
         elif params.action == "hover":
             await element.hover()
+            record_action("perform_element_action", "hover", index=params.index, details=element_details)
             return ActionResult(
                 extracted_content=f"Hovered over element {params.index}\nElement Details: {element_details}",
                 include_in_memory=True
             )
         elif params.action == "fill" and params.value is not None:
             await element.fill(params.value)
+            record_action(
+                "perform_element_action", "input",
+                index=params.index, details=element_details, value=params.value,
+            )
             return ActionResult(
                 extracted_content=f"Filled element {params.index} with '{params.value}'\nElement Details: {element_details}",
                 include_in_memory=True
@@ -100,25 +131,35 @@ async def perform_element_action(params: ElementAction, browser: Browser):
     except Exception as e:
         return ActionResult(error=f"Error performing action: {str(e)}")
 
+class GherkinStepDone(BaseModel):
+    step: int
+
+@controller.action("Mark Gherkin step complete", param_model=GherkinStepDone)
+async def complete_gherkin_step(params: GherkinStepDone, browser: Browser):
+    # The page a step ends on is the page the next step starts on
+    if current_trace.get() is not None:
+        state = await get_state(browser)
+        record_checkpoint(params.step + 1, page_fingerprint(state.url, state.selector_map))
+    return ActionResult(extracted_content=f"Gherkin step {params.step} complete", include_in_memory=True)
+
 class ElementDetails(BaseModel):
     index: int
 
 @controller.action("Get detailed element information", param_model=ElementDetails)
 async def get_element_details(params: ElementDetails, browser: Browser):
-    page = browser.get_current_page()
+    page = await get_current_page(browser)
     session = await browser.get_session()
     state = session.cached_state
     
     if params.index not in state.selector_map:
         return ActionResult(error="Element not found")
     
-    element_node = state.selector_map[params.index]
-    element = await page.query_selector(element_node.selector)
+    element_details = (await get_element_index(browser, page, state.selector_map)).get(params.index)
     
-    if element is None:
-        return ActionResult(error="Element not found on page")
+    if element_details is None or "error" in element_details:
+        return ActionResult(error=(element_details or {}).get("error", "Element not found on page"))
     
-    element_details = await get_detailed_element_info(element, element_node, page)
+    record_action("get_element_details", "element_details", index=params.index, details=element_details)
     
     # Format the element details in a more structured way for better display
     formatted_details = {
@@ -150,130 +191,188 @@ async def get_element_details(params: ElementDetails, browser: Browser):
         include_in_memory=True
     )
 
+# In-page script describing one element; shared by the single and batched lookups
+DESCRIBE_ELEMENT_JS = """
+(element, absoluteXpath) => {
+    const tag = element.tagName.toLowerCase();
+    const attributes = {};
+    for (const attr of element.attributes) {
+        attributes[attr.name] = attr.value;
+    }
+    const id = attributes['id'] || '';
+    const className = attributes['class'] || '';
+    const name = attributes['name'] || '';
+    const placeholder = attributes['placeholder'] || '';
+    const value = attributes['value'] || '';
+    const type = attributes['type'] || '';
+    const cssClasses = className.split(/\\s+/).filter(Boolean).join('.');
+
+    // Relative XPath based on ID, name, class or placeholder
+    let relativeXpath = '';
+    if (id) relativeXpath = `//${tag}[@id='${id}']`;
+    else if (name) relativeXpath = `//${tag}[@name='${name}']`;
+    else if (className) relativeXpath = `//${tag}[@class='${className}']`;
+    else if (placeholder) relativeXpath = `//${tag}[@placeholder='${placeholder}']`;
+
+    const xpathVariations = [];
+    if (id) xpathVariations.push(`//*[@id='${id}']`);
+    if (name) xpathVariations.push(`//*[@name='${name}']`);
+    if (placeholder) xpathVariations.push(`//*[@placeholder='${placeholder}']`);
+    if (type && value) xpathVariations.push(`//${tag}[@type='${type}' and @value='${value}']`);
+
+    let cssSelector = '';
+    if (id) cssSelector = `#${id}`;
+    else if (className) cssSelector = `${tag}.${cssClasses}`;
+    else if (name) cssSelector = `${tag}[name='${name}']`;
+    else if (placeholder) cssSelector = `${tag}[placeholder='${placeholder}']`;
+
+    const cssVariations = [];
+    if (id) cssVariations.push(`#${id}`);
+    if (className) cssVariations.push(`.${cssClasses}`);
+    if (name) cssVariations.push(`[name='${name}']`);
+    if (placeholder) cssVariations.push(`[placeholder='${placeholder}']`);
+
+    const text = (element.textContent || '').trim();
+    const rect = element.getBoundingClientRect();
+    const style = window.getComputedStyle(element);
+
+    return {
+        tag: tag,
+        id: id,
+        class: className,
+        name: name,
+        type: type,
+        placeholder: placeholder,
+        value: value,
+        text: text.length > 50 ? text.slice(0, 50) + '...' : text,
+        absolute_xpath: absoluteXpath || '',
+        relative_xpath: relativeXpath,
+        xpath_variations: xpathVariations,
+        css_selector: cssSelector,
+        css_variations: cssVariations,
+        dimensions: {x: rect.x, y: rect.y, width: rect.width, height: rect.height},
+        is_visible: rect.width > 0 && rect.height > 0 && style.visibility !== 'hidden',
+        attributes: attributes
+    };
+}
+"""
+
+# Resolves every XPath in the page and describes the matching elements in one call
+DESCRIBE_ELEMENTS_JS = """
+(xpaths) => {
+    const describe = %s;
+    return xpaths.map((xpath) => {
+        const path = xpath.startsWith('/') ? xpath : '/' + xpath;
+        const element = document.evaluate(
+            path, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+        ).singleNodeValue;
+        return element ? describe(element, xpath) : null;
+    });
+}
+""" % DESCRIBE_ELEMENT_JS.strip()
+
 async def get_detailed_element_info(element, element_node, page):
     """Extract detailed information about an element for automation script generation"""
     try:
-        # Get tag name
-        tag_name = await page.evaluate("(element) => element.tagName.toLowerCase()", element)
-        
-        # Get element attributes
-        attributes = await page.evaluate("""
-        (element) => {
-            const attrs = {};
-            for (const attr of element.attributes) {
-                attrs[attr.name] = attr.value;
-            }
-            return attrs;
-        }
-        """, element)
-        
-        # Extract common attributes
-        element_id = attributes.get('id', '')
-        class_name = attributes.get('class', '')
-        name_attr = attributes.get('name', '')
-        placeholder = attributes.get('placeholder', '')
-        value = attributes.get('value', '')
-        type_attr = attributes.get('type', '')
-        
-        # Get absolute XPath
-        absolute_xpath = element_node.xpath if element_node.xpath else ''
-        
-        # Generate relative XPath based on ID, class, or other attributes
-        relative_xpath = ''
-        if element_id:
-            relative_xpath = f"//{tag_name}[@id='{element_id}']"
-        elif name_attr:
-            relative_xpath = f"//{tag_name}[@name='{name_attr}']"
-        elif class_name:
-            relative_xpath = f"//{tag_name}[@class='{class_name}']"
-        elif placeholder:
-            relative_xpath = f"//{tag_name}[@placeholder='{placeholder}']"
-        
-        # Generate additional XPath variations for better selector options
-        xpath_variations = []
-        if element_id:
-            xpath_variations.append(f"//*[@id='{element_id}']")
-        if name_attr:
-            xpath_variations.append(f"//*[@name='{name_attr}']")
-        if placeholder:
-            xpath_variations.append(f"//*[@placeholder='{placeholder}']")
-        if type_attr and value:
-            xpath_variations.append(f"//{tag_name}[@type='{type_attr}' and @value='{value}']")
-        
-        # Generate CSS selector
-        css_selector = ''
-        if element_id:
-            css_selector = f"#{element_id}"
-        elif class_name:
-            # Convert space-separated classes to CSS class selector format
-            css_classes = '.'.join(class_name.split())
-            css_selector = f"{tag_name}.{css_classes}"
-        elif name_attr:
-            css_selector = f"{tag_name}[name='{name_attr}']"
-        elif placeholder:
-            css_selector = f"{tag_name}[placeholder='{placeholder}']"
-        
-        # Generate additional CSS selector variations
-        css_variations = []
-        if element_id:
-            css_variations.append(f"#{element_id}")
-        if class_name:
-            css_classes = '.'.join(class_name.split())
-            css_variations.append(f".{css_classes}")
-        if name_attr:
-            css_variations.append(f"[name='{name_attr}']")
-        if placeholder:
-            css_variations.append(f"[placeholder='{placeholder}']")
-        
-        # Get element text content
-        text_content = await page.evaluate("(element) => element.textContent.trim()", element)
-        
-        # Get element dimensions and position
-        bounding_box = await page.evaluate("""
-        (element) => {
-            const rect = element.getBoundingClientRect();
-            return {
-                x: rect.x,
-                y: rect.y,
-                width: rect.width,
-                height: rect.height
-            };
-        }
-        """, element)
-        
-        # Check if element is visible
-        is_visible = await element.is_visible()
-        
-        # Format the detailed information
-        details = {
-            "tag": tag_name,
-            "id": element_id,
-            "class": class_name,
-            "name": name_attr,
-            "type": type_attr,
-            "placeholder": placeholder,
-            "value": value,
-            "text": text_content[:50] + ('...' if len(text_content) > 50 else ''),
-            "absolute_xpath": absolute_xpath,
-            "relative_xpath": relative_xpath,
-            "xpath_variations": xpath_variations,
-            "css_selector": css_selector,
-            "css_variations": css_variations,
-            "dimensions": bounding_box,
-            "is_visible": is_visible,
-            "attributes": attributes
-        }
-        
-        return details
+        # Everything is collected by one in-page script to avoid a round trip per property
+        return await element.evaluate(DESCRIBE_ELEMENT_JS, element_node.xpath or '')
     except Exception as e:
         return {"error": f"Failed to get element details: {str(e)}"}
 
+async def get_detailed_elements_info(page, element_nodes: Dict[int, Any]) -> Dict[int, Dict[str, Any]]:
+    """Extract detailed information about many elements in a single round trip"""
+    indices = [index for index, node in element_nodes.items() if node.xpath]
+    details: Dict[int, Dict[str, Any]] = {
+        index: {"error": "Element has no XPath"} for index in element_nodes if index not in indices
+    }
+    try:
+        results = await page.evaluate(DESCRIBE_ELEMENTS_JS, [element_nodes[index].xpath for index in indices])
+    except Exception as e:
+        error = {"error": f"Failed to get element details: {str(e)}"}
+        details.update({index: error for index in indices})
+        return details
+    for index, result in zip(indices, results):
+        details[index] = result if result is not None else {"error": "Element not found on page"}
+    return details
+
+class ElementIndex:
+    """Details and selectors of every interactive element in one DOM state.
+
+    Built with a single in-page script when the page state changes, so the
+    custom actions can answer repeated questions about the same indices
+    without going back to the browser.
+    """
+
+    def __init__(self, url: str, selector_map: Dict[int, Any], details: Dict[int, Dict[str, Any]]):
+        self.url = url
+        self.selector_map = selector_map
+        self.details = details
+
+    def matches(self, url: str, selector_map: Dict[int, Any]) -> bool:
+        """Whether the index still describes the given page state"""
+        # browser_use replaces the selector map whenever it re-reads the DOM
+        return self.url == url and self.selector_map is selector_map
+
+    def get(self, index: int) -> Optional[Dict[str, Any]]:
+        """Return the details of one element, or None if it is not in this state"""
+        return self.details.get(index)
+
+# Most recent element index per browser context; bounded so closed contexts are dropped
+_element_indexes: "OrderedDict[int, ElementIndex]" = OrderedDict()
+MAX_ELEMENT_INDEXES = 32
+
+async def get_element_index(browser, page, selector_map: Dict[int, Any]) -> ElementIndex:
+    """Return the element index for the current page state, rebuilding it if the state changed"""
+    key = id(browser)
+    url = getattr(page, "url", "")
+    element_index = _element_indexes.get(key)
+    if element_index is None or not element_index.matches(url, selector_map):
+        details = await get_detailed_elements_info(page, selector_map)
+        element_index = ElementIndex(url, selector_map, details)
+        _element_indexes[key] = element_index
+    _element_indexes.move_to_end(key)
+    while len(_element_indexes) > MAX_ELEMENT_INDEXES:
+        _element_indexes.popitem(last=False)
+    return element_index
+
+def invalidate_element_index(browser) -> None:
+    """Drop the element index of a browser context after the page was mutated"""
+    _element_indexes.pop(id(browser), None)
+
+async def get_current_page(browser):
+    """Return the active page whether the browser exposes it synchronously or not"""
+    page = browser.get_current_page()
+    if inspect.isawaitable(page):
+        page = await page
+    return page
+
 # Helper functions for code generation
+ELEMENT_DETAILS_PATTERN = re.compile(r"Element Details: (\{.*\})\s*$", re.DOTALL)
+
+def parse_element_details(content: str) -> Optional[Dict[str, Any]]:
+    """Recover the element details dict embedded in an action's text output"""
+    details_match = ELEMENT_DETAILS_PATTERN.search(content)
+    if not details_match:
+        return None
+    try:
+        # The details are written with Python's repr, not as JSON
+        details = ast.literal_eval(details_match.group(1))
+    except (ValueError, SyntaxError):
+        try:
+            details = json.loads(details_match.group(1))
+        except ValueError as e:
+            print(f"Error parsing element details: {e}")
+            return None
+    return details if isinstance(details, dict) else None
+
 def extract_selectors_from_history(history_data: Dict[str, Any]) -> Dict[str, str]:
     """Extract element selectors from agent history"""
+    # Prefer the structured trace recorded by the controller actions
+    if history_data.get('trace'):
+        return ExecutionTrace.from_dict(history_data['trace']).selectors()
+
     selectors = {}
     xpath_pattern = re.compile(r"The xpath of the element is (.*)")
-    element_details_pattern = re.compile(r"Element Details: \{(.+?)\}")
     
     for content in history_data.get('extracted_content', []):
         if isinstance(content, str):
@@ -286,76 +385,90 @@ def extract_selectors_from_history(history_data: Dict[str, Any]) -> Dict[str, st
                 continue
                 
             # Extract from detailed element information
-            details_match = element_details_pattern.search(content)
-            if details_match:
-                try:
-                    # Try to parse the JSON-like string
-                    details_str = '{' + details_match.group(1) + '}'
-                    # Clean up the string for proper JSON parsing
-                    details_str = details_str.replace("'", "\"")
-                    details = json.loads(details_str)
-                    
-                    # Use the best selector available
-                    selector = None
-                    if details.get("id"):
-                        selector = details.get("css_selector")
-                    elif details.get("relative_xpath"):
-                        selector = details.get("relative_xpath")
-                    elif details.get("absolute_xpath"):
-                        selector = details.get("absolute_xpath")
-                    
-                    if selector:
-                        name = f"element_{len(selectors) + 1}"
-                        selectors[name] = selector
-                except Exception as e:
-                    print(f"Error parsing element details: {e}")
+            details = parse_element_details(content)
+            if details:
+                # Use the best selector available
+                selector = None
+                if details.get("id"):
+                    selector = details.get("css_selector")
+                elif details.get("relative_xpath"):
+                    selector = details.get("relative_xpath")
+                elif details.get("absolute_xpath"):
+                    selector = details.get("absolute_xpath")
+                
+                if selector:
+                    name = f"element_{len(selectors) + 1}"
+                    selectors[name] = selector
     
     return selectors
 
+def classify_action(action_name: str) -> str:
+    """Guess the kind of an action from its name"""
+    name = action_name.lower()
+    if "navigate" in name or "goto" in name:
+        return "navigation"
+    elif "click" in name:
+        return "click"
+    elif "type" in name or "fill" in name or "enter" in name:
+        return "input"
+    elif "check" in name or "verify" in name or "assert" in name:
+        return "verification"
+    elif "get xpath" in name:
+        return "xpath"
+    elif "get detailed element information" in name:
+        return "element_details"
+    elif "save job details" in name:
+        return "custom_save"
+    return "unknown"
+
 def analyze_actions(history_data: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Analyze the actions performed by the agent to create step implementations"""
+    action_names = history_data.get('action_names', [])
+    if history_data.get('trace'):
+        return analyze_trace_actions(action_names, ExecutionTrace.from_dict(history_data['trace']))
+
     actions = []
-    element_details_pattern = re.compile(r"Element Details: (\{.+?\})")
+    extracted_content = history_data.get('extracted_content', [])
     
-    for i, action_name in enumerate(history_data.get('action_names', [])):
+    for i, action_name in enumerate(action_names):
         action_info = {
             "name": action_name,
             "index": i,
-            "type": "unknown",
+            "type": classify_action(action_name),
             "element_details": None
         }
         
-        # Determine action type
-        if "navigate" in action_name.lower() or "goto" in action_name.lower():
-            action_info["type"] = "navigation"
-        elif "click" in action_name.lower():
-            action_info["type"] = "click"
-        elif "type" in action_name.lower() or "fill" in action_name.lower() or "enter" in action_name.lower():
-            action_info["type"] = "input"
-        elif "check" in action_name.lower() or "verify" in action_name.lower() or "assert" in action_name.lower():
-            action_info["type"] = "verification"
-        elif "get xpath" in action_name.lower():
-            action_info["type"] = "xpath"
-        elif "get detailed element information" in action_name.lower():
-            action_info["type"] = "element_details"
-        elif "save job details" in action_name.lower():
-            action_info["type"] = "custom_save"
-        
         # Extract element details if available in the content
-        if i < len(history_data.get('extracted_content', [])):
-            content = history_data.get('extracted_content', [])[i]
-            if isinstance(content, str):
-                details_match = element_details_pattern.search(content)
-                if details_match:
-                    try:
-                        details_str = details_match.group(1)
-                        # Clean up the string for proper JSON parsing
-                        details_str = details_str.replace("'", "\"")
-                        details = json.loads(details_str)
-                        action_info["element_details"] = details
-                    except Exception as e:
-                        print(f"Error parsing element details in action analysis: {e}")
+        if i < len(extracted_content) and isinstance(extracted_content[i], str):
+            action_info["element_details"] = parse_element_details(extracted_content[i])
         
         actions.append(action_info)
     
     return actions
+
+def analyze_trace_actions(action_names: List[str], trace: ExecutionTrace) -> List[Dict[str, Any]]:
+    """Pair the agent's action names with the structured actions recorded in the trace"""
+    # Controller actions are recorded in the order the agent invoked them
+    recorded = defaultdict(deque)
+    for trace_action in trace.actions():
+        recorded[trace_action.name].append(trace_action)
+
+    actions = []
+    for i, action_name in enumerate(action_names):
+        action_info = {
+            "name": action_name,
+            "index": i,
+            "type": classify_action(action_name),
+            "element_details": None
+        }
+        if recorded.get(action_name):
+            trace_action = recorded[action_name].popleft()
+            action_info["type"] = trace_action.type
+            if trace_action.element is not None:
+                action_info["element_details"] = trace_action.element.details or {
+                    "absolute_xpath": trace_action.element.key
+                }
+            if trace_action.value is not None:
+                action_info["value"] = trace_action.value
+        actions.append(action_info)
+    return actions
@@ -0,0 +1,211 @@
+import math
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import streamlit as st
+
+# Rows per page of the action, element and content views
+PAGE_SIZE = 50
+# Scenarios per page of the results view
+SCENARIO_PAGE_SIZE = 10
+ALL = "All"
+
+
+def replay_caption(replay: Optional[Dict[str, Any]]) -> Optional[str]:
+    """One-line summary of how much of a scenario was replayed"""
+    if not replay:
+        return None
+    if replay.get("kind") == "steps":
+        if replay["steps_replayed"]:
+            return f"Performed {replay['steps_replayed']} of {replay['steps_total']} Gherkin steps from cached plans in {replay['duration']}s"
+        return None
+    if replay["diverged_at"] is None:
+        return f"Replayed {replay['steps_replayed']} recorded steps in {replay['duration']}s without the agent"
+    return f"Replayed {replay['steps_replayed']} of {replay['steps_total']} recorded steps, then the agent took over: {replay['reason']}"
+
+
+def setup_caption(setup: Optional[Dict[str, Any]]) -> Optional[str]:
+    """One-line summary of the shared setup of an execution"""
+    if not setup:
+        return None
+    if setup["error"]:
+        return f"Shared setup failed, so every scenario ran its setup steps itself: {setup['error']}"
+    return (
+        f"Shared setup ran {setup['setup_runs']} time(s) in {setup['duration']}s; "
+        f"{setup['seeded_scenarios']} scenario(s) started from its browser state, {setup['logouts']} found it logged out"
+    )
+
+
+def build_results_view(execution: Dict[str, Any]) -> Dict[str, Any]:
+    """Rows of every result view of an execution, computed once.
+
+    The merged action list is split back into scenarios using the number of
+    model actions each scenario performed, so actions can be filtered by
+    scenario, by action name and by whether they failed.
+    """
+    scenarios = execution.get("scenarios", [])
+    scenario_rows = []
+    for number, result in enumerate(execution["results"], 1):
+        scenario = scenarios[number - 1] if number <= len(scenarios) else {}
+        scenario_rows.append({
+            "number": number,
+            "name": scenario.get("name") or f"Scenario {number}",
+            "status": scenario.get("status", "unknown"),
+            "tags": " ".join(scenario.get("tags") or []),
+            "caption": replay_caption(scenario.get("replay")),
+            "scenario_id": scenario.get("scenario_id"),
+            "result": result,
+        })
+
+    owners: List[int] = []
+    for number, model_actions in enumerate(execution["scenario_model_actions"], 1):
+        owners.extend([number] * len(model_actions))
+    errors = execution.get("action_errors") or []
+    action_rows = []
+    for i, action in enumerate(execution["actions"]):
+        details = action.get("element_details") or {}
+        if "xpath" in details:
+            target = f"XPath: {details['xpath']}"
+        elif "index" in details:
+            target = f"Element index: {details['index']}"
+        else:
+            target = ""
+        action_rows.append({
+            "#": i + 1,
+            "Scenario": owners[i] if i < len(owners) else None,
+            "Action": action["name"],
+            "Element": target,
+            "Error": (errors[i] if i < len(errors) else None) or "",
+        })
+
+    return {
+        "setup": setup_caption(execution.get("setup")),
+        "scenarios": scenario_rows,
+        "statuses": sorted({row["status"] for row in scenario_rows}),
+        "actions": action_rows,
+        "action_names": sorted({row["Action"] for row in action_rows}),
+        "elements": [
+            {"Scenario": number, "Element Index": index, "XPath": xpath}
+            for number, element_xpaths in enumerate(execution.get("scenario_element_xpaths") or [], 1)
+            for index, xpath in element_xpaths.items()
+        ],
+        "contents": list(execution["extracted_content"]),
+        "interacted_elements": [(i, name, str(element)) for i, name, element in execution["interacted_elements"]],
+        "model_actions": execution["scenario_model_actions"],
+        # Filtered action rows by (scenario, action name, errors only)
+        "filtered": {},
+    }
+
+
+def get_results_view(execution: Dict[str, Any]) -> Dict[str, Any]:
+    """View model of an execution, built on the first render and reused by every rerun"""
+    cached = st.session_state.get("results_view")
+    if cached is None or cached[0] is not execution:
+        cached = (execution, build_results_view(execution))
+        st.session_state.results_view = cached
+    return cached[1]
+
+
+def filter_actions(view: Dict[str, Any], scenario: Any, action: str, errors_only: bool) -> List[Dict[str, Any]]:
+    """Action rows matching the filters, memoized per filter combination"""
+    key: Tuple[Any, str, bool] = (scenario, action, errors_only)
+    if key not in view["filtered"]:
+        view["filtered"][key] = [
+            row for row in view["actions"]
+            if (scenario == ALL or row["Scenario"] == scenario)
+            and (action == ALL or row["Action"] == action)
+            and (not errors_only or row["Error"])
+        ]
+    return view["filtered"][key]
+
+
+def paginate(items: List[Any], key: str, page_size: int = PAGE_SIZE) -> List[Any]:
+    """Render a page selector when ``items`` span several pages; return the items of the current page"""
+    pages = max(1, math.ceil(len(items) / page_size))
+    if pages == 1:
+        return items
+    page_key = f"{key}_page"
+    # Filters may have shrunk the list since the page was chosen
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    page = int(st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, step=1, key=page_key))
+    start = (page - 1) * page_size
+    st.caption(f"Showing {start + 1}-{min(start + page_size, len(items))} of {len(items)}")
+    return items[start:start + page_size]
+
+
+def render_scenarios(view: Dict[str, Any], load_record: Callable[[str], Optional[Dict[str, Any]]]) -> None:
+    """Render the scenario results, filtered by status and paginated"""
+    if view["setup"]:
+        st.caption(view["setup"])
+    rows = view["scenarios"]
+    if len(view["statuses"]) > 1:
+        status = st.selectbox("Status", [ALL] + view["statuses"], key="results_status")
+        if status != ALL:
+            rows = [row for row in rows if row["status"] == status]
+    for row in paginate(rows, "results", SCENARIO_PAGE_SIZE):
+        st.markdown(f'<h4 class="glow-text">Scenario {row["number"]}</h4>', unsafe_allow_html=True)
+        if row["tags"]:
+            st.caption(row["tags"])
+        if row["caption"]:
+            st.caption(row["caption"])
+        st.json(row["result"])
+        # Full records stay on disk until asked for
+        if row["scenario_id"] and st.checkbox("Show agent history and trace", key=f"record_{row['scenario_id']}"):
+            record = load_record(row["scenario_id"])
+            if record is None:
+                st.warning("The record of this scenario is no longer available.")
+            else:
+                st.json({"agent_history": record.get("agent_history"), "trace": record.get("trace")}, expanded=False)
+
+
+def render_actions(view: Dict[str, Any]) -> None:
+    """Render the performed actions, filtered by scenario, action name and errors"""
+    st.markdown('<h4 class="glow-text">Actions Performed</h4>', unsafe_allow_html=True)
+    if not view["actions"]:
+        st.info("No actions were performed.")
+        return
+    col1, col2, col3 = st.columns(3)
+    scenario = col1.selectbox("Scenario", [ALL] + [row["number"] for row in view["scenarios"]], key="actions_scenario")
+    action = col2.selectbox("Action type", [ALL] + view["action_names"], key="actions_name")
+    errors_only = col3.checkbox("Errors only", key="actions_errors")
+    rows = filter_actions(view, scenario, action, errors_only)
+    if not rows:
+        st.info("No actions match the filters.")
+        return
+    st.dataframe(paginate(rows, "actions"), hide_index=True, use_container_width=True)
+
+
+def render_elements(view: Dict[str, Any]) -> None:
+    """Render the captured element XPaths, or the raw DOM of the interacted elements on request"""
+    st.markdown('<h4 class="glow-text">Element Details</h4>', unsafe_allow_html=True)
+    if view["elements"]:
+        st.dataframe(paginate(view["elements"], "elements"), hide_index=True, use_container_width=True)
+        return
+    st.info("No element XPaths were captured during test execution.")
+    if view["interacted_elements"] and st.checkbox("Show raw DOM information", key="elements_raw_dom"):
+        st.markdown('<h4 class="glow-text">Raw DOM Information</h4>', unsafe_allow_html=True)
+        for i, action_name, element in paginate(view["interacted_elements"], "raw_dom"):
+            st.write(f"Action {i}: {action_name}")
+            st.code(element)
+
+
+def render_contents(view: Dict[str, Any]) -> None:
+    """Render the extracted content, paginated"""
+    st.markdown('<h4 class="glow-text">Extracted Content</h4>', unsafe_allow_html=True)
+    if not view["contents"]:
+        st.info("No content was extracted.")
+        return
+    for content in paginate(view["contents"], "contents"):
+        st.write(content)
+
+
+def render_debug(view: Dict[str, Any]) -> None:
+    """Render the raw model actions of one scenario, only when asked for"""
+    if not st.checkbox("Show debug output", key="debug_output"):
+        return
+    numbers = [number for number, actions in enumerate(view["model_actions"], 1) if actions]
+    if not numbers:
+        st.info("No model actions were recorded.")
+        return
+    number = st.selectbox("Scenario", numbers, key="debug_scenario")
+    st.write("Debug - Model Actions:", paginate(view["model_actions"][number - 1], "debug"))
@@ -0,0 +1,119 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("browser_use")
+
+from src.Agents import registry
+from src.Prompts import agno_prompts
+from src.Utilities import telemetry
+from src.Utilities.cache import ResponseCache
+
+HISTORY = {
+    "urls": ["https://example.com/login"],
+    "action_names": ["go_to_url", "click_element"],
+    "extracted_content": ["Logged in"],
+    "errors": [None, None],
+    "model_actions": [{"go_to_url": {"url": "https://example.com/login"}}, {"click_element": {"index": 3}}],
+    "element_xpaths": {},
+}
+
+
+class FakeAgent:
+    """Agent that fails when two threads run it at the same time."""
+
+    model = SimpleNamespace(id="fake-model")
+    description = instructions = expected_output = ""
+
+    def __init__(self):
+        self.running = threading.Lock()
+
+    def run(self, prompt, stream=False):
+        if not self.running.acquire(blocking=False):
+            raise AssertionError("agent used by two threads at once")
+        try:
+            time.sleep(0.05)
+            return SimpleNamespace(content="```python\nprint('generated')\n```", metrics=None)
+        finally:
+            self.running.release()
+
+
+@pytest.fixture
+def fake_agents(monkeypatch, tmp_path):
+    built = []
+
+    def build():
+        agent = FakeAgent()
+        built.append(agent)
+        return agent
+
+    monkeypatch.setattr(registry, "resolve", lambda target: build)
+    monkeypatch.setattr(registry, "_agents", {})
+    monkeypatch.setattr(telemetry, "record_llm_call", lambda call: None)
+    monkeypatch.setattr(agno_prompts, "codegen_cache", ResponseCache("codegen", path=str(tmp_path / "cache.sqlite3")))
+    return built
+
+
+def test_generate_all_frameworks_gives_every_generator_its_own_agent(fake_agents):
+    generators = {
+        "selenium": agno_prompts.generate_selenium_pytest_bdd,
+        "playwright": agno_prompts.generate_playwright_python,
+        "cypress": agno_prompts.generate_cypress_js,
+        "robot": agno_prompts.generate_robot_framework,
+        "java": agno_prompts.generate_java_selenium,
+    }
+
+    results = agno_prompts.generate_all_frameworks("Feature: Login", HISTORY, generators, use_cache=False)
+
+    assert results == {framework: {"code": "print('generated')"} for framework in generators}
+    assert len(fake_agents) == len(generators)
+
+
+def test_get_agent_is_shared_outside_private_agents(fake_agents):
+    shared = registry.get_agent("code_gen")
+    assert registry.get_agent("code_gen") is shared
+    with registry.private_agents():
+        private = registry.get_agent("code_gen")
+        assert private is not shared
+        assert registry.get_agent("code_gen") is private
+    assert registry.get_agent("code_gen") is shared
+
+
+def test_streamed_usage_comes_from_the_stream(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(telemetry, "record_llm_call", recorded.append)
+
+    class StreamingAgent(FakeAgent):
+        # Usage of another run that finished on the same agent
+        run_response = SimpleNamespace(metrics={"input_tokens": [999], "output_tokens": [999]})
+
+        def run(self, prompt, stream=False):
+            yield SimpleNamespace(event="RunResponseContent", content="```python\nprint(", metrics=None)
+            yield SimpleNamespace(event="RunResponseContent", content="'streamed')\n```", metrics=None)
+            yield SimpleNamespace(
+                event="RunResponseCompleted",
+                content="```python\nprint('streamed')\n```",
+                metrics={"input_tokens": [120], "output_tokens": [30]},
+            )
+
+    updates = []
+    content = agno_prompts.run_agent(StreamingAgent(), "prompt", updates.append, stage="codegen:test")
+
+    assert content == "```python\nprint('streamed')\n```"
+    assert updates[-1] == "print('streamed')"
+    assert (recorded[0].prompt_tokens, recorded[0].completion_tokens) == (120, 30)
+
+
+def test_codegen_records_context_token_stats(fake_agents, monkeypatch):
+    recorded = []
+    monkeypatch.setattr(telemetry, "record_llm_call", recorded.append)
+
+    agno_prompts.generate_playwright_python("Feature: Login", HISTORY, use_cache=False)
+
+    record = recorded[0].to_dict()
+    assert record["stage"] == "codegen:playwright_python"
+    assert 0 < record["context_tokens_after"] < record["context_tokens_before"]
+    assert telemetry.aggregate([record])[0]["context_tokens_after"] == record["context_tokens_after"]
@@ -0,0 +1,159 @@
+import threading
+
+import pytest
+
+from src.Utilities.appium_pool import AppiumSessionPool
+
+SERVER = "http://localhost:4723"
+ANDROID = {"platformName": "Android", "appium:appPackage": "com.example.app"}
+IOS = {"platformName": "iOS", "appium:bundleId": "com.example.app"}
+
+
+class FakeDriver:
+    def __init__(self, capabilities):
+        self.capabilities = capabilities
+        self.session_id = "session"
+        self.calls = []
+
+    def get_window_size(self):
+        if self.session_id is None:
+            raise RuntimeError("session is gone")
+        return {"width": 1080, "height": 1920}
+
+    def terminate_app(self, app):
+        self.calls.append(("terminate_app", app))
+
+    def activate_app(self, app):
+        self.calls.append(("activate_app", app))
+
+    def quit(self):
+        self.calls.append(("quit",))
+        self.session_id = None
+
+
+class FakeFactory:
+    def __init__(self):
+        self.drivers = []
+
+    def __call__(self, server_url, capabilities):
+        driver = FakeDriver(capabilities)
+        self.drivers.append(driver)
+        return driver
+
+
+def pool(**options):
+    factory = FakeFactory()
+    return AppiumSessionPool(factory=factory, **options), factory
+
+
+def test_released_session_is_reused_with_a_fresh_app():
+    sessions, factory = pool()
+
+    with sessions.session(SERVER, ANDROID) as first:
+        pass
+    with sessions.session(SERVER, dict(reversed(list(ANDROID.items())))) as second:
+        pass
+
+    assert first is second and len(factory.drivers) == 1
+    assert first.calls == [("terminate_app", "com.example.app"), ("activate_app", "com.example.app")]
+    assert sessions.to_dict() == {"open": 1, "in_use": 0, "created": 1, "reused": 1, "recycled": 0}
+
+
+def test_other_capabilities_get_their_own_session():
+    sessions, factory = pool()
+
+    with sessions.session(SERVER, ANDROID) as android, sessions.session(SERVER, IOS) as ios:
+        assert android is not ios
+
+    assert sessions.to_dict()["open"] == 2
+
+
+def test_session_is_recycled_after_max_uses():
+    sessions, factory = pool(max_uses=2)
+
+    for _ in range(3):
+        with sessions.session(SERVER, ANDROID):
+            pass
+
+    assert len(factory.drivers) == 2
+    assert factory.drivers[0].calls[-1] == ("quit",)
+    assert sessions.recycled == 1
+
+
+def test_dead_idle_session_is_replaced():
+    sessions, factory = pool()
+    with sessions.session(SERVER, ANDROID) as driver:
+        pass
+    driver.session_id = None
+
+    with sessions.session(SERVER, ANDROID) as replacement:
+        assert replacement is not driver
+
+    assert sessions.to_dict()["open"] == 1
+
+
+def test_failed_scenario_keeps_a_healthy_session_and_drops_a_broken_one():
+    sessions, factory = pool()
+    with pytest.raises(AssertionError):
+        with sessions.session(SERVER, ANDROID):
+            raise AssertionError("scenario failed")
+    assert sessions.to_dict()["open"] == 1
+
+    with pytest.raises(AssertionError):
+        with sessions.session(SERVER, ANDROID) as driver:
+            driver.session_id = None
+            raise AssertionError("app crashed")
+    assert sessions.to_dict()["open"] == 0 and sessions.recycled == 1
+
+
+def test_full_pool_evicts_the_least_recently_used_idle_session():
+    sessions, factory = pool(max_sessions=2)
+    with sessions.session(SERVER, ANDROID):
+        pass
+    with sessions.session(SERVER, IOS):
+        pass
+
+    with sessions.session(SERVER, {"platformName": "Android", "appium:appPackage": "com.example.other"}):
+        pass
+
+    android, ios, other = factory.drivers
+    assert android.calls[-1] == ("quit",) and ios.session_id is not None
+    assert sessions.to_dict()["open"] == 2
+
+
+def test_full_pool_waits_for_a_session_in_use():
+    sessions, factory = pool(max_sessions=1)
+    held = sessions.acquire(SERVER, ANDROID)
+
+    with pytest.raises(TimeoutError):
+        sessions.acquire(SERVER, IOS, timeout=0.05)
+
+    threading.Timer(0.05, sessions.release, args=(held,)).start()
+    ios = sessions.acquire(SERVER, IOS, timeout=5)
+
+    assert ios.driver.capabilities == IOS and held.driver.session_id is None
+    sessions.release(ios)
+
+
+def test_failing_factory_frees_the_reserved_slot():
+    def factory(server_url, capabilities):
+        raise ConnectionError("Appium server is down")
+
+    sessions = AppiumSessionPool(max_sessions=1, factory=factory)
+
+    with pytest.raises(ConnectionError):
+        sessions.acquire(SERVER, ANDROID)
+    assert sessions.to_dict()["open"] == 0
+
+
+def test_close_quits_idle_sessions_and_retires_sessions_in_use():
+    sessions, factory = pool()
+    with sessions.session(SERVER, ANDROID):
+        pass
+    held = sessions.acquire(SERVER, IOS)
+
+    sessions.close()
+    assert factory.drivers[0].session_id is None and held.driver.session_id is not None
+
+    sessions.release(held)
+    assert held.driver.session_id is None and sessions.to_dict()["open"] == 0
@@ -0,0 +1,70 @@
+import time
+
+from src.Utilities.cache import ResponseCache, digest, normalize_text
+
+
+def test_stats_count_lookups_of_every_instance(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    # The worker process and the UI each have their own instance of the cache
+    worker = ResponseCache("gherkin", path=path)
+    ui = ResponseCache("gherkin", path=path)
+
+    assert worker.get("story") is None
+    worker.set("story", "Feature: Login")
+    assert worker.get("story") == "Feature: Login"
+
+    assert ui.stats() == {"namespace": "gherkin", "enabled": True, "hits": 1, "misses": 1, "entries": 1}
+    assert ResponseCache("codegen", path=path).stats()["hits"] == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResponseCache("gherkin", path=str(tmp_path / "cache.sqlite3"), max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    time.sleep(0.01)
+    # Reading "a" makes "b" the least recently used entry
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("1", "3")
+    assert cache.stats()["entries"] == 2
+
+
+def test_entries_expire_after_the_ttl(tmp_path, monkeypatch):
+    cache = ResponseCache("gherkin", path=str(tmp_path / "cache.sqlite3"), ttl=60)
+    cache.set("story", "Feature: Login")
+    assert cache.get("story") == "Feature: Login"
+
+    later = time.time() + 61
+    monkeypatch.setattr(time, "time", lambda: later)
+
+    assert cache.get("story") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_disabled_cache_neither_stores_nor_returns(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    ResponseCache("gherkin", path=path).set("story", "Feature: Login")
+    bypassed = ResponseCache("gherkin", path=path, enabled=False)
+
+    assert bypassed.get("story") is None
+    bypassed.set("other", "Feature: Other")
+    assert ResponseCache("gherkin", path=path).get("other") is None
+
+
+def test_evict_by_metadata_and_age(tmp_path):
+    cache = ResponseCache("codegen", path=str(tmp_path / "cache.sqlite3"))
+    cache.set("old", "code", {"framework": "cypress"})
+    cache.set("new", "code", {"framework": "playwright"})
+
+    assert cache.evict(predicate=lambda meta: meta.get("framework") == "cypress") == 1
+    assert cache.evict(older_than=3600) == 0
+    assert cache.evict(older_than=-1) == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_normalize_text_and_digest():
+    assert normalize_text("  Given  a\r\n\tWhen b  \n") == normalize_text("Given a\nWhen b")
+    assert digest("a", {"x": 1, "y": 2}) == digest("a", {"y": 2, "x": 1})
+    assert digest("ab", "c") != digest("a", "bc")
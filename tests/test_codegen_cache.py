@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("browser_use")
+
+from src.Agents import registry
+from src.Prompts import agno_prompts
+from src.Utilities.cache import ResponseCache
+
+GHERKIN = "Feature: Login\n  Scenario: Log in\n    When I log in\n    Then I see the dashboard"
+
+
+def history(url: str) -> dict:
+    return {"urls": [url], "action_names": ["go_to_url"], "extracted_content": [f"Navigated to {url}"]}
+
+
+@pytest.fixture
+def agent(monkeypatch, tmp_path):
+    agent = SimpleNamespace(model=SimpleNamespace(id="fake-model"), description="", instructions="", expected_output="")
+    monkeypatch.setattr(registry, "_agents", {"code_gen": agent})
+    monkeypatch.setattr(agno_prompts, "codegen_cache", ResponseCache("codegen", path=str(tmp_path / "cache.sqlite3")))
+    return agent
+
+
+def counting_generator(framework: str):
+    calls = []
+
+    @agno_prompts.cached_code_generation(framework)
+    def generate(gherkin_steps, history_data, on_update=None):
+        calls.append(gherkin_steps)
+        return f"{framework} code #{len(calls)}"
+
+    return generate, calls
+
+
+def test_same_gherkin_and_trace_reuse_the_generated_code(agent):
+    generate, calls = counting_generator("playwright_python")
+
+    first = generate(GHERKIN, history("https://example.com"))
+    # Whitespace differences do not change the key
+    second = generate(GHERKIN.replace("  ", "    ") + "\n", history("https://example.com"))
+
+    assert first == second == "playwright_python code #1"
+    assert len(calls) == 1
+
+
+def test_key_covers_framework_trace_agent_and_bypass(agent):
+    playwright, playwright_calls = counting_generator("playwright_python")
+    cypress, cypress_calls = counting_generator("cypress_js")
+
+    playwright(GHERKIN, history("https://example.com"))
+    cypress(GHERKIN, history("https://example.com"))
+    playwright(GHERKIN, history("https://example.com/other"))
+    agent.instructions = "Use page objects"
+    playwright(GHERKIN, history("https://example.com/other"))
+    playwright(GHERKIN, history("https://example.com/other"), use_cache=False)
+
+    assert (len(playwright_calls), len(cypress_calls)) == (4, 1)
+
+
+def test_newer_trace_evicts_code_of_the_older_one(agent):
+    generate, calls = counting_generator("playwright_python")
+
+    generate(GHERKIN, history("https://example.com"))
+    generate(GHERKIN, history("https://example.com/v2"))
+    generate(GHERKIN, history("https://example.com"))
+
+    assert len(calls) == 3
+    assert agno_prompts.codegen_cache.stats()["entries"] == 1
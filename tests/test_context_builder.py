@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+pytest.importorskip("browser_use")
+
+from src.Utilities.context_builder import build_codegen_context, estimate_tokens
+
+
+def history(actions: int) -> dict:
+    contents = []
+    for i in range(actions):
+        details = {
+            "tag": "input",
+            "id": f"field_{i}",
+            "css_selector": f"#field_{i}",
+            "relative_xpath": f"//input[@id='field_{i}']",
+            "text": f"Field number {i}",
+        }
+        contents.append(f"Filled element {i} with 'value {i}'\nElement Details: {json.dumps(details)}")
+    return {
+        "urls": ["https://example.com/form"],
+        "action_names": [f"Fill field {i}" for i in range(actions)],
+        "extracted_content": contents,
+    }
+
+
+@pytest.mark.parametrize("budget", [40, 60, 100, 250])
+def test_context_fits_its_token_budget(budget):
+    context, stats = build_codegen_context(history(12), token_budget=budget)
+
+    assert stats["tokens_after"] == estimate_tokens(context)
+    assert stats["tokens_after"] <= budget
+    assert stats["omitted"]
+
+
+def test_context_keeps_everything_within_a_large_budget():
+    context, stats = build_codegen_context(history(3), token_budget=6000)
+
+    assert stats["omitted"] == {}
+    assert stats["tokens_after"] < stats["tokens_before"]
+    assert "- Actions Performed:" in context
@@ -0,0 +1,98 @@
+from src.Utilities.gherkin import is_header, parse_feature, parse_units, table_row
+
+FEATURE = '''@smoke
+Feature: Login
+  Users sign in with their password.
+
+  Background:
+    Given I open the login page
+
+  @happy
+  Scenario Outline: Log in as <user>
+    When I log in as "<user>" with "<password>"
+    Then I see "Welcome <user>"
+
+    @fast
+    Examples: Users
+      | user  | password |
+      | alice | a\\|b     |
+      | bob   | secret   |
+
+  Rule: Locked accounts
+    Background:
+      Given the account is locked
+
+    Scenario: Locked login
+      When I log in as "carol"
+      Then I see the error
+        """
+        Account locked
+        """
+'''
+
+
+def test_parse_feature_builds_the_syntax_tree():
+    feature = parse_feature(FEATURE)
+
+    assert (feature.name, feature.tags) == ("Login", ["@smoke"])
+    assert feature.description == ["Users sign in with their password."]
+    assert [step.text for step in feature.background.steps] == ["I open the login page"]
+    outline = feature.scenarios[0]
+    assert outline.outline and outline.tags == ["@happy"]
+    assert outline.examples[0].header == ["user", "password"]
+    assert outline.examples[0].tags == ["@fast"]
+    rule = feature.rules[0]
+    assert rule.name == "Locked accounts"
+    assert rule.scenarios[0].steps[1].doc_string == ["Account locked"]
+
+
+def test_outline_rows_become_units_with_merged_tags():
+    units = parse_units(FEATURE)
+
+    assert [unit.name for unit in units] == [
+        "Log in as alice (example 1)",
+        "Log in as bob (example 2)",
+        "Locked login",
+    ]
+    assert units[0].tags == ["@smoke", "@happy", "@fast"]
+    assert units[0].example == {"user": "alice", "password": "a|b"}
+    assert units[0].outline == "Log in as <user>"
+    assert 'When I log in as "alice" with "a|b"' in units[0].text
+    assert 'Then I see "Welcome alice"' in units[0].text
+    assert units[2].tags == ["@smoke"] and units[2].rule == "Locked accounts"
+
+
+def test_executable_prepends_the_backgrounds():
+    unit = parse_units(FEATURE)[2]
+
+    text = unit.executable()
+    assert text.index("I open the login page") < text.index("the account is locked") < text.index("Locked login")
+    assert "I open the login page" not in unit.executable(include_background=False)
+    assert "the account is locked" in unit.executable(include_background=False)
+
+
+def test_executable_text_parses_back_to_the_same_steps():
+    unit = parse_units(FEATURE)[2]
+
+    feature = parse_feature(unit.executable())
+
+    assert [step.text for step in feature.background.steps] == ["I open the login page", "the account is locked"]
+    assert [step.text for step in feature.scenarios[0].steps] == ['I log in as "carol"', "I see the error"]
+
+
+def test_bare_steps_form_a_numbered_scenario():
+    units = parse_units('Given I open the app\nWhen I tap "login"')
+
+    assert [unit.name for unit in units] == ["Scenario 1"]
+    assert 'When I tap "login"' in units[0].text
+
+
+def test_table_row_keeps_escaped_pipes():
+    assert table_row("| a\\|b | c |") == ["a|b", "c"]
+    assert table_row("| x |  |") == ["x", ""]
+
+
+def test_is_header():
+    assert is_header("Scenario Outline: Log in")
+    assert is_header("Examples:")
+    assert not is_header('Then I see "Scenario: done"')
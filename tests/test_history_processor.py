@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.Utilities.history_processor import HistoryProcessor
+
+PASSED = SimpleNamespace(error=None, extracted_content=None)
+
+
+def processor(xpath: str) -> HistoryProcessor:
+    """Processor of a run that clicked element 3, found at ``xpath``"""
+    run = HistoryProcessor()
+    run.process_actions("https://example.com", [({"click_element": {"index": 3}}, SimpleNamespace(xpath=xpath))], [PASSED])
+    return run
+
+
+def test_actions_resolve_their_element_xpath():
+    run = processor("html/body/button")
+
+    assert run.element_xpaths == {3: "html/body/button"}
+    assert run.actions[0]["element_details"] == {"index": 3, "xpath": "html/body/button"}
+    assert run.steps[0]["actions"][0]["xpath"] == "html/body/button"
+
+
+def test_merge_keeps_each_scenarios_element_xpaths_apart():
+    first, second = processor("html/body/button"), processor("html/body/nav/a")
+
+    merged = HistoryProcessor.merge([first, second])
+
+    assert [action["element_details"]["xpath"] for action in merged.actions] == ["html/body/button", "html/body/nav/a"]
+    # The same index named different elements in the two runs
+    assert merged.element_xpaths == {}
+    assert (first.element_xpaths, second.element_xpaths) == ({3: "html/body/button"}, {3: "html/body/nav/a"})
+
+
+def test_results_view_lists_elements_per_scenario():
+    pytest.importorskip("streamlit")
+    from src.frontend.results import build_results_view
+
+    first, second = processor("html/body/button"), processor("html/body/nav/a")
+    merged = HistoryProcessor.merge([first, second])
+    execution = {
+        "results": [{"status": "passed"}, {"status": "passed"}],
+        "actions": merged.actions,
+        "scenario_element_xpaths": [first.element_xpaths, second.element_xpaths],
+        "extracted_content": [],
+        "interacted_elements": [],
+        "scenario_model_actions": [first.model_actions, second.model_actions],
+    }
+
+    assert build_results_view(execution)["elements"] == [
+        {"Scenario": 1, "Element Index": 3, "XPath": "html/body/button"},
+        {"Scenario": 2, "Element Index": 3, "XPath": "html/body/nav/a"},
+    ]
@@ -0,0 +1,95 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from src.Utilities import jobs
+
+
+def exited_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def running_job(store: jobs.JobStore, worker: str) -> str:
+    job_id = store.enqueue("gherkin", {"manual_test_cases": "As a user I log in"})
+    assert store.claim(worker)["id"] == job_id
+    return job_id
+
+
+class FakeProcess:
+    started = 0
+
+    def __init__(self, **kwargs):
+        self.pid = None
+        self.alive = True
+
+    def start(self):
+        FakeProcess.started += 1
+        self.pid = 10 ** 6 + FakeProcess.started
+
+    def is_alive(self):
+        return self.alive
+
+
+def fake_pool(path: str) -> jobs.JobWorkerPool:
+    pool = jobs.JobWorkerPool(path, processes=2)
+    pool._context = type("FakeContext", (), {"Process": staticmethod(FakeProcess)})()
+    return pool
+
+
+def test_fail_orphans_fails_only_jobs_of_exited_workers(tmp_path):
+    store = jobs.JobStore(str(tmp_path / "jobs.sqlite3"))
+    orphan = running_job(store, jobs.worker_token(exited_pid()))
+    alive = running_job(store, jobs.worker_token())
+
+    assert store.fail_orphans() == 1
+    assert store.get(orphan)["status"] == jobs.FAILED
+    assert store.get(alive)["status"] == jobs.RUNNING
+
+
+def test_fail_orphans_fails_jobs_of_a_reused_pid(tmp_path):
+    store = jobs.JobStore(str(tmp_path / "jobs.sqlite3"))
+    if jobs.process_start_time(os.getpid()) is None:
+        pytest.skip("process start times need /proc")
+    # A worker of an earlier container whose pid now belongs to this process
+    reused = running_job(store, f"{os.getpid()}:1")
+    # Rows written before workers stored their start time
+    legacy = running_job(store, str(os.getpid()))
+
+    assert store.fail_orphans() == 1
+    assert store.get(reused)["status"] == jobs.FAILED
+    assert store.get(legacy)["status"] == jobs.RUNNING
+
+
+def test_reruns_leave_jobs_of_other_live_processes_running(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    orphan = running_job(jobs.JobStore(path), jobs.worker_token(exited_pid()))
+    pool = fake_pool(path)
+    pool.ensure_running()
+    assert pool.store.get(orphan)["status"] == jobs.FAILED
+
+    # A job claimed by a worker of another server sharing the store
+    other = running_job(pool.store, jobs.worker_token())
+    pool.ensure_running()
+    pool.ensure_running()
+
+    assert pool.store.get(other)["status"] == jobs.RUNNING
+    assert len(pool._workers) == 2
+
+
+def test_jobs_of_a_dead_worker_fail_when_it_is_replaced(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    pool = fake_pool(path)
+    pool.ensure_running()
+    dead = pool._workers[0]
+    dead.alive = False
+    dead.pid = exited_pid()
+    job_id = running_job(pool.store, jobs.worker_token(dead.pid))
+
+    pool.ensure_running()
+
+    assert pool.store.get(job_id)["status"] == jobs.FAILED
+    assert dead not in pool._workers and len(pool._workers) == 2
@@ -0,0 +1,82 @@
+from src.Utilities.mobile_steps import compile_steps, run_plan
+
+
+def test_bare_step_list_compiles_to_its_steps_only():
+    plan = compile_steps('When I tap "login"\nThen I should see "welcome"')
+
+    assert [step.line for step in plan] == ['When I tap "login"', 'Then I should see "welcome"']
+    assert [step.kind for step in plan] == ["tap", "verify"]
+
+
+def test_feature_headers_are_not_plan_steps():
+    plan = compile_steps(
+        "Feature: Login\n"
+        "  Background:\n"
+        '    Given I tap "accept_cookies"\n'
+        "  Scenario Outline: Log in as <user>\n"
+        '    When I enter "<user>" into "username"\n'
+        '    Then I should see "welcome"\n'
+        "    Examples:\n"
+        "      | user  |\n"
+        "      | alice |\n"
+    )
+
+    assert [step.line for step in plan] == [
+        'Given I tap "accept_cookies"',
+        'When I enter "alice" into "username"',
+        'Then I should see "welcome"',
+    ]
+
+
+class FakeElement:
+    def __init__(self, driver, element_id):
+        self.driver = driver
+        self.element_id = element_id
+
+    def click(self):
+        self.driver.tap(self.element_id)
+
+    def send_keys(self, value):
+        pass
+
+
+class FakeDriver:
+    """Single-activity app whose "login" button hides the "welcome" banner."""
+
+    current_activity = ".MainActivity"
+
+    def __init__(self):
+        self.visible = {"welcome", "login"}
+        self.finds = 0
+
+    def find_element(self, by, value):
+        self.finds += 1
+        if value not in self.visible:
+            raise LookupError(f"no such element: {value}")
+        return FakeElement(self, value)
+
+    def tap(self, element_id):
+        if element_id not in self.visible:
+            raise LookupError(f"stale element reference: {element_id}")
+        if element_id == "login":
+            self.visible.discard("welcome")
+
+
+def test_verify_fails_for_element_gone_from_the_same_activity():
+    plan = compile_steps('Then I should see "welcome"\nWhen I tap "login"\nThen I should see "welcome"')
+
+    history = run_plan(plan, FakeDriver())
+
+    assert history["errors"][:2] == [None, None]
+    assert history["errors"][2].startswith("Verification failed for welcome")
+
+
+def test_taps_reuse_elements_found_on_the_screen():
+    driver = FakeDriver()
+    driver.visible.add("menu")
+    plan = compile_steps('When I tap "menu"\nAnd I tap "menu"\nAnd I tap "menu"')
+
+    history = run_plan(plan, driver)
+
+    assert history["errors"] == [None, None, None]
+    assert driver.finds == 1
@@ -0,0 +1,120 @@
+import asyncio
+from types import SimpleNamespace
+
+from src.Utilities.cache import ResponseCache
+from src.Utilities.history_processor import HistoryProcessor
+from src.Utilities.plan_cache import StepPlanCache, gherkin_steps, page_fingerprint, url_pattern
+
+SCENARIO = '''Scenario: Update profile
+    Given the user is logged in
+    When the user opens the profile
+    Then the profile shows
+      | name  |
+      | alice |
+    And the avatar is visible'''
+
+LOGIN = "https://example.com/login"
+HOME = "https://example.com/home"
+
+
+def node(xpath: str) -> SimpleNamespace:
+    return SimpleNamespace(tag_name="a", xpath=xpath)
+
+
+class FakeBrowser:
+    """Browser context and controller where clicking the login button leads home."""
+
+    def __init__(self):
+        self.url = LOGIN
+        self.performed = []
+        self.registry = SimpleNamespace(create_action_model=lambda: dict)
+
+    async def get_state(self):
+        xpaths = ["html/body/button"] if self.url == LOGIN else ["html/body/nav/profile"]
+        return SimpleNamespace(url=self.url, selector_map={7 + i: node(x) for i, x in enumerate(xpaths)})
+
+    async def act(self, action, context):
+        (name, params), = action.items()
+        self.performed.append((name, params))
+        if name == "click_element" and self.url == LOGIN:
+            self.url = HOME
+        return SimpleNamespace(error=None, extracted_content=None)
+
+
+def fingerprint(url: str, xpath: str) -> str:
+    return page_fingerprint(url, {1: node(xpath)})
+
+
+def agent_steps():
+    """Processor steps of a passed run that marked steps 1 and 2"""
+    return [
+        {"url": LOGIN, "actions": [
+            {"name": "click_element", "params": {"index": 3}, "xpath": "html/body/button", "error": True},
+            {"name": "click_element", "params": {"index": 3}, "xpath": "html/body/button", "error": False},
+            {"name": "complete_gherkin_step", "params": {"step": 1}, "xpath": None, "error": False},
+        ]},
+        {"url": HOME, "actions": [
+            {"name": "click_element", "params": {"index": 1}, "xpath": "html/body/nav/profile", "error": False},
+            {"name": "complete_gherkin_step", "params": {"step": 2}, "xpath": None, "error": False},
+        ]},
+    ]
+
+
+def test_gherkin_steps_mark_assertions_and_keep_tables():
+    steps = gherkin_steps(SCENARIO)
+
+    assert [(step.keyword, step.assertion) for step in steps] == [
+        ("Given", False), ("When", False), ("Then", True), ("And", True),
+    ]
+    assert steps[2].text == "the profile shows\n| name  |\n| alice |"
+
+
+def test_page_fingerprint_ignores_record_ids_and_indices():
+    assert url_pattern("https://example.com/users/42/edit?tab=1#top") == "https://example.com/users/*/edit"
+    assert page_fingerprint("https://example.com/users/42", {1: node("a"), 2: node("b")}) == page_fingerprint(
+        "https://example.com/users/7", {5: node("b"), 9: node("a")}
+    )
+    assert fingerprint(LOGIN, "a") != fingerprint(HOME, "a")
+
+
+def test_record_stores_successful_actions_of_marked_steps(tmp_path):
+    plans = StepPlanCache(ResponseCache("step_plans", path=str(tmp_path / "cache.sqlite3")))
+    login, home, profile = fingerprint(LOGIN, "b"), fingerprint(HOME, "p"), fingerprint(HOME, "q")
+
+    assert plans.record(SCENARIO, agent_steps(), {1: login, 2: home, 3: profile}) == 2
+    plan = plans.load(plans.key("the user is logged in", login))
+    assert plan == {
+        "actions": [{"name": "click_element", "params": {"index": 3}, "xpath": "html/body/button"}],
+        "after": home,
+    }
+    # Without the page the step ended on there is nothing to check a replay against
+    assert plans.record(SCENARIO, agent_steps(), {1: login}) == 0
+
+
+def test_replay_performs_cached_steps_until_the_first_assertion(tmp_path):
+    plans = StepPlanCache(ResponseCache("step_plans", path=str(tmp_path / "cache.sqlite3")))
+    browser = FakeBrowser()
+    state = asyncio.run(browser.get_state())
+    login = page_fingerprint(LOGIN, state.selector_map)
+    home = page_fingerprint(HOME, {1: node("html/body/nav/profile")})
+    plans.record(SCENARIO, agent_steps(), {1: login, 2: home, 3: home})
+
+    outcome = asyncio.run(plans.replay(SCENARIO, browser, browser, HistoryProcessor()))
+
+    assert outcome.steps_replayed == 2 and outcome.diverged_at == 2
+    assert outcome.reason == "Step 3 is a verification"
+    assert browser.performed == [("click_element", {"index": 7}), ("click_element", {"index": 7})]
+    assert len(outcome.used) == 2
+
+
+def test_replay_discards_a_plan_that_ends_on_another_page(tmp_path):
+    plans = StepPlanCache(ResponseCache("step_plans", path=str(tmp_path / "cache.sqlite3")))
+    browser = FakeBrowser()
+    login = page_fingerprint(LOGIN, asyncio.run(browser.get_state()).selector_map)
+    plans.save("the user is logged in", login, [{"name": "click_element", "params": {"index": 3}, "xpath": "html/body/button"}], "elsewhere")
+
+    outcome = asyncio.run(plans.replay(SCENARIO, browser, browser, HistoryProcessor()))
+
+    assert outcome.diverged_at == 0
+    assert outcome.reason == "Cached plan of step 1 failed: the page differs from the recorded one"
+    assert plans.load(plans.key("the user is logged in", login)) is None
@@ -0,0 +1,129 @@
+import asyncio
+from types import SimpleNamespace
+
+from src.Utilities.cache import ResponseCache
+from src.Utilities.history_processor import HistoryProcessor
+from src.Utilities.replay import ReplayOutcome, ReplayStore, continuation_task, replay_steps, same_page
+
+LOGIN = "https://example.com/login"
+HOME = "https://example.com/home"
+# Page -> element XPaths in selector map order; indices differ from the recorded run
+PAGES = {
+    LOGIN: ["html/body/form/input[1]", "html/body/form/button"],
+    HOME: ["html/body/nav/a"],
+}
+# Clicking an XPath leads to this page
+LINKS = {"html/body/form/button": HOME}
+
+
+class FakeBrowser:
+    """Browser context and controller of a two-page site."""
+
+    def __init__(self, pages=PAGES, failing=()):
+        self.pages = pages
+        self.failing = failing
+        self.url = None
+        self.performed = []
+        self.registry = SimpleNamespace(create_action_model=lambda: dict)
+
+    async def get_state(self):
+        nodes = self.pages.get(self.url, [])
+        return SimpleNamespace(url=self.url, selector_map={10 + i: SimpleNamespace(xpath=x) for i, x in enumerate(nodes)})
+
+    async def act(self, action, context):
+        (name, params), = action.items()
+        self.performed.append((name, params))
+        if name in self.failing:
+            return SimpleNamespace(error=f"{name} is broken", extracted_content=None)
+        if name == "go_to_url":
+            self.url = params["url"]
+        elif name == "click_element":
+            xpath = self.pages[self.url][params["index"] - 10]
+            self.url = LINKS.get(xpath, self.url)
+        return SimpleNamespace(error=None, extracted_content=None)
+
+
+RECORDED = [
+    {"url": None, "actions": [{"name": "go_to_url", "params": {"url": LOGIN}, "xpath": None}]},
+    {"url": LOGIN, "actions": [
+        {"name": "input_text", "params": {"index": 1, "text": "alice"}, "xpath": "html/body/form/input[1]"},
+        {"name": "click_element", "params": {"index": 2}, "xpath": "html/body/form/button"},
+    ]},
+    {"url": HOME, "actions": [{"name": "done", "params": {"text": "ok"}, "xpath": None}]},
+]
+
+
+def replay(browser, steps=RECORDED):
+    processor = HistoryProcessor()
+    outcome = asyncio.run(replay_steps(steps, browser, browser, processor))
+    return outcome, processor
+
+
+def test_complete_replay_re_resolves_elements_by_xpath():
+    browser = FakeBrowser()
+
+    outcome, processor = replay(browser)
+
+    assert outcome.completed and outcome.steps_replayed == 3
+    assert browser.performed == [
+        ("go_to_url", {"url": LOGIN}),
+        ("input_text", {"index": 10, "text": "alice"}),
+        ("click_element", {"index": 11}),
+    ]
+    assert processor.action_names == ["go_to_url", "input_text", "click_element"]
+    assert outcome.handover == len(processor.steps) == 2
+
+
+def test_replay_stops_where_the_page_differs():
+    browser = FakeBrowser(pages={**PAGES, LOGIN: ["html/body/form/input[1]", "html/body/form/a"]})
+
+    outcome, _ = replay(browser)
+
+    assert (outcome.diverged_at, outcome.steps_replayed) == (1, 1)
+    assert "html/body/form/button not found" in outcome.reason
+
+
+def test_replay_stops_on_another_url():
+    steps = [dict(RECORDED[0]), {"url": "https://example.com/signin", "actions": RECORDED[1]["actions"]}]
+
+    outcome, _ = replay(FakeBrowser(), steps)
+
+    assert outcome.diverged_at == 1
+    assert outcome.reason.startswith("Expected https://example.com/signin")
+
+
+def test_replay_stops_on_a_failing_action():
+    outcome, processor = replay(FakeBrowser(failing=("input_text",)))
+
+    assert outcome.diverged_at == 1
+    assert outcome.reason == "input_text failed: input_text is broken"
+    assert processor.action_errors == [None, "input_text is broken"]
+
+
+def test_same_page_ignores_fragment_and_trailing_slash():
+    assert same_page("https://example.com/home/", "https://example.com/home#top")
+    assert not same_page("https://example.com/home?tab=1", "https://example.com/home")
+
+
+def test_store_keeps_only_successful_actions(tmp_path):
+    store = ReplayStore(ResponseCache("replay", path=str(tmp_path / "cache.sqlite3")))
+    store.save("Scenario: Log in", LOGIN, [{"url": LOGIN, "actions": [
+        {"name": "click_element", "params": {"index": 3}, "xpath": "a", "error": True},
+        {"name": "click_element", "params": {"index": 4}, "xpath": "b", "error": False},
+    ]}])
+
+    assert store.load("Scenario:   Log in", LOGIN) == [{"url": LOGIN, "actions": [
+        {"name": "click_element", "params": {"index": 4}, "xpath": "b", "error": False},
+    ]}]
+    assert store.load("Scenario: Log in", HOME) is None
+
+
+def test_continuation_task_after_a_complete_replay_only_verifies():
+    outcome = ReplayOutcome(3)
+    outcome.steps_replayed = outcome.diverged_at = 3
+    outcome.verify = ['Then I see "Welcome"']
+
+    task = continuation_task("Run the scenario", outcome)
+
+    assert "Do not perform the actions again" in task
+    assert '- Then I see "Welcome"' in task
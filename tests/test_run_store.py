@@ -0,0 +1,72 @@
+import os
+import time
+
+from src.Utilities import run_store
+from src.Utilities.run_store import RunStore, history_to_dict
+
+
+class FakeHistory:
+    def model_dump(self):
+        return {"history": [{"model_output": None}]}
+
+
+def save(store, run_id, name, position=0, status="passed"):
+    return store.save(run_id, {"name": name, "result": {"status": status}}, position=position,
+                      feature="Login", name=name, status=status, duration=1.5)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    store = RunStore(str(tmp_path))
+    scenario_id = store.save("run-1", {"history": history_to_dict(FakeHistory()), "at": time}, name="Valid login")
+
+    record = store.load("run-1", scenario_id)
+
+    assert record["history"] == {"history": [{"model_output": None}]}
+    # Values JSON cannot hold are stored as text
+    assert record["at"] == str(time)
+    assert os.path.exists(tmp_path / "run-1" / f"{scenario_id}.json.gz")
+    assert not [name for name in os.listdir(tmp_path / "run-1") if name.endswith(".tmp")]
+    assert store.load("run-1", "missing") is None
+    assert store.load("run-2", scenario_id) is None
+
+
+def test_load_of_a_deleted_file_returns_none(tmp_path):
+    store = RunStore(str(tmp_path))
+    scenario_id = save(store, "run-1", "Valid login")
+    os.remove(tmp_path / "run-1" / f"{scenario_id}.json.gz")
+
+    assert store.load("run-1", scenario_id) is None
+
+
+def test_scenarios_and_runs_are_listed_from_the_index(tmp_path, monkeypatch):
+    store = RunStore(str(tmp_path))
+    now = time.time()
+    monkeypatch.setattr(run_store.time, "time", lambda: now)
+    save(store, "run-1", "Second", position=1, status="failed")
+    save(store, "run-1", "First", position=0)
+    monkeypatch.setattr(run_store.time, "time", lambda: now + 10)
+    save(store, "run-2", "Other")
+
+    assert [entry["name"] for entry in store.scenarios("run-1")] == ["First", "Second"]
+    runs = store.runs()
+    assert [run["run_id"] for run in runs] == ["run-2", "run-1"]
+    assert (runs[1]["scenarios"], runs[1]["passed"], runs[1]["duration"], runs[1]["features"]) == (2, 1, 3.0, "Login")
+    assert [run["run_id"] for run in store.runs(limit=1, offset=1)] == ["run-1"]
+
+
+def test_prune_deletes_old_records_and_empty_run_directories(tmp_path, monkeypatch):
+    store = RunStore(str(tmp_path))
+    now = time.time()
+    monkeypatch.setattr(run_store.time, "time", lambda: now - 100)
+    old = save(store, "run-1", "Old")
+    save(store, "run-2", "Old of a newer run")
+    monkeypatch.setattr(run_store.time, "time", lambda: now)
+    kept = save(store, "run-2", "New")
+
+    assert store.prune(older_than=50) == 2
+
+    assert store.load("run-1", old) is None
+    assert not os.path.exists(tmp_path / "run-1")
+    assert os.listdir(tmp_path / "run-2") == [f"{kept}.json.gz"]
+    assert [run["run_id"] for run in store.runs()] == ["run-2"]
+    assert store.prune(older_than=50) == 0
@@ -0,0 +1,137 @@
+import asyncio
+from types import SimpleNamespace
+
+from src.Utilities import session_state
+from src.Utilities.session_state import SEED_COOKIE, SharedSetup
+
+LOGIN = "https://example.com/login"
+HOME = "https://example.com/home"
+SETUP = "Background:\n    Given the user is logged in"
+SCENARIO = "Scenario: Open settings\n    When the user opens the settings"
+
+
+class FakePage:
+    def __init__(self, url):
+        self.url = url
+        self.cleared = 0
+
+    async def evaluate(self, script):
+        self.cleared += 1
+
+
+class FakeContext:
+    """Browser context, Playwright context and controller of a site that sends logged out users to the login page."""
+
+    def __init__(self, site):
+        self.site = site
+        self.url = None
+        self.cookies = []
+        self.init_scripts = []
+        self.pages = [FakePage("about:blank")]
+        self.browser_context = self
+        self.registry = SimpleNamespace(create_action_model=lambda: dict)
+
+    async def storage_state(self):
+        return {"cookies": list(self.cookies), "origins": [{"origin": "https://example.com", "localStorage": []}]}
+
+    async def add_cookies(self, cookies):
+        self.cookies.extend(cookies)
+
+    async def add_init_script(self, script):
+        self.init_scripts.append(script)
+
+    async def clear_cookies(self):
+        self.cookies = []
+
+    async def act(self, action, context):
+        (name, params), = action.items()
+        if name == "go_to_url":
+            session = {cookie["name"]: cookie["value"] for cookie in self.cookies}.get("session")
+            self.url = params["url"] if session in self.site.sessions else LOGIN
+        return SimpleNamespace(error=None)
+
+    async def get_state(self):
+        return SimpleNamespace(url=self.url, selector_map={})
+
+
+class FakeSite:
+    def __init__(self, passes=True):
+        self.passes = passes
+        self.sessions = set()
+        # Cookie names each setup run started with
+        self.setup_cookies = []
+
+    async def run_setup(self, context):
+        self.setup_cookies.append([cookie["name"] for cookie in context.cookies])
+        if not self.passes:
+            return None
+        session = f"token-{len(self.setup_cookies)}"
+        self.sessions.add(session)
+        await context.add_cookies([{"name": "session", "value": session, "url": HOME}])
+        context.url = HOME
+        return HOME
+
+
+def shared_setup(monkeypatch, site, controller=None, ttl=60.0):
+    monkeypatch.setattr(session_state, "_snapshots", {})
+    return SharedSetup(SETUP, HOME, site.run_setup, controller, ttl=ttl)
+
+
+def prepare(setup, context):
+    setup.controller = context
+    return asyncio.run(setup.prepare(SCENARIO, context))
+
+
+def test_later_scenarios_are_seeded_with_the_setup_state(monkeypatch):
+    site = FakeSite()
+    setup = shared_setup(monkeypatch, site)
+
+    assert prepare(setup, FakeContext(site)) == SCENARIO
+    context = FakeContext(site)
+    assert prepare(setup, context) == SCENARIO
+
+    assert (setup.runs, setup.seeded, setup.logouts) == (1, 1, 0)
+    assert context.url == HOME
+    assert {cookie["name"] for cookie in context.cookies} == {"session", SEED_COOKIE}
+    assert len(context.init_scripts) == 1
+
+
+def test_logged_out_snapshot_reruns_setup_in_a_cleared_context(monkeypatch):
+    site = FakeSite()
+    setup = shared_setup(monkeypatch, site)
+    prepare(setup, FakeContext(site))
+    site.sessions.clear()
+
+    context = FakeContext(site)
+    assert prepare(setup, context) == SCENARIO
+
+    assert (setup.runs, setup.seeded, setup.logouts) == (2, 0, 1)
+    # The seeding script stays installed but is disabled, and the stale localStorage is gone
+    assert site.setup_cookies[-1] == []
+    assert context.pages[0].cleared == 1
+    assert prepare(setup, FakeContext(site)) == SCENARIO
+    assert setup.seeded == 1
+
+
+def test_expired_snapshot_runs_setup_again(monkeypatch):
+    site = FakeSite()
+    setup = shared_setup(monkeypatch, site, ttl=60.0)
+    prepare(setup, FakeContext(site))
+
+    now = session_state.time.time()
+    monkeypatch.setattr(session_state.time, "time", lambda: now + 61)
+    prepare(setup, FakeContext(site))
+
+    assert (setup.runs, setup.seeded, setup.logouts) == (2, 0, 0)
+
+
+def test_failed_setup_is_left_to_the_scenarios(monkeypatch):
+    site = FakeSite(passes=False)
+    setup = shared_setup(monkeypatch, site)
+
+    first = prepare(setup, FakeContext(site))
+    second = prepare(setup, FakeContext(site))
+
+    assert first == second == f"{SETUP}\n\n{SCENARIO}"
+    assert setup.includes_setup(second)
+    assert setup.runs == 1 and setup.error == "Setup steps did not pass"
@@ -0,0 +1,93 @@
+import asyncio
+import json
+import os
+from contextvars import ContextVar
+from types import SimpleNamespace
+
+import pytest
+
+from src.Utilities import telemetry
+
+
+@pytest.fixture
+def telemetry_path(monkeypatch, tmp_path):
+    path = str(tmp_path / "logs" / "llm_calls.jsonl")
+    monkeypatch.setattr(telemetry, "TELEMETRY_PATH", path)
+    yield path
+    for handler in list(telemetry._logger.handlers):
+        telemetry._logger.removeHandler(handler)
+        handler.close()
+
+
+def record(run_id: str, stage: str) -> None:
+    call = telemetry.LLMCall(stage, "gpt-4o-mini", run_id)
+    call.prompt_tokens = 100
+    telemetry.record_llm_call(call)
+
+
+def test_each_process_writes_its_own_file(telemetry_path):
+    record("run1", "gherkin")
+
+    assert os.path.exists(telemetry.process_path())
+    assert telemetry.process_path() != telemetry_path
+
+
+def test_load_records_reads_other_processes_and_rotated_files(telemetry_path, monkeypatch):
+    monkeypatch.setattr(telemetry, "TELEMETRY_MAX_BYTES", 400)
+    for i in range(6):
+        record("run1", f"codegen:{i}")
+    # A worker process writing the same run
+    with open(telemetry.process_path(pid=1), "w", encoding="utf-8") as handle:
+        handle.write(json.dumps({"run_id": "run1", "stage": "execute", "timestamp": 0}) + "\n")
+        handle.write(json.dumps({"run_id": "run2", "stage": "execute", "timestamp": 0}) + "\n")
+
+    assert os.path.exists(telemetry.process_path() + ".1")
+    stages = [entry["stage"] for entry in telemetry.load_records("run1")]
+    assert stages == ["execute"] + [f"codegen:{i}" for i in range(6)]
+
+
+def test_prune_files_deletes_old_files(telemetry_path):
+    record("run1", "gherkin")
+    old = telemetry.process_path(pid=1)
+    with open(old, "w", encoding="utf-8") as handle:
+        handle.write("{}\n")
+    os.utime(old, (0, 0))
+
+    assert telemetry.prune_files() == 1
+    assert telemetry.telemetry_files() == [telemetry.process_path()]
+
+
+def test_files_signature_changes_when_a_record_is_written(telemetry_path):
+    record("run1", "gherkin")
+    before = telemetry.files_signature()
+
+    assert telemetry.files_signature() == before
+    record("run1", "gherkin")
+    assert telemetry.files_signature() != before
+    assert [path for path, _, _ in before] == telemetry.telemetry_files()
+
+
+def test_tracked_chat_model_records_every_call(telemetry_path, monkeypatch):
+    class FakeChatModel:
+        model = "gpt-4o-mini"
+
+        def __init__(self):
+            self.failures = 1
+
+        async def ainvoke(self, messages, output_format=None):
+            if self.failures:
+                self.failures -= 1
+                raise TimeoutError("model timed out")
+            return SimpleNamespace(completion="done", usage=SimpleNamespace(prompt_tokens=1200, completion_tokens=80))
+
+    monkeypatch.setattr(telemetry, "current_run_id", ContextVar("current_run_id", default="run1"))
+    llm = telemetry.track_chat_model(FakeChatModel(), "browser_agent")
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(llm.ainvoke(["step 1"]))
+    assert asyncio.run(llm.ainvoke(["step 1"])).completion == "done"
+
+    failed, passed = telemetry.load_records("run1")
+    assert (failed["stage"], failed["error"], failed["prompt_tokens"]) == ("browser_agent", "model timed out", 0)
+    assert (passed["calls"], passed["prompt_tokens"], passed["completion_tokens"], passed["error"]) == (1, 1200, 80, None)
+    assert passed["cost"] > 0